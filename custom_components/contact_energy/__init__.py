@@ -2,27 +2,59 @@
 
 from __future__ import annotations
 
-import csv
+import asyncio
 import logging
-from datetime import datetime, timedelta
-from pathlib import Path
-import voluptuous as vol
 
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import CONF_EMAIL, CONF_PASSWORD, Platform
-from homeassistant.core import HomeAssistant, ServiceCall
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers import config_validation as cv
-from homeassistant.components.recorder import get_instance
-from homeassistant.components.recorder.statistics import async_add_external_statistics, clear_statistics, StatisticData, StatisticMetaData
-from homeassistant.const import UnitOfEnergy
+from homeassistant.helpers.event import async_track_time_interval
+from homeassistant.helpers.typing import ConfigType
 
 from .api import ContactEnergyApi
-from .const import DOMAIN, CONF_USAGE_DAYS
+from .archive import ARCHIVE_DIRNAME
+from .cache import DEFAULT_CACHE_BYTES, UsageCache
+from .const import (
+    DOMAIN,
+    CONF_EXECUTOR_WORKERS,
+    CONF_LOCAL_STORE,
+    CONF_SESSION,
+    CONF_STATISTICS_SUFFIX,
+    CONF_TRACE,
+    CONF_USAGE_CACHE_MB,
+    CONF_USAGE_DAYS,
+)
+from .executor import DEFAULT_EXECUTOR_WORKERS, ContactEnergyExecutor
+from .gaps import GapIndex
+from .retry import RETRY_INTERVAL, RetryQueue
+from .services import async_setup_services
+from .store import STORE_FILENAME, UsageStore
+from .tariffs import TariffHistory, tariff_from_bill
+from .tracing import TRACE_FILENAME, Tracer
+from .views import ContactEnergyExportView
+from .websocket import async_setup_websocket
 
 _LOGGER = logging.getLogger(__name__)
 
 PLATFORMS: list[Platform] = [Platform.SENSOR]
 
+# hass.data key of the usage store shared by the entries that keep one
+STORE_DATA = f"{DOMAIN}_store"
+
+# hass.data key of the thread pool shared by every entry
+EXECUTOR_DATA = f"{DOMAIN}_executor"
+
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
+
+
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    """Set up the Contact Energy services, views and websocket commands."""
+    await async_setup_services(hass)
+    hass.http.register_view(ContactEnergyExportView)
+    async_setup_websocket(hass)
+    return True
+
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up Contact Energy from a config entry."""
@@ -34,257 +66,120 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         entry.data[CONF_PASSWORD],
     )
 
-    # Try to login
-    login_success = await hass.async_add_executor_job(api.login)
+    # Blocking network, parse and file work runs on the integration's own
+    # pool, one shared by every entry
+    executor = _async_acquire_executor(
+        hass,
+        entry.entry_id,
+        entry.options.get(
+            CONF_EXECUTOR_WORKERS,
+            entry.data.get(CONF_EXECUTOR_WORKERS, DEFAULT_EXECUTOR_WORKERS),
+        ),
+    )
+
+    # Optional span tracing of logins, fetches and refreshes for latency forensics
+    tracer = Tracer()
+    if entry.options.get(CONF_TRACE, False):
+        tracer = Tracer(hass.config.path(TRACE_FILENAME.format(entry_id=entry.entry_id)))
+    api.use_tracer(tracer)
+
+    # Parsed days are reused between refreshes and service calls
+    cache_mb = entry.options.get(CONF_USAGE_CACHE_MB, DEFAULT_CACHE_BYTES // 2**20)
+    if cache_mb > 0:
+        api.use_cache(UsageCache(max_bytes=cache_mb * 2**20))
+
+    @callback
+    def _async_save_session(session: dict) -> None:
+        """Keep the latest session with the entry for the next start."""
+        if session != entry.data.get(CONF_SESSION):
+            hass.config_entries.async_update_entry(
+                entry, data={**entry.data, CONF_SESSION: session}
+            )
+
+    # Logins happen on executor threads, including when a rejected session is renewed
+    api.set_session_listener(
+        lambda session: hass.add_job(_async_save_session, session)
+    )
+
+    # Reuse the saved session; the plan and bill lookups run together and
+    # log in again on their own if the server no longer accepts it
+    login_success = False
+    if api.restore_session(entry.data.get(CONF_SESSION)):
+        login_success = any(
+            await asyncio.gather(
+                executor.async_run(api.get_plan_details),
+                executor.async_run(api.get_bill_details),
+            )
+        )
+    if not login_success:
+        login_success = await executor.async_run(api.login)
     if not login_success:
         _LOGGER.error("Failed to login to Contact Energy API")
+        await executor.async_run(tracer.close)
+        if _async_release_executor(hass, entry.entry_id):
+            executor.shutdown()
         return False
 
+    # Optional local SQLite store of hourly usage, one instance shared by the
+    # entries that keep one, with a memory-mapped archive per contract serving
+    # the hourly range reads
+    store = None
+    if entry.options.get(CONF_LOCAL_STORE, entry.data.get(CONF_LOCAL_STORE, False)):
+        store = _async_acquire_store(hass, entry.entry_id)
+
     # Store API and config in hass.data
     hass.data.setdefault(DOMAIN, {})
-    hass.data[DOMAIN][entry.entry_id] = {
+    entry_data = hass.data[DOMAIN][entry.entry_id] = {
         "api": api,
         "usage_days": entry.data.get(CONF_USAGE_DAYS, 10),
+        "store": store,
+        "executor": executor,
+        "tracer": tracer,
+        "options": dict(entry.options),
+        "statistics_suffix": _async_statistics_suffix(hass, entry, api._contractId),
     }
 
-    # Forward setup to sensor platform
-    await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    # Bitmap of the hours fetched so far, used to find and fill gaps; every
+    # day of hourly usage the API reads is marked in it
+    gap_index = GapIndex(hass, entry.entry_id)
+    await gap_index.async_load()
+    entry_data["gap_index"] = gap_index
+    api.set_usage_listener(
+        lambda contract_id, rows: gap_index.mark(contract_id, (row[0] for row in rows))
+    )
 
-    # Register service to export historical data
-    async def handle_export_historical_data(call: ServiceCall) -> None:
-        """Handle the export historical data service call."""
-        days = call.data.get("days", 30)
-        _LOGGER.info(f"Exporting {days} days of Contact Energy historical data...")
-        
-        # Get API instance from first available entry
-        api = None
-        for entry_data in hass.data[DOMAIN].values():
-            if "api" in entry_data:
-                api = entry_data["api"]
-                break
-        
-        if not api:
-            _LOGGER.error("No Contact Energy API instance found")
-            return
-        
-        # Ensure logged in
-        if not api._api_token:
-            login_success = await hass.async_add_executor_job(api.login)
-            if not login_success:
-                _LOGGER.error("Failed to login to Contact Energy API")
-                return
-        
-        # Fetch historical data
-        all_data = []
-        today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
-        
-        for i in range(days):
-            day = today - timedelta(days=days - i)
-            response = await hass.async_add_executor_job(
-                api.get_usage,
-                str(day.year),
-                str(day.month),
-                str(day.day),
-            )
-            
-            if response:
-                for point in response:
-                    try:
-                        timestamp = datetime.strptime(point["date"], "%Y-%m-%dT%H:%M:%S.%f%z")
-                        value = float(point.get("value", 0))
-                        dollar_value = float(point.get("dollarValue", 0))
-                        offpeak_value = float(point.get("offpeakValue", 0))
-                        
-                        all_data.append({
-                            "timestamp": timestamp.strftime("%Y-%m-%d %H:%M:%S"),
-                            "date": timestamp.strftime("%Y-%m-%d"),
-                            "hour": timestamp.hour,
-                            "kwh": value,
-                            "cost_nzd": dollar_value,
-                            "is_offpeak": 1 if offpeak_value > 0 else 0,
-                            "offpeak_kwh": offpeak_value,
-                            "peak_kwh": value if offpeak_value == 0 else 0,
-                        })
-                    except (KeyError, ValueError) as e:
-                        _LOGGER.warning(f"Failed to parse data point: {e}")
-                        continue
-        
-        if not all_data:
-            _LOGGER.warning("No historical data found to export")
-            return
-        
-        # Save to CSV file in Home Assistant config directory
-        csv_path = Path(hass.config.path("contact_energy_export.csv"))
-        
-        await hass.async_add_executor_job(
-            _write_csv, csv_path, all_data
-        )
-        
-        _LOGGER.info(
-            f"Exported {len(all_data)} hourly records to {csv_path}"
-        )
-        
-        # Calculate summary statistics
-        total_kwh = sum(d["kwh"] for d in all_data)
-        total_cost = sum(d["cost_nzd"] for d in all_data)
-        peak_kwh = sum(d["peak_kwh"] for d in all_data)
-        offpeak_kwh = sum(d["offpeak_kwh"] for d in all_data)
-        
-        _LOGGER.info(
-            f"Summary: Total={total_kwh:.2f} kWh (Peak={peak_kwh:.2f}, Off-Peak={offpeak_kwh:.2f}), Cost=${total_cost:.2f}"
-        )
+    # Rates of every billing period seen, so past days keep their own prices
+    tariffs = TariffHistory(hass, entry.entry_id)
+    await tariffs.async_load()
+    tariffs.record(tariff_from_bill(api._bill_details))
+    entry_data["tariffs"] = tariffs
 
-    def _write_csv(csv_path: Path, data: list) -> None:
-        """Write data to CSV file (runs in executor)."""
-        with open(csv_path, "w", newline="", encoding="utf-8") as csvfile:
-            fieldnames = ["timestamp", "date", "hour", "kwh", "cost_nzd", "is_offpeak", "offpeak_kwh", "peak_kwh"]
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            writer.writeheader()
-            writer.writerows(data)
-
-    hass.services.async_register(
-        DOMAIN,
-        "export_historical_data",
-        handle_export_historical_data,
-        schema=vol.Schema({
-            vol.Optional("days", default=30): cv.positive_int,
-        }),
+    # Days that fail to fetch are retried with backoff, separately from the refresh
+    retry_queue = RetryQueue(hass, entry.entry_id, entry_data)
+    await retry_queue.async_load()
+    entry_data["retry_queue"] = retry_queue
+    entry.async_on_unload(
+        async_track_time_interval(hass, retry_queue.async_process, RETRY_INTERVAL)
     )
 
-    # Register service to import historical data into database
-    async def handle_import_historical_data(call: ServiceCall) -> None:
-        """Handle the import historical data service call."""
-        days = call.data.get("days", 90)
-        clear_existing = call.data.get("clear_existing", False)
-        confirm_clear = call.data.get("confirm_clear", "").strip().lower()
-        
-        # If clearing existing data, require confirmation
-        if clear_existing:
-            if confirm_clear != "yes":
-                _LOGGER.error("Import cancelled - clear_existing is true but confirmation not provided. You must type 'yes' in confirm_clear field.")
-                return
-            
-            _LOGGER.info("Clearing existing Contact Energy statistics...")
-            statistic_ids = [
-                f"{DOMAIN}:energy_consumption",
-                f"{DOMAIN}:free_energy_consumption",
-            ]
-            
-            for statistic_id in statistic_ids:
-                await get_instance(hass).async_clear_statistics([statistic_id])
-                _LOGGER.info(f"Cleared statistics for {statistic_id}")
-        
-        _LOGGER.info(f"Importing {days} days of Contact Energy historical data into database...")
-        
-        # Get API instance from first available entry
-        api = None
-        for entry_data in hass.data[DOMAIN].values():
-            if "api" in entry_data:
-                api = entry_data["api"]
-                break
-        
-        if not api:
-            _LOGGER.error("No Contact Energy API instance found")
-            return
-        
-        # Ensure logged in
-        if not api._api_token:
-            login_success = await hass.async_add_executor_job(api.login)
-            if not login_success:
-                _LOGGER.error("Failed to login to Contact Energy API")
-                return
-        
-        # Fetch historical data
-        kWh_statistics = []
-        free_kWh_statistics = []
-        today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
-        
-        _LOGGER.info(f"Fetching data from API for {days} days...")
-        for i in range(days):
-            day = today - timedelta(days=days - i)
-            response = await hass.async_add_executor_job(
-                api.get_usage,
-                str(day.year),
-                str(day.month),
-                str(day.day),
-            )
-            
-            if not response:
-                continue
-            
-            for point in response:
-                try:
-                    timestamp = datetime.strptime(point["date"], "%Y-%m-%dT%H:%M:%S.%f%z")
-                    value = float(point.get("value", 0))
-                    offpeak_value = float(point.get("offpeakValue", 0))
-                    
-                    if offpeak_value > 0:
-                        # This is off-peak/free energy
-                        free_kWh_statistics.append(
-                            StatisticData(start=timestamp, state=value)
-                        )
-                    else:
-                        # This is peak energy
-                        kWh_statistics.append(
-                            StatisticData(start=timestamp, state=value)
-                        )
-                except (KeyError, ValueError) as e:
-                    _LOGGER.warning(f"Failed to parse data point: {e}")
-                    continue
-            
-            # Log progress every 10 days
-            if (i + 1) % 10 == 0:
-                _LOGGER.info(f"Processed {i + 1}/{days} days...")
-        
-        if not kWh_statistics and not free_kWh_statistics:
-            _LOGGER.warning("No historical data found to import")
-            return
-        
-        # Import peak energy statistics
-        if kWh_statistics:
-            kWh_metadata = StatisticMetaData(
-                has_mean=False,
-                has_sum=True,
-                name="Contact Energy",
-                source=DOMAIN,
-                statistic_id=f"{DOMAIN}:energy_consumption",
-                unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
-            )
-            async_add_external_statistics(hass, kWh_metadata, kWh_statistics)
-            _LOGGER.info(f"Imported {len(kWh_statistics)} peak energy statistics")
-        
-        # Import off-peak energy statistics
-        if free_kWh_statistics:
-            free_kWh_metadata = StatisticMetaData(
-                has_mean=False,
-                has_sum=True,
-                name="Contact Energy Free",
-                source=DOMAIN,
-                statistic_id=f"{DOMAIN}:free_energy_consumption",
-                unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
-            )
-            async_add_external_statistics(hass, free_kWh_metadata, free_kWh_statistics)
-            _LOGGER.info(f"Imported {len(free_kWh_statistics)} off-peak energy statistics")
-        
-        total_records = len(kWh_statistics) + len(free_kWh_statistics)
-        _LOGGER.info(
-            f"Successfully imported {total_records} hourly statistics into Energy Dashboard"
-        )
+    # Reload when options change so they take effect
+    entry.async_on_unload(entry.add_update_listener(_async_update_listener))
 
-    hass.services.async_register(
-        DOMAIN,
-        "import_historical_data",
-        handle_import_historical_data,
-        schema=vol.Schema({
-            vol.Optional("days", default=90): cv.positive_int,
-            vol.Optional("clear_existing", default=False): cv.boolean,
-            vol.Optional("confirm_clear", default=""): cv.string,
-        }),
-    )
+    # Forward setup to sensor platform
+    await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
 
     return True
 
 
+async def _async_update_listener(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Reload the entry when its options change."""
+    entry_data = hass.data[DOMAIN].get(entry.entry_id)
+    if entry_data and entry_data["options"] == dict(entry.options):
+        # Only the saved session changed
+        return
+    await hass.config_entries.async_reload(entry.entry_id)
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     _LOGGER.debug("Unloading Contact Energy integration")
@@ -294,6 +189,92 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 
     # Remove stored data
     if unload_ok:
-        hass.data[DOMAIN].pop(entry.entry_id)
+        entry_data = hass.data[DOMAIN].pop(entry.entry_id)
+        if entry_data.get("store") and (store := _async_release_store(hass, entry.entry_id)):
+            await entry_data["executor"].async_run(store.close)
+        await entry_data["executor"].async_run(entry_data["tracer"].close)
+        if executor := _async_release_executor(hass, entry.entry_id):
+            executor.shutdown()
 
     return unload_ok
+
+
+@callback
+def _async_acquire_store(hass: HomeAssistant, entry_id: str) -> UsageStore:
+    """Return the shared usage store, opening it for the first entry to use it."""
+    shared = hass.data.get(STORE_DATA)
+    if shared is None:
+        shared = hass.data[STORE_DATA] = {
+            "store": UsageStore(
+                hass.config.path(STORE_FILENAME), hass.config.path(ARCHIVE_DIRNAME)
+            ),
+            "entries": set(),
+        }
+    shared["entries"].add(entry_id)
+    return shared["store"]
+
+
+@callback
+def _async_release_store(hass: HomeAssistant, entry_id: str) -> UsageStore | None:
+    """Stop an entry using the shared store; return it to close once unused."""
+    shared = hass.data.get(STORE_DATA)
+    if shared is None:
+        return None
+    shared["entries"].discard(entry_id)
+    if shared["entries"]:
+        return None
+    del hass.data[STORE_DATA]
+    return shared["store"]
+
+
+@callback
+def _async_acquire_executor(
+    hass: HomeAssistant, entry_id: str, max_workers: int
+) -> ContactEnergyExecutor:
+    """Return the shared pool, grown to the largest worker count asked for."""
+    shared = hass.data.get(EXECUTOR_DATA)
+    if shared is None:
+        shared = hass.data[EXECUTOR_DATA] = {
+            "executor": ContactEnergyExecutor(max_workers),
+            "entries": set(),
+        }
+    shared["executor"].grow(max_workers)
+    shared["entries"].add(entry_id)
+    return shared["executor"]
+
+
+@callback
+def _async_release_executor(
+    hass: HomeAssistant, entry_id: str
+) -> ContactEnergyExecutor | None:
+    """Stop an entry using the shared pool; return it to shut down once unused."""
+    shared = hass.data.get(EXECUTOR_DATA)
+    if shared is None:
+        return None
+    shared["entries"].discard(entry_id)
+    if shared["entries"]:
+        return None
+    del hass.data[EXECUTOR_DATA]
+    return shared["executor"]
+
+
+@callback
+def _async_statistics_suffix(hass: HomeAssistant, entry: ConfigEntry, contract_id: str) -> str:
+    """Return the suffix of the entry's statistic IDs, choosing it on first setup.
+
+    Before accounts had statistics of their own every entry wrote the shared
+    IDs, so the entry added first keeps them and its history; each further
+    entry writes IDs ending in its contract ID.
+    """
+    if CONF_STATISTICS_SUFFIX in entry.data:
+        return entry.data[CONF_STATISTICS_SUFFIX]
+    entries = hass.config_entries.async_entries(DOMAIN)
+    shared_taken = any(other.data.get(CONF_STATISTICS_SUFFIX) == "" for other in entries)
+    first_unset = next(
+        other for other in entries if CONF_STATISTICS_SUFFIX not in other.data
+    )
+    suffix = "" if not shared_taken and first_unset.entry_id == entry.entry_id else contract_id
+    hass.config_entries.async_update_entry(
+        entry, data={**entry.data, CONF_STATISTICS_SUFFIX: suffix}
+    )
+    return suffix
@@ -1,10 +1,102 @@
 """Contact Energy API."""
 
+import asyncio
+from collections import deque
+import copy
+from datetime import datetime, timedelta
+from functools import partial
+import json
 import logging
+import threading
+import time
 import requests
 
+from .ratelimit import CIRCUIT_BREAKER, RATE_LIMITER, CircuitOpenError
+from .store import UsageRow
+from .tariff_bands import parse_bill
+from .tracing import Tracer
+
+try:
+    # Home Assistant ships orjson; fall back to the standard library elsewhere
+    from orjson import loads as json_loads
+except ImportError:
+    json_loads = json.loads
+
 _LOGGER = logging.getLogger(__name__)
 
+# Resolutions supported by the usage endpoint, finest first
+USAGE_INTERVALS = ["hourly", "daily", "monthly"]
+
+# Days iter_usage fetches ahead of the one being processed
+DEFAULT_READ_AHEAD = 3
+
+# Columns of exported usage, in order
+EXPORT_FIELDS = [
+    "timestamp",
+    "date",
+    "hour",
+    "kwh",
+    "cost_nzd",
+    "is_offpeak",
+    "offpeak_kwh",
+    "peak_kwh",
+]
+
+# Statuses the API answers with when a session token is no longer accepted
+SESSION_REJECTED = (401, 403)
+
+# Usage point field holding the kWh exported to the grid, on solar sites only
+SOLD_FIELD = "exportValue"
+
+# (hour, kwh); hour is the UTC epoch of the hour start
+SoldRow = tuple[int, float]
+
+
+def project_usage(points, sold=None):
+    """Project decoded usage points onto compact rows.
+
+    Only ``date``, ``value``, ``dollarValue`` and ``offpeakValue`` are kept,
+    as (hour, kwh, cost, offpeak_kwh, source_ts) with the hour as UTC epoch
+    seconds. Points that cannot be parsed are skipped. When a ``sold`` list
+    is given, the exported kWh of points that report any are appended to it
+    as (hour, kwh) in the same pass.
+    """
+    rows: list[UsageRow] = []
+    append = rows.append
+    fromisoformat = datetime.fromisoformat
+    for point in points:
+        try:
+            source_ts = point["date"]
+            hour = int(fromisoformat(source_ts).timestamp())
+            append((
+                hour,
+                float(point.get("value") or 0),
+                float(point.get("dollarValue") or 0),
+                float(point.get("offpeakValue") or 0),
+                source_ts,
+            ))
+            if sold is not None and point.get(SOLD_FIELD) is not None:
+                sold.append((hour, float(point[SOLD_FIELD])))
+        except (KeyError, ValueError, TypeError) as e:
+            _LOGGER.warning("Failed to parse data point: %s", e)
+    return rows
+
+
+def export_record(row: UsageRow) -> dict:
+    """Return a usage row as an export record, timestamped in Contact's local time."""
+    _, value, dollar_value, offpeak_value, source_ts = row
+    timestamp = datetime.fromisoformat(source_ts)
+    return {
+        "timestamp": timestamp.strftime("%Y-%m-%d %H:%M:%S"),
+        "date": timestamp.strftime("%Y-%m-%d"),
+        "hour": timestamp.hour,
+        "kwh": value,
+        "cost_nzd": dollar_value,
+        "is_offpeak": 1 if offpeak_value > 0 else 0,
+        "offpeak_kwh": offpeak_value,
+        "peak_kwh": max(value - offpeak_value, 0),
+    }
+
 
 class ContactEnergyApi:
     """Class for Contact Energy API."""
@@ -16,22 +108,173 @@ class ContactEnergyApi:
         self._accountId = ""
         self._premiseId = ""
         self._businessPartner = ""
+        self._contracts = []
         self._plan_details = {}
         self._bill_details = {}
+        self._tariff = None
         self._url_base = "https://api.contact-digital-prod.net"
         # Contact Energy uses different API keys for different endpoints
         self._api_key_login = "IHUNZ1q6Ny97U9uS5iztj6UKsOBhJ3eD72LQUizO"  # For login
         self._api_key_data = "wg8mXRp7kQ82aOT7mTkzl9fsULf1sEcu7WMGtn6C"  # For customer/usage data
         self._email = email
         self._password = password
+        self._cassette = None
+        self._cache = None
+        self._tracer = Tracer()
+        self._session_listener = None
+        self._usage_listener = None
+        # Held while logging in, so threads whose session was rejected log in once
+        self._session_lock = threading.RLock()
+        self._logging_in = False
+
+    @property
+    def session(self):
+        """Return the current session and IDs, to be restored with restore_session."""
+        if not self._api_token:
+            return {}
+        return {
+            "token": self._api_token,
+            "bp": self._businessPartner,
+            "account_id": self._accountId,
+            "contract_id": self._contractId,
+            "premise_id": self._premiseId,
+        }
+
+    def restore_session(self, session):
+        """Reuse a saved session instead of logging in; return whether it was complete.
+
+        The token is not checked here. The first request the server rejects
+        logs in again and is retried, so a stale session costs one round trip.
+        """
+        if not session or not all(
+            session.get(key) for key in ("token", "account_id", "contract_id")
+        ):
+            return False
+        self._api_token = session["token"]
+        self._businessPartner = session.get("bp", "")
+        self._accountId = session["account_id"]
+        self._contractId = session["contract_id"]
+        self._premiseId = session.get("premise_id", "")
+        _LOGGER.debug("Restored saved session")
+        return True
+
+    def set_session_listener(self, listener):
+        """Call ``listener`` with the new session after every successful login.
+
+        The listener runs on the thread that logged in.
+        """
+        self._session_listener = listener
+
+    def set_usage_listener(self, listener):
+        """Call ``listener(contract_id, rows)`` with every day of hourly rows read.
+
+        Covers fetches and cache hits alike, and runs on the reading thread.
+        """
+        self._usage_listener = listener
+
+    def _reauthenticate(self, rejected_token):
+        """Log in again after ``rejected_token`` was rejected; return whether to retry."""
+        with self._session_lock:
+            if self._logging_in:
+                # Rejected during login itself; logging in again would not help
+                return False
+            if self._api_token != rejected_token:
+                # Another thread has already logged in again
+                return bool(self._api_token)
+            _LOGGER.info("Saved session was rejected, logging in again")
+            return self.login()
+
+    def use_cassette(self, cassette):
+        """Record responses to, or replay them from, a cassette (None to stop)."""
+        self._cassette = cassette
+
+    def use_cache(self, cache):
+        """Serve repeated single-day hourly usage reads from a UsageCache (None to stop)."""
+        self._cache = cache
+
+    @property
+    def usage_cache(self):
+        """Return the usage cache, if one is in use."""
+        return self._cache
+
+    def use_tracer(self, tracer):
+        """Record login and usage fetch spans with ``tracer``."""
+        self._tracer = tracer
+
+    def _request(self, method, url, reauthenticate=True, **kwargs):
+        """Send a request through the shared rate limiter and circuit breaker.
+
+        A request whose session is rejected logs in again and is sent once more
+        with the new token.
+        """
+        response = self._send(method, url, **kwargs)
+
+        headers = kwargs.get("headers") or {}
+        if (
+            reauthenticate
+            and response.status_code in SESSION_REJECTED
+            and headers.get("session")
+            and self._reauthenticate(headers["session"])
+        ):
+            kwargs["headers"] = {**headers, "session": self._api_token}
+            return self._request(method, url, reauthenticate=False, **kwargs)
+        return response
+
+    def _send(self, method, url, **kwargs):
+        """Send one request, or answer it from the cassette."""
+        if self._cassette is not None and self._cassette.replaying:
+            return self._cassette.play(method, url)
+
+        if not CIRCUIT_BREAKER.allow_request():
+            raise CircuitOpenError(
+                "Requests paused after repeated Contact Energy API failures"
+            )
+        RATE_LIMITER.acquire()
+
+        started = time.monotonic()
+        try:
+            response = requests.request(method, url, **kwargs)
+        except requests.exceptions.RequestException:
+            CIRCUIT_BREAKER.record_failure()
+            raise
+
+        if self._cassette is not None:
+            self._cassette.record(
+                method, url, kwargs.get("json"), response, time.monotonic() - started
+            )
+
+        # Throttling and server errors count towards opening the circuit
+        if response.status_code == 429 or response.status_code >= 500:
+            CIRCUIT_BREAKER.record_failure()
+        else:
+            CIRCUIT_BREAKER.record_success()
+        return response
+
+    def login(self, fetch_details=True):
+        """Login to the Contact Energy API.
 
-    def login(self):
-        """Login to the Contact Energy API."""
+        Without ``fetch_details``, only the accounts are looked up after
+        logging in and the plan and bill details are left to be fetched later.
+        """
+        with self._session_lock, self._tracer.span("login") as span:
+            self._logging_in = True
+            try:
+                success = self._login(fetch_details)
+            finally:
+                self._logging_in = False
+            span["outcome"] = "ok" if success else "failed"
+        if success and self._session_listener is not None:
+            self._session_listener(self.session)
+        return success
+
+    def _login(self, fetch_details):
+        """Log in and look up the accounts, and the plan and bill if requested."""
         headers = {"x-api-key": self._api_key_login}
         data = {"username": self._email, "password": self._password}
         
         try:
-            response = requests.post(
+            response = self._request(
+                "post",
                 self._url_base + "/login/v2", 
                 json=data, 
                 headers=headers,
@@ -40,11 +283,11 @@ class ContactEnergyApi:
             
             if response.status_code == requests.codes.ok:
                 json_result = response.json()
-                
-                print("\n=== Login Response ===")
-                print("Full Response Data:", json_result)
-                print("=" * 50)
-                
+                _LOGGER.debug(
+                    "Login response: %s",
+                    {key: value for key, value in json_result.items() if key != "token"},
+                )
+
                 self._api_token = json_result["token"]
                 self._businessPartner = json_result.get("bp", "")
                 _LOGGER.debug("Logged in successfully")
@@ -52,6 +295,8 @@ class ContactEnergyApi:
                 
                 # Get account info after login
                 if self.get_accounts():
+                    if not fetch_details:
+                        return True
                     # Get plan details
                     self.get_plan_details()
                     # Get bill details with rates
@@ -74,7 +319,8 @@ class ContactEnergyApi:
         headers = {"x-api-key": self._api_key_data, "session": self._api_token}
         
         try:
-            response = requests.get(
+            response = self._request(
+                "get",
                 self._url_base + "/customer/v2?fetchAccounts=true", 
                 headers=headers,
                 timeout=30
@@ -84,10 +330,35 @@ class ContactEnergyApi:
                 data = response.json()
                 _LOGGER.debug("Retrieved accounts")
                 
-                # Extract account, contract, and premise IDs
-                self._accountId = data["accounts"][0]["id"]
-                self._contractId = data["accounts"][0]["contracts"][0]["contractId"]
-                self._premiseId = data["accounts"][0]["contracts"][0].get("premiseId", "")
+                # Keep every contract so other properties can be fetched too
+                self._contracts = [
+                    {
+                        "account_id": account["id"],
+                        "contract_id": contract["contractId"],
+                        "premise_id": contract.get("premiseId", ""),
+                    }
+                    for account in data["accounts"]
+                    for contract in account.get("contracts", [])
+                ]
+
+                # Keep the selected contract when logging in again, e.g. in a
+                # for_contract copy; otherwise select the first one
+                selected = next(
+                    (
+                        contract
+                        for contract in self._contracts
+                        if contract["account_id"] == self._accountId
+                        and contract["contract_id"] == self._contractId
+                    ),
+                    None,
+                ) or {
+                    "account_id": data["accounts"][0]["id"],
+                    "contract_id": data["accounts"][0]["contracts"][0]["contractId"],
+                    "premise_id": data["accounts"][0]["contracts"][0].get("premiseId", ""),
+                }
+                self._accountId = selected["account_id"]
+                self._contractId = selected["contract_id"]
+                self._premiseId = selected["premise_id"]
                 
                 return True
             else:
@@ -97,6 +368,13 @@ class ContactEnergyApi:
             _LOGGER.error("Get accounts failed: %s", e)
             return False
 
+    def for_contract(self, account_id, contract_id):
+        """Return a copy of this logged-in API that fetches another contract."""
+        api = copy.copy(self)
+        api._accountId = account_id
+        api._contractId = contract_id
+        return api
+
     def get_plan_details(self):
         """Get plan details for the account."""
         if not self._accountId:
@@ -106,7 +384,8 @@ class ContactEnergyApi:
         headers = {"x-api-key": self._api_key_data, "session": self._api_token}
         
         try:
-            response = requests.get(
+            response = self._request(
+                "get",
                 self._url_base + f"/panel-plans/v2?ba={self._accountId}",
                 headers=headers,
                 timeout=30
@@ -148,56 +427,144 @@ class ContactEnergyApi:
             _LOGGER.error("Get plan details failed: %s", e)
             return False
 
-    def get_usage(self, year, month, day):
-        """Get usage data for a specific day."""
+    def get_usage(self, year, month, day, interval="hourly", sold=None):
+        """Get usage rows for a specific day (see get_usage_range)."""
+        date_str = f"{year}-{month.zfill(2)}-{day.zfill(2)}"
+        return self.get_usage_range(date_str, date_str, interval, sold)
+
+    def get_usage_range(self, date_from, date_to, interval="hourly", sold=None):
+        """Get usage data from one date to another (inclusive).
+
+        ``interval`` is one of USAGE_INTERVALS; coarser intervals return one
+        point per day or month instead of one per hour. Returns the points
+        projected by project_usage, or False if the request failed. Pass a
+        ``sold`` list to also collect the exported kWh from the same response.
+        With a usage cache, single hourly days are answered from it if they
+        have been fetched before and have not expired.
+        """
+        date_str = date_from if date_from == date_to else f"{date_from} to {date_to}"
+        # Whole hourly days are cached with their export, whether asked for or not
+        key = None
+        if self._cache is not None and date_from == date_to and interval == "hourly":
+            key = (self._contractId, date_from)
+        with self._tracer.span("fetch_usage", range=date_str, interval=interval) as span:
+            cached = self._cache.get(key) if key else None
+            if cached:
+                span["cache"] = "hit"
+                rows, day_sold = cached
+            else:
+                day_sold = [] if key else sold
+                rows = self._get_usage_range(
+                    date_from, date_to, interval, date_str, span, day_sold
+                )
+                if key and rows:
+                    self._cache.put(key, rows, day_sold)
+            span["outcome"] = "failed" if rows is False else "ok"
+            span["rows"] = len(rows) if rows else 0
+        if key and sold is not None:
+            sold.extend(day_sold)
+        if rows and interval == "hourly" and self._usage_listener is not None:
+            self._usage_listener(self._contractId, rows)
+        return rows
+
+    async def iter_usage(self, start, end, run=None, read_ahead=DEFAULT_READ_AHEAD, skip=()):
+        """Yield (day, rows, sold) for each day from ``start`` to ``end`` inclusive.
+
+        Days are yielded in order, with ``rows`` as returned by get_usage and
+        ``sold`` the day's exported kWh. The next ``read_ahead`` days are
+        fetched in the background while the caller processes the current
+        one. ``run(func, *args)`` runs the blocking fetches, by default in
+        the loop's executor. Days in ``skip`` are neither fetched nor
+        yielded. Close the generator, e.g. with ``contextlib.aclosing``, to
+        stop early; fetches that have not started are then cancelled.
+        """
+        if run is None:
+            run = partial(asyncio.get_running_loop().run_in_executor, None)
+        days = (
+            day
+            for day in (start + timedelta(days=i) for i in range((end - start).days + 1))
+            if day not in skip
+        )
+        pending = deque()
+
+        def _schedule():
+            day = next(days, None)
+            if day is None:
+                return
+            sold = []
+            fetch = run(
+                self.get_usage, str(day.year), str(day.month), str(day.day), "hourly", sold
+            )
+            pending.append((day, sold, asyncio.ensure_future(fetch)))
+
+        try:
+            for _ in range(read_ahead + 1):
+                _schedule()
+            while pending:
+                day, sold, fetch = pending.popleft()
+                rows = await fetch
+                # Keep the read-ahead window full while the caller works
+                _schedule()
+                yield day, rows, sold
+        finally:
+            for _, _, fetch in pending:
+                fetch.cancel()
+
+    def _get_usage_range(self, date_from, date_to, interval, date_str, span, sold):
+        """Fetch and decode usage, adding the response size to ``span``."""
         if not self._contractId or not self._accountId:
             _LOGGER.error("Cannot get usage without account and contract IDs")
             return False
         
         headers = {"x-api-key": self._api_key_data, "session": self._api_token}
-        date_str = f"{year}-{month.zfill(2)}-{day.zfill(2)}"
         
         try:
-            response = requests.post(
-                f"{self._url_base}/usage/v2/{self._contractId}?ba={self._accountId}&interval=hourly&from={date_str}&to={date_str}",
+            response = self._request(
+                "post",
+                f"{self._url_base}/usage/v2/{self._contractId}?ba={self._accountId}&interval={interval}&from={date_from}&to={date_to}",
                 headers=headers,
                 timeout=30
             )
             
+            span["status"] = response.status_code
+            span["bytes"] = len(response.content)
             if response.status_code == requests.codes.ok:
-                data = response.json()
-                if not data:
+                # Decode the raw bytes and keep only the compact rows
+                with self._tracer.span("decode", bytes=span["bytes"]) as decode:
+                    rows = project_usage(json_loads(response.content) or [], sold)
+                    decode["rows"] = len(rows)
+                if not rows:
                     _LOGGER.info(
                         "Fetched usage data for %s, but got nothing back (data may be delayed)",
                         date_str,
                     )
-                return data if data else []
+                return rows
             else:
                 _LOGGER.error(
-                    "Failed to fetch usage data for %s: %s", 
+                    "Failed to fetch usage data for %s: %s - %s", 
                     date_str, 
-                    response.text
+                    response.status_code,
+                    response.text[:200] if response.text else "No response"
                 )
                 return False
+        except CircuitOpenError as e:
+            _LOGGER.debug("Skipped usage request for %s: %s", date_str, e)
+            return False
         except requests.exceptions.RequestException as e:
             _LOGGER.error("Get usage request failed for %s: %s", date_str, e)
             return False
+        except ValueError as e:
+            _LOGGER.error("Failed to decode usage data for %s: %s", date_str, e)
+            return False
 
     def get_bill_details(self):
         """Get current bill details including rates and charges."""
-        print("\n=== get_bill_details() called ===")
-        print(f"Token exists: {bool(self._api_token)}")
-        print(f"Account ID: {self._accountId}")
-        print(f"Business Partner: {self._businessPartner}")
-        
         if not self._api_token or not self._accountId or not self._businessPartner:
             _LOGGER.warning("Cannot fetch bill details - missing credentials (token=%s, accountId=%s, bp=%s)",
                           bool(self._api_token), bool(self._accountId), bool(self._businessPartner))
-            print("❌ Missing credentials - cannot fetch bill details")
             return False
 
-        print(f"Making request to: {self._url_base}/interactive-bill?ba={self._accountId}&bp={self._businessPartner}")
-
+        _LOGGER.debug("Fetching bill details for account %s", self._accountId)
         headers = {
             "session": self._api_token,
             "x-api-key": self._api_key_data,
@@ -205,129 +572,37 @@ class ContactEnergyApi:
 
         try:
             # Get current bill
-            response = requests.get(
+            response = self._request(
+                "get",
                 f"{self._url_base}/interactive-bill?ba={self._accountId}&bp={self._businessPartner}",
                 headers=headers,
                 timeout=30
             )
             
-            print(f"Response Status: {response.status_code}")
-            
             if response.status_code == requests.codes.ok:
                 bill_data = response.json()
                 
-                print("✅ Bill Data Retrieved Successfully!")
-                print("Bill Data:", bill_data)
-                
                 # Store for debugging
                 self._last_bill_response = bill_data
                 
                 _LOGGER.debug("Bill API Response: %s", bill_data)
                 
-                # Extract rates from VariableCharges
-                variable_charges = bill_data.get("VariableCharges", [])
-                fixed_charges = bill_data.get("FixedCharges", [])
+                # Rates and the hours they apply to, parsed once per billing period
+                tariff = parse_bill(bill_data)
                 
                 self._bill_details = {
-                    "peak_rate": 0.0,
-                    "offpeak_rate": 0.0,
-                    "peak_rate_cents": 0.0,
-                    "offpeak_rate_cents": 0.0,
-                    "daily_charge": 0.0,
+                    "peak_rate": tariff.peak_rate,
+                    "offpeak_rate": tariff.offpeak_rate,
+                    "peak_rate_cents": round(tariff.peak_rate * 100, 3),
+                    "offpeak_rate_cents": round(tariff.offpeak_rate * 100, 3),
+                    "daily_charge": tariff.daily_charge,
+                    "bands": [band.as_dict() for band in tariff.bands],
                     "next_bill_date": bill_data.get("NextBillDate", ""),
                     "next_bill_amount": float(bill_data.get("TotalAmount", 0)),
                     "billing_start": bill_data.get("StartBillingPeriod", ""),
                     "billing_end": bill_data.get("EndBillingPeriod", ""),
                 }
-                
-                # Parse variable charges for peak/off-peak rates
-                for charge in variable_charges:
-                    description = charge.get("Description", "")
-                    price_str = charge.get("Price", "0")
-                    currency_type = charge.get("CurrencyType", "cents").lower()
-                    
-                    try:
-                        price = float(price_str)
-                    except (ValueError, TypeError):
-                        _LOGGER.warning("Failed to parse price: %s", price_str)
-                        continue
-                    
-                    # Convert cents to dollars (e.g., 32.700 cents → $0.327)
-                    if currency_type == "cents":
-                        price = price / 100.0
-                        _LOGGER.debug("Converted %s cents to $%.4f", price_str, price)
-                    
-                    # Intelligently detect peak vs off-peak from description
-                    # Look for time patterns like "9PM - 7AM" or "7AM - 9PM"
-                    import re
-                    time_pattern = r'(\d{1,2}(?::\d{2})?\s*(?:AM|PM|am|pm))\s*[-–]\s*(\d{1,2}(?::\d{2})?\s*(?:AM|PM|am|pm))'
-                    match = re.search(time_pattern, description)
-                    
-                    is_offpeak = False
-                    if match:
-                        start_time_str = match.group(1).upper().strip()
-                        end_time_str = match.group(2).upper().strip()
-                        
-                        # Parse start and end times to 24-hour format for comparison
-                        def parse_time_to_hour(time_str):
-                            """Convert time string like '9PM' or '7AM' to 24-hour integer."""
-                            time_str = time_str.upper().strip()
-                            # Extract hour
-                            hour_match = re.match(r'(\d{1,2})', time_str)
-                            if not hour_match:
-                                return None
-                            hour = int(hour_match.group(1))
-                            # Adjust for AM/PM
-                            if 'PM' in time_str and hour != 12:
-                                hour += 12
-                            elif 'AM' in time_str and hour == 12:
-                                hour = 0
-                            return hour
-                        
-                        start_hour = parse_time_to_hour(start_time_str)
-                        end_hour = parse_time_to_hour(end_time_str)
-                        
-                        if start_hour is not None and end_hour is not None:
-                            # Off-peak typically spans midnight (start > end in 24h format)
-                            # e.g., 9PM (21) - 7AM (7): 21 > 7 = off-peak
-                            # Peak typically doesn't span midnight
-                            # e.g., 7AM (7) - 9PM (21): 7 < 21 = peak
-                            if start_hour > end_hour:
-                                # Spans midnight - likely off-peak (night hours)
-                                is_offpeak = True
-                                _LOGGER.debug("Detected off-peak (spans midnight): %s - %s", start_time_str, end_time_str)
-                            elif start_hour >= 19 or end_hour <= 9:
-                                # Starts in evening or ends in morning - likely off-peak
-                                is_offpeak = True
-                                _LOGGER.debug("Detected off-peak (night hours): %s - %s", start_time_str, end_time_str)
-                            else:
-                                # Daytime hours - likely peak
-                                is_offpeak = False
-                                _LOGGER.debug("Detected peak (daytime hours): %s - %s", start_time_str, end_time_str)
-                    
-                    # Store the rate based on detected type
-                    if is_offpeak:
-                        self._bill_details["offpeak_rate_cents"] = float(price_str)
-                        self._bill_details["offpeak_rate"] = round(price, 4)
-                        _LOGGER.info("Off-peak rate: %s cents = $%.4f/kWh (%s)", price_str, price, description)
-                    else:
-                        # If no time pattern detected or determined to be peak
-                        # Only set peak rate if we found a time pattern or if peak rate not already set
-                        if match or self._bill_details["peak_rate"] == 0.0:
-                            self._bill_details["peak_rate_cents"] = float(price_str)
-                            self._bill_details["peak_rate"] = round(price, 4)
-                            _LOGGER.info("Peak rate: %s cents = $%.4f/kWh (%s)", price_str, price, description)
-                
-                # Parse fixed charges for daily charge
-                for charge in fixed_charges:
-                    if charge.get("LineItemType") == "ZCODLY":
-                        daily_price = charge.get("Price", "0")
-                        try:
-                            daily_charge = float(daily_price)
-                            self._bill_details["daily_charge"] = round(daily_charge, 3)
-                            _LOGGER.info("Daily charge: $%.3f/day", daily_charge)
-                        except (ValueError, TypeError):
-                            _LOGGER.warning("Failed to parse daily charge: %s", daily_price)
+                self._tariff = tariff
                 
                 _LOGGER.info(
                     "Retrieved bill details - Peak: $%.4f/kWh, Off-peak: $%.4f/kWh, Daily: $%.3f",
@@ -337,8 +612,6 @@ class ContactEnergyApi:
                 )
                 return True
             else:
-                print(f"❌ API returned status {response.status_code}")
-                print(f"Response: {response.text[:500]}")
                 _LOGGER.warning(
                     "Failed to fetch bill details: %s - %s", 
                     response.status_code,
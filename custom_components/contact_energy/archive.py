@@ -0,0 +1,254 @@
+"""Memory-mapped binary archive of Contact Energy hourly usage.
+
+Each contract has one file of fixed-width records, one per hour from the
+file's base hour, so the record of any hour is at a computed offset. Files
+are read through ``mmap``: a range is a slice of the mapping, decoded with
+``struct`` without copying or parsing text, so lookups take the same time
+however many years the file holds.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable
+import contextlib
+from datetime import datetime, timedelta, timezone
+import logging
+import mmap
+import os
+import struct
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .store import UsageRow
+
+# (hour, kwh, cost, offpeak_kwh, UTC offset in minutes); the source timestamp
+# is left to source_timestamp, for callers that need it
+ArchiveRow = tuple[int, float, float, float, int]
+
+_LOGGER = logging.getLogger(__name__)
+
+ARCHIVE_DIRNAME = "contact_energy_archive"
+
+# magic, version, record size, base hour (hours since the epoch)
+_HEADER = struct.Struct("<4sHHq")
+_MAGIC = b"CEAR"
+_VERSION = 1
+
+# kwh, cost, offpeak_kwh, UTC offset of the source timestamp in minutes, flags
+RECORD = struct.Struct("<dddhH4x")
+FLAG_PRESENT = 1
+FLAG_OFFPEAK = 2
+
+# New and prepended files start on a multiple of this many hours, so
+# backfilling older history rarely has to move the existing records
+_BASE_ALIGN = 8760
+
+
+def source_timestamp(hour: int, offset: int) -> str:
+    """Return the source timestamp of an hour in Contact's local time."""
+    return datetime.fromtimestamp(
+        hour, timezone(timedelta(minutes=offset))
+    ).isoformat()
+
+
+class _ContractFile:
+    """The archive file of one contract and its read-only mapping."""
+
+    def __init__(self, path: str) -> None:
+        """Open the file, which must exist with a valid header."""
+        self.path = path
+        self._file = open(path, "r+b")  # noqa: SIM115
+        magic, version, size, self.base = _HEADER.unpack(self._file.read(_HEADER.size))
+        if magic != _MAGIC or version != _VERSION or size != RECORD.size:
+            self._file.close()
+            raise ValueError(f"{path} is not a usage archive")
+        self._map: mmap.mmap | None = None
+        self._mapped = 0
+
+    @classmethod
+    def create(cls, path: str, base: int) -> _ContractFile:
+        """Create an empty file whose first record is the hour ``base``."""
+        with open(path, "wb") as file:
+            file.write(_HEADER.pack(_MAGIC, _VERSION, RECORD.size, base))
+        return cls(path)
+
+    @property
+    def hours(self) -> int:
+        """Return the number of records in the file."""
+        return (os.fstat(self._file.fileno()).st_size - _HEADER.size) // RECORD.size
+
+    def view(self, first: int, last: int) -> memoryview:
+        """Return the records of hour indexes ``[first, last)`` without copying."""
+        first = max(first - self.base, 0)
+        last = min(last - self.base, self.hours)
+        if last <= first:
+            return memoryview(b"")
+        size = _HEADER.size + self.hours * RECORD.size
+        if self._map is None or self._mapped != size:
+            # The file has grown since it was mapped
+            if self._map is not None:
+                self._map.close()
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            self._mapped = size
+        return memoryview(self._map)[
+            _HEADER.size + first * RECORD.size : _HEADER.size + last * RECORD.size
+        ]
+
+    def write(self, index: int, records: bytes) -> None:
+        """Write packed records starting at hour index ``index``."""
+        self._file.seek(_HEADER.size + (index - self.base) * RECORD.size)
+        self._file.write(records)
+        self._file.flush()
+
+    def close(self) -> None:
+        """Close the mapping and the file."""
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+
+
+class UsageArchive:
+    """Append-only hourly usage records per contract, read through mmap.
+
+    Hours after a file's last record extend it, revised hours are rewritten
+    in place, and hours before its base rewrite the file once with an
+    earlier base. Not thread safe; the caller serialises access.
+    """
+
+    def __init__(self, directory: str) -> None:
+        """Initialise the archive; the directory is created on first write."""
+        self._directory = directory
+        self._files: dict[str, _ContractFile] = {}
+
+    def _path(self, contract_id: str) -> str:
+        """Return the file of a contract."""
+        return os.path.join(self._directory, f"{contract_id}.bin")
+
+    def has(self, contract_id: str) -> bool:
+        """Return whether the contract has an archive file."""
+        return contract_id in self._files or os.path.exists(self._path(contract_id))
+
+    def _file(self, contract_id: str) -> _ContractFile | None:
+        """Return the open file of a contract, if it has one."""
+        contract_file = self._files.get(contract_id)
+        if contract_file is None and os.path.exists(self._path(contract_id)):
+            contract_file = self._files[contract_id] = _ContractFile(
+                self._path(contract_id)
+            )
+        return contract_file
+
+    def _rebase(self, contract_id: str, contract_file: _ContractFile, base: int) -> _ContractFile:
+        """Rewrite a contract's file to start at the earlier hour ``base``."""
+        tmp_path = f"{contract_file.path}.tmp"
+        old = contract_file.view(contract_file.base, contract_file.base + contract_file.hours)
+        with open(tmp_path, "wb") as file:
+            file.write(_HEADER.pack(_MAGIC, _VERSION, RECORD.size, base))
+            file.write(bytes((contract_file.base - base) * RECORD.size))
+            file.write(old)
+        old.release()
+        contract_file.close()
+        os.replace(tmp_path, contract_file.path)
+        _LOGGER.debug("Rebased usage archive of %s to hour %d", contract_id, base)
+        contract_file = self._files[contract_id] = _ContractFile(contract_file.path)
+        return contract_file
+
+    def write(self, contract_id: str, rows: Iterable[UsageRow]) -> int:
+        """Write hourly rows for a contract, returning the row count."""
+        records = {}
+        for hour, value, dollar_value, offpeak_value, source_ts in rows:
+            offset = datetime.fromisoformat(source_ts).utcoffset()
+            flags = FLAG_PRESENT | (FLAG_OFFPEAK if offpeak_value > 0 else 0)
+            records[hour // 3600] = RECORD.pack(
+                value,
+                dollar_value,
+                offpeak_value,
+                int(offset.total_seconds() // 60) if offset else 0,
+                flags,
+            )
+        if not records:
+            return 0
+
+        first = min(records)
+        base = first - first % _BASE_ALIGN
+        contract_file = self._file(contract_id)
+        if contract_file is None:
+            os.makedirs(self._directory, exist_ok=True)
+            contract_file = self._files[contract_id] = _ContractFile.create(
+                self._path(contract_id), base
+            )
+        elif first < contract_file.base:
+            contract_file = self._rebase(contract_id, contract_file, base)
+
+        # Write each run of consecutive hours at once; hours past the end of
+        # the file leave unwritten records zeroed, which reads as missing
+        run_start = previous = None
+        run: list[bytes] = []
+        for index in sorted(records):
+            if previous is not None and index != previous + 1:
+                contract_file.write(run_start, b"".join(run))
+                run = []
+            if not run:
+                run_start = index
+            run.append(records[index])
+            previous = index
+        contract_file.write(run_start, b"".join(run))
+        return len(records)
+
+    def get_range(self, contract_id: str, start: int, end: int) -> list[ArchiveRow]:
+        """Return the records with ``start <= hour < end``, ordered by hour."""
+        contract_file = self._file(contract_id)
+        if contract_file is None:
+            return []
+        first = -(-start // 3600)
+        last = -(-end // 3600)
+        view = contract_file.view(first, last)
+        index = max(first, contract_file.base)
+        rows = []
+        for kwh, cost, offpeak_kwh, offset, flags in RECORD.iter_unpack(view):
+            if flags & FLAG_PRESENT:
+                rows.append((index * 3600, kwh, cost, offpeak_kwh, offset))
+            index += 1
+        view.release()
+        return rows
+
+    def count_hours(self, contract_id: str, start: int, end: int) -> int:
+        """Return how many hours in ``[start, end)`` are archived."""
+        contract_file = self._file(contract_id)
+        if contract_file is None:
+            return 0
+        view = contract_file.view(-(-start // 3600), -(-end // 3600))
+        count = sum(
+            1 for record in RECORD.iter_unpack(view) if record[4] & FLAG_PRESENT
+        )
+        view.release()
+        return count
+
+    def latest_hour(self, contract_id: str) -> int | None:
+        """Return the most recent archived hour for a contract."""
+        contract_file = self._file(contract_id)
+        if contract_file is None:
+            return None
+        last = contract_file.base + contract_file.hours
+        view = contract_file.view(contract_file.base, last)
+        latest = None
+        for index in range(len(view) // RECORD.size - 1, -1, -1):
+            if RECORD.unpack_from(view, index * RECORD.size)[4] & FLAG_PRESENT:
+                latest = (contract_file.base + index) * 3600
+                break
+        view.release()
+        return latest
+
+    def discard(self, contract_id: str) -> None:
+        """Delete a contract's file, e.g. after a failed write left it partial."""
+        if contract_file := self._files.pop(contract_id, None):
+            contract_file.close()
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(self._path(contract_id))
+        _LOGGER.warning("Discarded the usage archive of %s", contract_id)
+
+    def close(self) -> None:
+        """Close every open file."""
+        for contract_file in self._files.values():
+            contract_file.close()
+        self._files = {}
@@ -0,0 +1,124 @@
+"""In-memory LRU cache of parsed Contact Energy usage days."""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from datetime import date, timedelta
+import logging
+import sys
+import threading
+import time
+from typing import Any
+
+_LOGGER = logging.getLogger(__name__)
+
+DEFAULT_CACHE_ENTRIES = 256
+DEFAULT_CACHE_BYTES = 4 * 1024 * 1024
+
+# Days this recent can still be filled in or revised by Contact, so they are
+# only reused for a while; older days are final and kept until evicted
+RECENT_DAYS = 7
+RECENT_TTL = 15 * 60
+
+# (contract ID, day as YYYY-MM-DD)
+CacheKey = tuple[str, str]
+
+
+def _sizeof(rows: list, sold: list) -> int:
+    """Return the approximate memory held by a day's rows."""
+    size = sys.getsizeof(rows) + sys.getsizeof(sold)
+    for row in rows:
+        size += sys.getsizeof(row) + sum(sys.getsizeof(value) for value in row)
+    for row in sold:
+        size += sys.getsizeof(row) + sum(sys.getsizeof(value) for value in row)
+    return size
+
+
+class UsageCache:
+    """Parsed hourly usage of whole days, evicted least recently used first.
+
+    Bounded by both an entry count and an approximate byte size, whichever
+    is reached first. Entries hold the projected rows and exported kWh of a
+    day, so a hit needs neither the network nor the JSON decoder. Thread safe.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_CACHE_ENTRIES,
+        max_bytes: int = DEFAULT_CACHE_BYTES,
+        ttl: float = RECENT_TTL,
+    ) -> None:
+        """Initialise an empty cache."""
+        self._max_entries = max_entries
+        self._max_bytes = max_bytes
+        self._ttl = ttl
+        self._lock = threading.Lock()
+        # key -> (rows, sold, size, expiry or None)
+        self._entries: OrderedDict[CacheKey, tuple[list, list, int, float | None]] = (
+            OrderedDict()
+        )
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+
+    def get(self, key: CacheKey) -> tuple[list, list] | None:
+        """Return copies of a day's rows and exported kWh, or None on a miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[3] is not None and entry[3] <= time.monotonic():
+                self._discard(key)
+                self._expirations += 1
+                entry = None
+            if entry is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return list(entry[0]), list(entry[1])
+
+    def put(self, key: CacheKey, rows: list, sold: list) -> None:
+        """Keep a day's rows, evicting the least recently used days to make room."""
+        size = _sizeof(rows, sold)
+        if size > self._max_bytes or self._max_entries <= 0:
+            return
+        expiry = None
+        if date.fromisoformat(key[1]) >= date.today() - timedelta(days=RECENT_DAYS):
+            expiry = time.monotonic() + self._ttl
+        with self._lock:
+            self._discard(key)
+            self._entries[key] = (list(rows), list(sold), size, expiry)
+            self._bytes += size
+            while len(self._entries) > self._max_entries or self._bytes > self._max_bytes:
+                self._discard(next(iter(self._entries)))
+                self._evictions += 1
+
+    def _discard(self, key: CacheKey) -> None:
+        """Remove an entry if present; the lock must be held."""
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[2]
+
+    def clear(self, contract_id: str | None = None) -> None:
+        """Drop every cached day, or only those of one contract."""
+        with self._lock:
+            for key in [key for key in self._entries if contract_id in (None, key[0])]:
+                self._discard(key)
+
+    @property
+    def stats(self) -> dict[str, Any]:
+        """Return the size and hit, miss, eviction and expiry counts."""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": self._max_entries,
+                "max_bytes": self._max_bytes,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / lookups, 3) if lookups else None,
+                "evictions": self._evictions,
+                "expirations": self._expirations,
+            }
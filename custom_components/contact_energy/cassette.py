@@ -0,0 +1,206 @@
+"""Record and replay Contact Energy API responses.
+
+A cassette captures every request ``ContactEnergyApi`` sends and the
+response it gets back, with credentials, tokens and account identifiers
+replaced by stable placeholders. Replaying it answers the same requests
+offline, either as fast as possible or with the recorded latency, so
+refresh and backfill runs can be repeated against real payload shapes.
+
+Usage::
+
+    with Cassette("login_and_backfill.json", RECORD) as cassette:
+        api.use_cassette(cassette)
+        api.login()
+        api.get_usage_range("2025-01-01", "2025-01-31")
+
+    api = ContactEnergyApi("user@example.com", "password")
+    api.use_cassette(Cassette("login_and_backfill.json", REPLAY))
+"""
+
+from __future__ import annotations
+
+from collections import defaultdict, deque
+import contextlib
+import json
+import logging
+import threading
+import time
+from typing import Any
+
+import requests
+
+_LOGGER = logging.getLogger(__name__)
+
+RECORD = "record"
+REPLAY = "replay"
+
+CASSETTE_VERSION = 1
+
+# JSON keys whose string values are replaced wherever they appear
+SENSITIVE_KEYS = {
+    "username",
+    "password",
+    "email",
+    "emailAddress",
+    "token",
+    "session",
+    "bp",
+    "businessPartner",
+    "id",
+    "accountId",
+    "contractId",
+    "premiseId",
+    "icp",
+    "firstName",
+    "lastName",
+    "address",
+    "phone",
+    "mobile",
+}
+
+# Shorter values (flags, small numbers) are too likely to match unrelated text
+_MIN_REDACT_LENGTH = 4
+
+
+class CassetteError(requests.exceptions.RequestException):
+    """Error to indicate a request has no recorded response to replay."""
+
+
+class Cassette:
+    """A file of sanitised request/response pairs, recorded or replayed."""
+
+    def __init__(self, path: str, mode: str = REPLAY, realtime: bool = False) -> None:
+        """Initialise the cassette; in replay mode it is loaded from ``path``.
+
+        With ``realtime``, replayed responses take as long as they did when
+        recorded; otherwise they return immediately.
+        """
+        if mode not in (RECORD, REPLAY):
+            raise ValueError(f"mode must be {RECORD} or {REPLAY}")
+        self._path = path
+        self._mode = mode
+        self._realtime = realtime
+        self._lock = threading.Lock()
+        self._started = time.monotonic()
+        self._interactions: list[dict[str, Any]] = []
+        self._placeholders: dict[str, str] = {}
+        self._counters: dict[str, int] = defaultdict(int)
+        self._queues: dict[tuple[str, str], deque] = defaultdict(deque)
+        if mode == REPLAY:
+            self._load()
+
+    @property
+    def replaying(self) -> bool:
+        """Return whether requests are answered from the cassette."""
+        return self._mode == REPLAY
+
+    def __enter__(self) -> Cassette:
+        """Return the cassette."""
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        """Save a recorded cassette."""
+        if self._mode == RECORD:
+            self.save()
+
+    def _load(self) -> None:
+        """Load the interactions to replay."""
+        with open(self._path, encoding="utf-8") as file:
+            data = json.load(file)
+        self._interactions = data["interactions"]
+        for interaction in self._interactions:
+            key = (interaction["method"], interaction["url"])
+            self._queues[key].append(interaction)
+        _LOGGER.debug(
+            "Loaded %d interactions from %s", len(self._interactions), self._path
+        )
+
+    def save(self) -> None:
+        """Write the recorded interactions to the cassette file.
+
+        Redaction happens here, once every sensitive value seen during the
+        recording is known, so identifiers that first turn up in a later
+        response are still replaced in earlier ones.
+        """
+        with self._lock:
+            data = {
+                "version": CASSETTE_VERSION,
+                "interactions": [
+                    {
+                        **interaction,
+                        "url": self._redact(interaction["url"]),
+                        "body": self._redact(interaction["body"]),
+                    }
+                    for interaction in self._interactions
+                ],
+            }
+        with open(self._path, "w", encoding="utf-8") as file:
+            json.dump(data, file, indent=1)
+        _LOGGER.debug("Saved %d interactions to %s", len(data["interactions"]), self._path)
+
+    def _collect(self, value: Any, key: str | None = None) -> None:
+        """Give every sensitive string in a decoded JSON value a placeholder."""
+        if isinstance(value, dict):
+            for child_key, child in value.items():
+                self._collect(child, child_key)
+        elif isinstance(value, list):
+            for child in value:
+                self._collect(child, key)
+        elif (
+            key in SENSITIVE_KEYS
+            and isinstance(value, str)
+            and len(value) >= _MIN_REDACT_LENGTH
+            and value not in self._placeholders
+        ):
+            self._counters[key] += 1
+            self._placeholders[value] = f"{key.upper()}_{self._counters[key]}"
+
+    def _redact(self, text: str) -> str:
+        """Replace every known sensitive value in ``text``, longest first."""
+        for value in sorted(self._placeholders, key=len, reverse=True):
+            text = text.replace(value, self._placeholders[value])
+        return text
+
+    def record(
+        self,
+        method: str,
+        url: str,
+        request_json: Any,
+        response: requests.Response,
+        elapsed: float,
+    ) -> None:
+        """Add a request and its response to the cassette."""
+        body = response.text
+        with self._lock:
+            if request_json is not None:
+                self._collect(request_json)
+            with contextlib.suppress(ValueError):
+                self._collect(json.loads(body))
+            self._interactions.append({
+                "method": method.lower(),
+                "url": url,
+                "offset": round(time.monotonic() - self._started, 3),
+                "elapsed": round(elapsed, 3),
+                "status": response.status_code,
+                "content_type": response.headers.get("Content-Type", ""),
+                "body": body,
+            })
+
+    def play(self, method: str, url: str) -> requests.Response:
+        """Return the next recorded response to ``method`` ``url``."""
+        with self._lock:
+            queue = self._queues.get((method.lower(), url))
+            if not queue:
+                raise CassetteError(f"No recorded response for {method.upper()} {url}")
+            interaction = queue.popleft()
+
+        if self._realtime:
+            time.sleep(interaction["elapsed"])
+
+        response = requests.Response()
+        response.status_code = interaction["status"]
+        response.url = url
+        response.encoding = "utf-8"
+        response.headers["Content-Type"] = interaction["content_type"]
+        response._content = interaction["body"].encode("utf-8")
+        return response
@@ -0,0 +1,326 @@
+"""Command-line bulk exporter for Contact Energy usage.
+
+Runs outside Home Assistant on the same API client, rate limiter and local
+store as the integration. Use ``scripts/export``, which loads these modules
+without the Home Assistant parts of the package::
+
+    scripts/export accounts
+    scripts/export export --start 2022-01-01 --format sqlite --output usage.db
+
+Credentials come from ``--email`` or ``CONTACT_ENERGY_EMAIL`` and from
+``CONTACT_ENERGY_PASSWORD`` (prompted for when unset). Exports resume from
+the last day the output holds, so an interrupted run can be repeated.
+"""
+
+from __future__ import annotations
+
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+import csv
+from datetime import date, timedelta
+import getpass
+import json
+import logging
+import os
+from pathlib import Path
+import sys
+
+from .api import EXPORT_FIELDS, ContactEnergyApi, export_record
+from .cassette import RECORD, REPLAY, Cassette
+from .store import UsageRow, UsageStore
+
+_LOGGER = logging.getLogger(__name__)
+
+EXPORT_FORMATS = ["csv", "ndjson", "sqlite"]
+
+DEFAULT_CONCURRENCY = 4
+# Days fetched per range request
+CHUNK_DAYS = 14
+
+
+def _chunks(start: date, end: date) -> list[tuple[date, date]]:
+    """Split ``start`` to ``end`` inclusive into ranges of at most CHUNK_DAYS."""
+    chunks = []
+    while start <= end:
+        last = min(start + timedelta(days=CHUNK_DAYS - 1), end)
+        chunks.append((start, last))
+        start = last + timedelta(days=1)
+    return chunks
+
+
+def _tail_lines(path: Path) -> list[tuple[int, bytes]]:
+    """Return the complete lines in the tail of a file with their byte offsets."""
+    with open(path, "rb") as file:
+        file.seek(0, os.SEEK_END)
+        offset = max(file.tell() - 65536, 0)
+        file.seek(offset)
+        lines = file.read().splitlines(keepends=True)
+    if offset and lines:
+        # The first line of a tail read from mid-file is usually cut short
+        offset += len(lines.pop(0))
+    tail = []
+    for line in lines:
+        tail.append((offset, line))
+        offset += len(line)
+    return tail
+
+
+class _FileWriter:
+    """Append export records to one CSV or NDJSON file per contract."""
+
+    def __init__(self, output: Path, export_format: str, per_contract: bool) -> None:
+        """Initialise the writer."""
+        self._output = output
+        self._format = export_format
+        self._per_contract = per_contract
+
+    def _path(self, contract_id: str) -> Path:
+        """Return the file a contract is written to."""
+        if not self._per_contract:
+            return self._output
+        return self._output.with_name(
+            f"{self._output.stem}_{contract_id}{self._output.suffix}"
+        )
+
+    def _day(self, line: bytes) -> date | None:
+        """Return the day of an export record line, or None for any other line."""
+        try:
+            text = line.decode("utf-8")
+            if self._format == "csv":
+                day = next(csv.DictReader([",".join(EXPORT_FIELDS), text]))["date"]
+            else:
+                day = json.loads(text)["date"]
+            return date.fromisoformat(day)
+        except (KeyError, TypeError, ValueError, StopIteration):
+            # Only a header, a blank line or a line cut short by an interrupted run
+            return None
+
+    def resume_from(self, contract_id: str, start: date) -> date:
+        """Return the last day in the contract's file, which is refetched.
+
+        That day may have been partial, so its rows, and anything after
+        them, are removed from the file before it is written again.
+        """
+        path = self._path(contract_id)
+        if not path.exists():
+            return start
+        last = cut = None
+        for offset, line in reversed(_tail_lines(path)):
+            day = self._day(line)
+            if last is None:
+                if day is None:
+                    continue
+                last = day
+            elif day != last:
+                break
+            cut = offset
+        if last is None or last < start:
+            return start
+        with open(path, "r+b") as file:
+            file.truncate(cut)
+        return last
+
+    def write(self, contract_id: str, rows: list[UsageRow]) -> None:
+        """Append rows to the contract's file."""
+        path = self._path(contract_id)
+        new = not path.exists() or path.stat().st_size == 0
+        with open(path, "a", newline="", encoding="utf-8") as file:
+            if self._format == "csv":
+                writer = csv.DictWriter(file, fieldnames=EXPORT_FIELDS)
+                if new:
+                    writer.writeheader()
+                writer.writerows(export_record(row) for row in rows)
+            else:
+                file.writelines(json.dumps(export_record(row)) + "\n" for row in rows)
+
+    def close(self) -> None:
+        """Nothing to close; files are opened per write."""
+
+
+class _SqliteWriter:
+    """Upsert rows into a local usage store shared by every contract."""
+
+    def __init__(self, output: Path) -> None:
+        """Initialise the writer."""
+        self._store = UsageStore(str(output))
+
+    def resume_from(self, contract_id: str, start: date) -> date:
+        """Return the last stored day, which is refetched in case it was partial."""
+        latest = self._store.latest_hour(contract_id)
+        if latest is None:
+            return start
+        source_ts = self._store.get_range(contract_id, latest, latest + 1)[0][4]
+        return max(start, date.fromisoformat(source_ts[:10]))
+
+    def write(self, contract_id: str, rows: list[UsageRow]) -> None:
+        """Upsert rows for the contract."""
+        self._store.upsert(contract_id, rows)
+
+    def close(self) -> None:
+        """Close the store."""
+        self._store.close()
+
+
+def _export_contract(
+    api: ContactEnergyApi,
+    writer: _FileWriter | _SqliteWriter,
+    start: date,
+    end: date,
+    concurrency: int,
+) -> bool:
+    """Export one contract's usage and return whether every chunk succeeded.
+
+    Chunks are fetched concurrently but written in order, so the output is
+    always a contiguous prefix of the range and can be resumed.
+    """
+    contract_id = api._contractId
+    start = writer.resume_from(contract_id, start)
+    chunks = _chunks(start, end)
+    if not chunks:
+        _LOGGER.info("Contract %s is already exported to %s", contract_id, end)
+        return True
+    _LOGGER.info(
+        "Exporting contract %s from %s to %s in %d requests",
+        contract_id,
+        start,
+        end,
+        len(chunks),
+    )
+
+    def _fetch(chunk: tuple[date, date]) -> list[UsageRow] | bool:
+        return api.get_usage_range(chunk[0].isoformat(), chunk[1].isoformat())
+
+    written = 0
+    pool = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="export")
+    try:
+        for (first, last), rows in zip(chunks, pool.map(_fetch, chunks)):
+            if rows is False:
+                _LOGGER.error(
+                    "Stopped contract %s at %s; run again to resume", contract_id, first
+                )
+                return False
+            if rows:
+                writer.write(contract_id, rows)
+                written += len(rows)
+            _LOGGER.info("%s: %s to %s, %d hours", contract_id, first, last, len(rows))
+    finally:
+        pool.shutdown(cancel_futures=True)
+
+    _LOGGER.info("Exported %d hours for contract %s", written, contract_id)
+    return True
+
+
+def _parse_args(argv: list[str] | None) -> argparse.Namespace:
+    """Parse the command line."""
+    parser = argparse.ArgumentParser(
+        prog="export", description="Bulk export Contact Energy usage."
+    )
+    parser.add_argument(
+        "--email", default=os.environ.get("CONTACT_ENERGY_EMAIL"), help="account email"
+    )
+    parser.add_argument("--record", metavar="CASSETTE", help="record API responses")
+    parser.add_argument("--replay", metavar="CASSETTE", help="replay API responses")
+    parser.add_argument("-v", "--verbose", action="store_true", help="debug logging")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    commands.add_parser("accounts", help="list the accounts and contracts")
+
+    export = commands.add_parser("export", help="export hourly usage")
+    export.add_argument("--start", type=date.fromisoformat, required=True)
+    export.add_argument(
+        "--end",
+        type=date.fromisoformat,
+        default=date.today() - timedelta(days=1),
+        help="last day to export (default: yesterday)",
+    )
+    export.add_argument(
+        "--contract",
+        action="append",
+        help="contract or account ID to export; repeat for several (default: all)",
+    )
+    export.add_argument("--format", choices=EXPORT_FORMATS, default="csv")
+    export.add_argument("--output", type=Path, required=True)
+    export.add_argument(
+        "--concurrency",
+        type=int,
+        default=DEFAULT_CONCURRENCY,
+        help=f"requests in flight per contract (default: {DEFAULT_CONCURRENCY})",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Run the exporter and return the exit status."""
+    args = _parse_args(argv)
+    logging.basicConfig(
+        level=logging.DEBUG if args.verbose else logging.INFO,
+        format="%(asctime)s %(levelname)s %(message)s",
+        stream=sys.stderr,
+    )
+
+    if not args.email:
+        _LOGGER.error("Pass --email or set CONTACT_ENERGY_EMAIL")
+        return 2
+    password = os.environ.get("CONTACT_ENERGY_PASSWORD") or (
+        "" if args.replay else getpass.getpass("Contact Energy password: ")
+    )
+
+    api = ContactEnergyApi(args.email, password)
+    cassette = None
+    if args.record or args.replay:
+        try:
+            cassette = Cassette(
+                args.record or args.replay, RECORD if args.record else REPLAY
+            )
+        except (OSError, ValueError, KeyError) as e:
+            _LOGGER.error("Cannot read cassette %s: %s", args.replay, e)
+            return 2
+        api.use_cassette(cassette)
+
+    try:
+        if not api.login():
+            _LOGGER.error("Failed to login to Contact Energy API")
+            return 1
+
+        contracts = api._contracts or [
+            {"account_id": api._accountId, "contract_id": api._contractId, "premise_id": ""}
+        ]
+        if args.command == "accounts":
+            for contract in contracts:
+                sys.stdout.write(
+                    f"{contract['account_id']}\t{contract['contract_id']}\t"
+                    f"{contract['premise_id']}\n"
+                )
+            return 0
+
+        if args.contract:
+            contracts = [
+                contract
+                for contract in contracts
+                if contract["contract_id"] in args.contract
+                or contract["account_id"] in args.contract
+            ]
+        if not contracts:
+            _LOGGER.error("No matching contracts found")
+            return 1
+
+        if args.format == "sqlite":
+            writer = _SqliteWriter(args.output)
+        else:
+            writer = _FileWriter(args.output, args.format, len(contracts) > 1)
+        try:
+            ok = True
+            for contract in contracts:
+                ok &= _export_contract(
+                    api.for_contract(contract["account_id"], contract["contract_id"]),
+                    writer,
+                    args.start,
+                    args.end,
+                    max(args.concurrency, 1),
+                )
+        finally:
+            writer.close()
+        return 0 if ok else 1
+    finally:
+        if args.record and cassette:
+            cassette.save()
@@ -13,7 +13,20 @@ from homeassistant.core import HomeAssistant
 from homeassistant.exceptions import HomeAssistantError
 
 from .api import ContactEnergyApi
-from .const import DOMAIN, CONF_USAGE_DAYS, CONF_PEAK_RATE, CONF_OFFPEAK_RATE
+from .const import (
+    DOMAIN,
+    CONF_USAGE_DAYS,
+    CONF_PEAK_RATE,
+    CONF_OFFPEAK_RATE,
+    CONF_LOCAL_STORE,
+    CONF_EXECUTOR_WORKERS,
+    CONF_SESSION,
+    CONF_SOLD,
+    CONF_TRACE,
+    CONF_USAGE_CACHE_MB,
+)
+from .cache import DEFAULT_CACHE_BYTES
+from .executor import DEFAULT_EXECUTOR_WORKERS
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -45,8 +58,9 @@ async def validate_input(hass: HomeAssistant, data: dict[str, Any]) -> dict[str,
     """
     api = ContactEnergyApi(data[CONF_EMAIL], data[CONF_PASSWORD])
 
-    # Run the blocking login call in executor
-    login_success = await hass.async_add_executor_job(api.login)
+    # Run the blocking login call in executor; the plan and bill are not
+    # needed to validate the credentials
+    login_success = await hass.async_add_executor_job(api.login, False)
 
     if not login_success:
         raise InvalidAuth
@@ -56,6 +70,7 @@ async def validate_input(hass: HomeAssistant, data: dict[str, Any]) -> dict[str,
         "title": f"Contact Energy ({data[CONF_EMAIL]})",
         "account_id": api._accountId,
         "contract_id": api._contractId,
+        "session": api.session,
     }
 
 
@@ -90,7 +105,11 @@ class ContactEnergyConfigFlow(ConfigFlow, domain=DOMAIN):
                 await self.async_set_unique_id(user_input[CONF_EMAIL].lower())
                 self._abort_if_unique_id_configured()
 
-                return self.async_create_entry(title=info["title"], data=user_input)
+                # Saved so the first start reuses this session instead of logging in
+                return self.async_create_entry(
+                    title=info["title"],
+                    data={**user_input, CONF_SESSION: info["session"]},
+                )
 
         return self.async_show_form(
             step_id="user",
@@ -147,6 +166,15 @@ class ContactEnergyOptionsFlow(OptionsFlow):
         current_usage_days = self.config_entry.data.get(CONF_USAGE_DAYS, DEFAULT_USAGE_DAYS)
         current_peak_rate = self.config_entry.data.get(CONF_PEAK_RATE)
         current_offpeak_rate = self.config_entry.data.get(CONF_OFFPEAK_RATE)
+        current_local_store = self.config_entry.options.get(CONF_LOCAL_STORE, False)
+        current_executor_workers = self.config_entry.options.get(
+            CONF_EXECUTOR_WORKERS, DEFAULT_EXECUTOR_WORKERS
+        )
+        current_trace = self.config_entry.options.get(CONF_TRACE, False)
+        current_sold = self.config_entry.options.get(CONF_SOLD, False)
+        current_cache_mb = self.config_entry.options.get(
+            CONF_USAGE_CACHE_MB, DEFAULT_CACHE_BYTES // 2**20
+        )
 
         options_schema = vol.Schema({
             vol.Optional(
@@ -161,6 +189,26 @@ class ContactEnergyOptionsFlow(OptionsFlow):
                 CONF_OFFPEAK_RATE,
                 default=current_offpeak_rate
             ): vol.All(vol.Coerce(float), vol.Range(min=0.0, max=5.0)),
+            vol.Optional(
+                CONF_LOCAL_STORE,
+                default=current_local_store
+            ): bool,
+            vol.Optional(
+                CONF_EXECUTOR_WORKERS,
+                default=current_executor_workers
+            ): vol.All(vol.Coerce(int), vol.Range(min=1, max=16)),
+            vol.Optional(
+                CONF_TRACE,
+                default=current_trace
+            ): bool,
+            vol.Optional(
+                CONF_SOLD,
+                default=current_sold
+            ): bool,
+            vol.Optional(
+                CONF_USAGE_CACHE_MB,
+                default=current_cache_mb
+            ): vol.All(vol.Coerce(int), vol.Range(min=0, max=64)),
         })
 
         return self.async_show_form(
@@ -18,6 +18,12 @@ CONF_SHOW_HOURLY = "show_hourly"
 CONF_DATE_FORMAT = "date_format"
 CONF_TIME_FORMAT = "time_format"
 CONF_HOURLY_OFFSET_DAYS = "hourly_offset_days"
+CONF_LOCAL_STORE = "local_store"
+CONF_EXECUTOR_WORKERS = "executor_workers"
+CONF_SESSION = "session"
+CONF_TRACE = "trace"
+CONF_USAGE_CACHE_MB = "usage_cache_mb"
+CONF_STATISTICS_SUFFIX = "statistics_suffix"
 
 MONITORED_CONDITIONS_DEFAULT = [
     "is_retail_customer",
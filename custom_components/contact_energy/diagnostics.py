@@ -0,0 +1,46 @@
+"""Diagnostics support for Contact Energy."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_EMAIL, CONF_PASSWORD
+from homeassistant.core import HomeAssistant
+
+from .const import CONF_SESSION, DOMAIN
+from .ratelimit import CIRCUIT_BREAKER
+
+TO_REDACT = {CONF_EMAIL, CONF_PASSWORD, CONF_SESSION}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    entry_data = hass.data[DOMAIN][entry.entry_id]
+    api = entry_data["api"]
+
+    diagnostics: dict[str, Any] = {
+        "entry": {
+            "data": async_redact_data(entry.data, TO_REDACT),
+            "options": dict(entry.options),
+        },
+        "executor": entry_data["executor"].metrics,
+        "circuit_breaker": CIRCUIT_BREAKER.state,
+        "local_store": entry_data.get("store") is not None,
+        "trace_file": entry_data["tracer"].path,
+    }
+    if api.usage_cache:
+        diagnostics["usage_cache"] = api.usage_cache.stats
+    if tariffs := entry_data.get("tariffs"):
+        diagnostics["tariffs"] = tariffs.tariffs
+    if retry_queue := entry_data.get("retry_queue"):
+        diagnostics["pending_retries"] = retry_queue.pending
+    if gap_index := entry_data.get("gap_index"):
+        completeness = gap_index.completeness(api._contractId)
+        if completeness:
+            diagnostics["data_completeness"] = completeness[0]
+            diagnostics["missing_hours"] = completeness[1]
+    return diagnostics
@@ -0,0 +1,78 @@
+"""Shape-preserving downsampling of hourly Contact Energy series."""
+
+from __future__ import annotations
+
+Point = tuple[int, float]
+
+DOWNSAMPLE_METHODS = ["lttb", "minmax"]
+
+
+def lttb(points: list[Point], threshold: int) -> list[Point]:
+    """Reduce ``points`` to ``threshold`` with Largest-Triangle-Three-Buckets.
+
+    The first and last points are always kept; from each bucket in between,
+    the point forming the largest triangle with the previously kept point and
+    the average of the next bucket is chosen, so peaks and troughs survive.
+    """
+    size = len(points)
+    if threshold >= size or threshold < 3:
+        return list(points)
+
+    sampled = [points[0]]
+    every = (size - 2) / (threshold - 2)
+    kept = 0
+    for i in range(threshold - 2):
+        # Average of the next bucket, the third corner of the triangle
+        next_start = int((i + 1) * every) + 1
+        next_end = min(int((i + 2) * every) + 1, size)
+        count = next_end - next_start
+        avg_x = sum(points[j][0] for j in range(next_start, next_end)) / count
+        avg_y = sum(points[j][1] for j in range(next_start, next_end)) / count
+
+        kept_x, kept_y = points[kept]
+        best = -1.0
+        chosen = next_start - 1
+        for j in range(int(i * every) + 1, next_start):
+            x, y = points[j]
+            area = abs((kept_x - avg_x) * (y - kept_y) - (kept_x - x) * (avg_y - kept_y))
+            if area > best:
+                best = area
+                chosen = j
+        sampled.append(points[chosen])
+        kept = chosen
+
+    sampled.append(points[-1])
+    return sampled
+
+
+def minmax(points: list[Point], threshold: int) -> list[Point]:
+    """Reduce ``points`` to about ``threshold`` by keeping each bucket's extremes.
+
+    Points are split into ``threshold // 2`` buckets and the minimum and
+    maximum of each are kept in time order.
+    """
+    size = len(points)
+    buckets = threshold // 2
+    if threshold >= size or buckets < 1:
+        return list(points)
+
+    sampled: list[Point] = []
+    every = size / buckets
+    for i in range(buckets):
+        bucket = points[int(i * every) : int((i + 1) * every)]
+        if not bucket:
+            continue
+        low = min(bucket, key=lambda point: point[1])
+        high = max(bucket, key=lambda point: point[1])
+        if low is high:
+            sampled.append(low)
+        else:
+            sampled.extend(sorted((low, high)))
+    return sampled
+
+
+def downsample(points: list[Point], threshold: int, method: str = "lttb") -> list[Point]:
+    """Downsample ``points`` to at most ``threshold`` with ``method``."""
+    if method == "minmax":
+        return minmax(points, threshold)
+    return lttb(points, threshold)
@@ -0,0 +1,114 @@
+"""Dedicated thread pool for blocking Contact Energy work."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+import contextvars
+import logging
+import threading
+import time
+from typing import Any, TypeVar
+
+_LOGGER = logging.getLogger(__name__)
+
+DEFAULT_EXECUTOR_WORKERS = 4
+
+_T = TypeVar("_T")
+
+
+class ContactEnergyExecutor:
+    """Bounded thread pool for the integration's network, parse and file work.
+
+    Keeps long imports and concurrent refreshes from tying up Home
+    Assistant's shared executor, and tracks queue depth and wait times.
+    """
+
+    def __init__(self, max_workers: int = DEFAULT_EXECUTOR_WORKERS) -> None:
+        """Initialise the pool."""
+        self._max_workers = max_workers
+        self._pool = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="contact_energy"
+        )
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._running = 0
+        self._completed = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._wait_last = 0.0
+
+    async def async_run(self, func: Callable[..., _T], *args: Any) -> _T:
+        """Run ``func(*args)`` in the pool and return its result.
+
+        The caller's context variables are carried into the worker thread, so
+        spans started there nest under the caller's span.
+        """
+        submitted = time.monotonic()
+        dequeued = False
+        with self._lock:
+            self._queued += 1
+
+        def _run() -> _T:
+            nonlocal dequeued
+            waited = time.monotonic() - submitted
+            with self._lock:
+                if not dequeued:
+                    dequeued = True
+                    self._queued -= 1
+                self._running += 1
+                self._wait_total += waited
+                self._wait_max = max(self._wait_max, waited)
+                self._wait_last = waited
+            try:
+                return func(*args)
+            finally:
+                with self._lock:
+                    self._running -= 1
+                    self._completed += 1
+
+        context = contextvars.copy_context()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(
+                self._pool, context.run, _run
+            )
+        except asyncio.CancelledError:
+            # Work cancelled before a thread picked it up never runs _run
+            with self._lock:
+                if not dequeued:
+                    dequeued = True
+                    self._queued -= 1
+            raise
+
+    @property
+    def metrics(self) -> dict[str, Any]:
+        """Return queue depth and wait time metrics."""
+        with self._lock:
+            started = self._completed + self._running
+            return {
+                "max_workers": self._max_workers,
+                "queue_depth": self._queued,
+                "running": self._running,
+                "completed": self._completed,
+                "wait_avg_ms": round(1000 * self._wait_total / started, 1) if started else 0.0,
+                "wait_max_ms": round(1000 * self._wait_max, 1),
+                "wait_last_ms": round(1000 * self._wait_last, 1),
+            }
+
+    def grow(self, max_workers: int) -> None:
+        """Raise the pool to ``max_workers`` threads; work already queued still runs."""
+        with self._lock:
+            if max_workers <= self._max_workers:
+                return
+            pool = self._pool
+            self._max_workers = max_workers
+            self._pool = ThreadPoolExecutor(
+                max_workers=max_workers, thread_name_prefix="contact_energy"
+            )
+        pool.shutdown(wait=False)
+
+    def shutdown(self) -> None:
+        """Stop the pool, dropping work that has not started."""
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        _LOGGER.debug("Shut down executor after %d jobs", self._completed)
@@ -0,0 +1,221 @@
+"""Index of the hours of usage data held for each Contact Energy contract."""
+
+from __future__ import annotations
+
+import base64
+from collections.abc import Iterable
+from datetime import datetime, timedelta
+import logging
+import threading
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .const import CONF_SOLD, DOMAIN
+from .statistics import (
+    add_export_point,
+    add_usage_point,
+    async_reconcile_statistics,
+    empty_hourly,
+)
+from .usage import hours_in_day
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+SAVE_DELAY = 30
+
+# Longest run of adjacent missing days fetched in one range request
+MAX_RUN_DAYS = 14
+
+
+class _Bitmap:
+    """One bit per hour since ``base``, which is kept a multiple of 8."""
+
+    def __init__(self, base: int | None = None, bits: bytes = b"") -> None:
+        """Initialise the bitmap."""
+        self.base = base
+        self.bits = bytearray(bits)
+
+    def set(self, index: int) -> None:
+        """Mark the hour ``index`` (hours since the epoch) as present."""
+        if self.base is None:
+            self.base = index - index % 8
+        elif index < self.base:
+            new_base = index - index % 8
+            self.bits[0:0] = bytes((self.base - new_base) // 8)
+            self.base = new_base
+        offset = index - self.base
+        if offset // 8 >= len(self.bits):
+            self.bits.extend(bytes(offset // 8 - len(self.bits) + 1))
+        self.bits[offset // 8] |= 1 << (offset % 8)
+
+    def count(self, start: int, end: int) -> int:
+        """Return how many hours in ``[start, end)`` are present."""
+        if self.base is None:
+            return 0
+        present = 0
+        for index in range(max(start, self.base), min(end, self.base + len(self.bits) * 8)):
+            offset = index - self.base
+            present += (self.bits[offset // 8] >> (offset % 8)) & 1
+        return present
+
+    def span(self) -> tuple[int, int] | None:
+        """Return the first and last present hour."""
+        value = int.from_bytes(self.bits, "little")
+        if not value:
+            return None
+        low = (value & -value).bit_length() - 1
+        return self.base + low, self.base + value.bit_length() - 1
+
+    def total(self) -> int:
+        """Return how many hours are present in the whole bitmap."""
+        return int.from_bytes(self.bits, "little").bit_count()
+
+
+class GapIndex:
+    """Persistent bitmap of the hours fetched for each contract.
+
+    Updated from any thread whenever usage is fetched, and used to find the
+    days that are missing hours so they can be refetched on their own.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        """Initialise the index for one config entry."""
+        self._hass = hass
+        self._storage = Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}.gap_index")
+        self._bitmaps: dict[str, _Bitmap] = {}
+        self._lock = threading.Lock()
+
+    async def async_load(self) -> None:
+        """Load the index saved before the last restart."""
+        data = await self._storage.async_load()
+        if data:
+            self._bitmaps = {
+                contract_id: _Bitmap(item["base"], base64.b64decode(item["bits"]))
+                for contract_id, item in data["contracts"].items()
+            }
+
+    def mark(self, contract_id: str, hours: Iterable[int]) -> None:
+        """Record the hours (UTC epoch seconds) fetched; safe from any thread."""
+        with self._lock:
+            bitmap = self._bitmaps.setdefault(contract_id, _Bitmap())
+            for hour in hours:
+                bitmap.set(hour // 3600)
+        self._hass.loop.call_soon_threadsafe(self._async_schedule_save)
+
+    @callback
+    def _async_schedule_save(self) -> None:
+        """Schedule saving the index to disk."""
+        self._storage.async_delay_save(self._data_to_save, SAVE_DELAY)
+
+    def _data_to_save(self) -> dict:
+        """Return the index as stored on disk."""
+        with self._lock:
+            return {
+                "contracts": {
+                    contract_id: {
+                        "base": bitmap.base,
+                        "bits": base64.b64encode(bitmap.bits).decode(),
+                    }
+                    for contract_id, bitmap in self._bitmaps.items()
+                    if bitmap.base is not None
+                }
+            }
+
+    def missing_days(self, contract_id: str, start: datetime, days: int) -> list[datetime]:
+        """Return the local days from midnight ``start`` that are missing hours."""
+        with self._lock:
+            bitmap = self._bitmaps.get(contract_id, _Bitmap())
+            missing = []
+            for i in range(days):
+                day = start + timedelta(days=i)
+                first = int(day.timestamp()) // 3600
+                if bitmap.count(first, first + hours_in_day(day)) < hours_in_day(day):
+                    missing.append(day)
+            return missing
+
+    def completeness(self, contract_id: str) -> tuple[float, int] | None:
+        """Return the percentage of hours present and the number missing.
+
+        Only the span between the first and last fetched hour is considered.
+        """
+        with self._lock:
+            bitmap = self._bitmaps.get(contract_id)
+            span = bitmap.span() if bitmap else None
+            if not span:
+                return None
+            expected = span[1] - span[0] + 1
+            present = bitmap.total()
+        return round(100 * present / expected, 2), expected - present
+
+
+def _runs(days: list[datetime]) -> list[tuple[datetime, datetime]]:
+    """Group days into runs of adjacent days, at most MAX_RUN_DAYS long."""
+    runs: list[tuple[datetime, datetime]] = []
+    for day in days:
+        if runs:
+            first, last = runs[-1]
+            if day.date() - last.date() == timedelta(days=1) and (
+                day.date() - first.date()
+            ).days < MAX_RUN_DAYS:
+                runs[-1] = (first, day)
+                continue
+        runs.append((day, day))
+    return runs
+
+
+async def async_fill_gaps(hass: HomeAssistant, entry_data: dict, days: int) -> int:
+    """Refetch the days of the last ``days`` that are missing hours.
+
+    Adjacent incomplete days are fetched with one range request each run;
+    the hours found are saved and reconciled into the statistics. Returns
+    the number of hours fetched.
+    """
+    api = entry_data["api"]
+    gap_index: GapIndex = entry_data["gap_index"]
+    executor = entry_data["executor"]
+    start = dt_util.start_of_local_day() - timedelta(days=days)
+
+    missing = gap_index.missing_days(api._contractId, start, days)
+    if not missing:
+        _LOGGER.info(f"No gaps found in the last {days} days")
+        return 0
+
+    runs = _runs(missing)
+    _LOGGER.info(
+        f"Fetching {len(missing)} incomplete days in {len(runs)} range requests..."
+    )
+
+    hourly = empty_hourly()
+    fetched = 0
+    track_sold = entry_data["options"].get(CONF_SOLD, False)
+    for first, last in runs:
+        sold = [] if track_sold else None
+        response = await executor.async_run(
+            api.get_usage_range,
+            first.strftime("%Y-%m-%d"),
+            last.strftime("%Y-%m-%d"),
+            "hourly",
+            sold,
+        )
+        rows = response or []
+        if not rows:
+            continue
+
+        if store := entry_data.get("store"):
+            await executor.async_run(store.upsert, api._contractId, rows)
+        for hour, value, dollar_value, offpeak_value, _ in rows:
+            add_usage_point(
+                hourly, dt_util.utc_from_timestamp(hour), value, dollar_value, offpeak_value
+            )
+        for hour, value in sold or ():
+            add_export_point(hourly, dt_util.utc_from_timestamp(hour), value)
+        fetched += len(rows)
+
+    if fetched:
+        await async_reconcile_statistics(
+            hass, hourly, missing[0], suffix=entry_data["statistics_suffix"]
+        )
+    return fetched
@@ -0,0 +1,132 @@
+"""Offline statistics restore from an export CSV or the local usage store."""
+
+from __future__ import annotations
+
+from collections.abc import AsyncIterator, Generator
+import csv
+from datetime import date, datetime, timedelta
+import logging
+from zoneinfo import ZoneInfo
+
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+
+from .executor import ContactEnergyExecutor
+from .statistics import async_import_statistics
+from .store import HourRow, UsageStore
+
+_LOGGER = logging.getLogger(__name__)
+
+RESTORE_SOURCES = ["csv", "store"]
+
+# Rows read from the source and written to the recorder at a time
+CHUNK_ROWS = 2000
+
+# Export timestamps are in Contact's local time without an offset
+CONTACT_TIME_ZONE = ZoneInfo("Pacific/Auckland")
+
+_CSV_COLUMNS = {"timestamp", "kwh", "cost_nzd", "offpeak_kwh"}
+
+
+def read_export_csv(
+    path: str, first: date | None = None, last: date | None = None
+) -> Generator[list[HourRow], None, None]:
+    """Yield the rows of an export_historical_data CSV in chunks, in file order.
+
+    Only days from ``first`` to ``last`` inclusive are read when given. The
+    second of two identical local timestamps, at the end of daylight saving,
+    is taken as the repeated hour.
+    """
+    first_day = first.isoformat() if first else None
+    last_day = last.isoformat() if last else None
+    with open(path, newline="", encoding="utf-8") as csvfile:
+        reader = csv.DictReader(csvfile)
+        missing = _CSV_COLUMNS - set(reader.fieldnames or ())
+        if missing:
+            raise ValueError(f"{path} is missing columns: {', '.join(sorted(missing))}")
+
+        chunk: list[HourRow] = []
+        previous = None
+        for line in reader:
+            day = line["timestamp"][:10]
+            if (first_day and day < first_day) or (last_day and day > last_day):
+                continue
+            try:
+                local = datetime.fromisoformat(line["timestamp"]).replace(
+                    tzinfo=CONTACT_TIME_ZONE
+                )
+                hour = int(local.timestamp())
+                if previous is not None and hour <= previous:
+                    local = local.replace(fold=1)
+                    hour = int(local.timestamp())
+                chunk.append((
+                    hour,
+                    float(line["kwh"] or 0),
+                    float(line["cost_nzd"] or 0),
+                    float(line["offpeak_kwh"] or 0),
+                ))
+            except (ValueError, TypeError) as e:
+                _LOGGER.warning("Skipping unreadable export row %s: %s", line, e)
+                continue
+            previous = hour
+            if len(chunk) >= CHUNK_ROWS:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+
+def read_store(
+    store: UsageStore, contract_id: str, first: date | None = None, last: date | None = None
+) -> Generator[list[HourRow], None, None]:
+    """Yield a contract's stored hours in chunks, oldest first.
+
+    Without ``first`` the range starts at the earliest stored hour, and
+    without ``last`` it ends at the latest.
+    """
+    start = (
+        int(dt_util.start_of_local_day(first).timestamp())
+        if first
+        else store.first_hour(contract_id)
+    )
+    end = (
+        int(dt_util.start_of_local_day(last + timedelta(days=1)).timestamp())
+        if last
+        else (store.latest_hour(contract_id) or 0) + 3600
+    )
+    if start is None:
+        return
+    for chunk_start in range(start, end, CHUNK_ROWS * 3600):
+        if rows := store.get_hours(
+            contract_id, chunk_start, min(chunk_start + CHUNK_ROWS * 3600, end)
+        ):
+            yield rows
+
+
+async def _async_iterate(
+    executor: ContactEnergyExecutor, chunks: Generator[list[HourRow], None, None]
+) -> AsyncIterator[list[HourRow]]:
+    """Read each chunk in the executor, one at a time."""
+    try:
+        while (rows := await executor.async_run(next, chunks, None)) is not None:
+            yield rows
+    finally:
+        # Close the source file if the import stops early
+        chunks.close()
+
+
+async def async_restore_statistics(
+    hass: HomeAssistant,
+    executor: ContactEnergyExecutor,
+    chunks: Generator[list[HourRow], None, None],
+    suffix: str = "",
+) -> int:
+    """Write the statistics of rows read from a local source and return the rows written.
+
+    Reading and writing alternate chunk by chunk, so memory use does not
+    grow with the length of the history. The rows are written under the
+    statistics of the account with statistic ``suffix``.
+    """
+    return await async_import_statistics(
+        hass, _async_iterate(executor, chunks), suffix=suffix
+    )
@@ -0,0 +1,174 @@
+"""Usage queries answered from local Contact Energy data."""
+
+from __future__ import annotations
+
+import calendar
+from datetime import date, timedelta
+import logging
+
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+
+from .store import RollupRow, UsageRow
+from .usage import async_load_daily, async_load_monthly, async_load_rows
+
+_LOGGER = logging.getLogger(__name__)
+
+GROUP_BY_OPTIONS = ["hour", "day", "week", "month", "billing_period"]
+
+
+def _billing_period_start(day: date, billing_day: int) -> date:
+    """Return the start of the billing period containing ``day``."""
+    year, month = day.year, day.month
+    if day.day < min(billing_day, calendar.monthrange(year, month)[1]):
+        year, month = (year - 1, 12) if month == 1 else (year, month - 1)
+    return date(year, month, min(billing_day, calendar.monthrange(year, month)[1]))
+
+
+def _bucket(day: date, group_by: str, billing_day: int) -> str:
+    """Return the key of the bucket a local ``day`` falls into."""
+    if group_by == "day":
+        return day.isoformat()
+    if group_by == "week":
+        return (day - timedelta(days=day.weekday())).isoformat()
+    if group_by == "month":
+        return day.strftime("%Y-%m")
+    return _billing_period_start(day, billing_day).isoformat()
+
+
+def _add(
+    totals: list,
+    kwh: float,
+    cost: float,
+    peak_kwh: float,
+    offpeak_kwh: float,
+    max_kwh: float,
+    hours: int,
+) -> None:
+    """Add one hour or rollup to a bucket's running totals."""
+    totals[0] += kwh
+    totals[1] += cost
+    totals[2] += peak_kwh
+    totals[3] += offpeak_kwh
+    totals[4] = max(totals[4], max_kwh)
+    totals[5] += hours
+
+
+def _periods(buckets: dict[str, list]) -> tuple[list[dict], dict]:
+    """Return the buckets as sorted periods together with the overall totals."""
+    overall = [0.0, 0.0, 0.0, 0.0, 0.0, 0]
+    for totals in buckets.values():
+        _add(overall, *totals)
+    periods = [
+        {"start": key, **_totals(*totals)} for key, totals in sorted(buckets.items())
+    ]
+    return periods, _totals(*overall)
+
+
+def aggregate_rows(rows: list[UsageRow]) -> tuple[list[dict], dict]:
+    """Return hourly rows as hourly periods with the overall totals.
+
+    kWh is split into peak and off-peak the same way ``export_historical_data``
+    does.
+    """
+    buckets: dict[str, list] = {}
+    for hour, value, dollar_value, offpeak_value, _ in rows:
+        key = dt_util.as_local(dt_util.utc_from_timestamp(hour)).isoformat()
+        totals = buckets.setdefault(key, [0.0, 0.0, 0.0, 0.0, 0.0, 0])
+        if offpeak_value > 0:
+            _add(totals, value, dollar_value, 0.0, offpeak_value, value, 1)
+        else:
+            _add(totals, value, dollar_value, value, 0.0, value, 1)
+    return _periods(buckets)
+
+
+def aggregate_rollups(
+    daily: list[RollupRow], group_by: str, billing_day: int = 1
+) -> tuple[list[dict], dict]:
+    """Group rollups into periods and return them with the overall totals.
+
+    Rollups are keyed by the local day they start on, so monthly rollups
+    can be mixed in when grouping by month. Periods are keyed by their local
+    start.
+    """
+    buckets: dict[str, list] = {}
+    for day, *values in daily:
+        key = _bucket(date.fromisoformat(day), group_by, billing_day)
+        _add(buckets.setdefault(key, [0.0, 0.0, 0.0, 0.0, 0.0, 0]), *values)
+    return _periods(buckets)
+
+
+def _totals(
+    kwh: float,
+    cost: float,
+    peak_kwh: float,
+    offpeak_kwh: float,
+    max_kwh: float,
+    hours: int,
+) -> dict:
+    """Return the rounded totals of one period of a query response."""
+    return {
+        "kwh": round(kwh, 3),
+        "cost_nzd": round(cost, 2),
+        "peak_kwh": round(peak_kwh, 3),
+        "offpeak_kwh": round(offpeak_kwh, 3),
+        "max_kwh": round(max_kwh, 3),
+        "hours": hours,
+    }
+
+
+def _billing_day(bill_details: dict) -> int:
+    """Return the day of month billing periods start on, from the current bill."""
+    try:
+        return date.fromisoformat(bill_details.get("billing_start", "")[:10]).day
+    except ValueError:
+        # Unknown billing cycle, fall back to calendar months
+        return 1
+
+
+async def async_query_usage(
+    hass: HomeAssistant,
+    entry_data: dict,
+    start_date: date,
+    end_date: date,
+    group_by: str,
+) -> dict:
+    """Answer a usage query for ``start_date`` to ``end_date`` inclusive.
+
+    Periods of a day or longer are summed from the daily rollups, so only
+    hourly queries read individual hours. Either way, data comes from the
+    local store where available and only missing days are fetched.
+    """
+    api = entry_data["api"]
+    start = dt_util.start_of_local_day(start_date)
+    # There is nothing to fetch for days that have not happened yet
+    days = max((min(end_date, dt_util.now().date()) - start_date).days + 1, 0)
+
+    if group_by == "hour":
+        rows = await async_load_rows(hass, entry_data, start, days)
+        periods, totals = aggregate_rows(rows)
+    elif group_by == "month" and days:
+        rows = await async_load_monthly(
+            hass, entry_data, start_date, start_date + timedelta(days=days - 1)
+        )
+        periods, totals = aggregate_rollups(rows, group_by)
+    else:
+        rows = await async_load_daily(hass, entry_data, start, days)
+        periods, totals = aggregate_rollups(rows, group_by, _billing_day(api._bill_details))
+
+    _LOGGER.debug(
+        "Answered usage query for %s to %s from %d %s rows",
+        start_date,
+        end_date,
+        len(rows),
+        "hourly" if group_by == "hour" else "daily",
+    )
+    return {
+        "account_id": api._accountId,
+        "contract_id": api._contractId,
+        "start_date": start_date.isoformat(),
+        "end_date": end_date.isoformat(),
+        "group_by": group_by,
+        "totals": totals,
+        "periods": periods,
+    }
@@ -0,0 +1,119 @@
+"""Process-wide request throttling for the Contact Energy API."""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+
+import requests
+
+_LOGGER = logging.getLogger(__name__)
+
+# Sustained requests per second across every entry and endpoint, and the burst allowed
+REQUEST_RATE = 2.0
+REQUEST_BURST = 5
+
+# Consecutive 429/5xx responses (or connection failures) that open the circuit
+FAILURE_THRESHOLD = 5
+# Seconds to wait before letting a probe request through an open circuit
+COOLDOWN = 300.0
+
+
+class CircuitOpenError(requests.exceptions.RequestException):
+    """Error to indicate the API is not being called after repeated failures."""
+
+
+class TokenBucket:
+    """Thread-safe token bucket; callers block until a token is available."""
+
+    def __init__(self, rate: float, capacity: int) -> None:
+        """Initialise the bucket full."""
+        self._rate = rate
+        self._capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """Take one token, sleeping as needed, and return the seconds waited."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(
+                    self._capacity, self._tokens + (now - self._updated) * self._rate
+                )
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                delay = (1 - self._tokens) / self._rate
+            time.sleep(delay)
+            waited += delay
+
+
+class CircuitBreaker:
+    """Stop calling the API after repeated failures and probe after a cooldown."""
+
+    def __init__(self, threshold: int, cooldown: float) -> None:
+        """Initialise the breaker closed."""
+        self._threshold = threshold
+        self._cooldown = cooldown
+        self._failures = 0
+        self._opened_at: float | None = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        """Return closed, open or half_open."""
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            if self._probing or time.monotonic() - self._opened_at >= self._cooldown:
+                return "half_open"
+            return "open"
+
+    def allow_request(self) -> bool:
+        """Return whether a request may be sent now.
+
+        Once the cooldown has passed a single probe is let through; everything
+        else is refused until that probe succeeds or fails.
+        """
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if self._probing or time.monotonic() - self._opened_at < self._cooldown:
+                return False
+            self._probing = True
+            return True
+
+    def record_success(self) -> None:
+        """Close the circuit after a successful request."""
+        with self._lock:
+            if self._opened_at is not None:
+                _LOGGER.info("Contact Energy API is responding again, resuming requests")
+            self._failures = 0
+            self._opened_at = None
+            self._probing = False
+
+    def record_failure(self) -> None:
+        """Count a failed request, opening the circuit at the threshold."""
+        with self._lock:
+            self._failures += 1
+            if self._probing or (
+                self._opened_at is None and self._failures >= self._threshold
+            ):
+                _LOGGER.warning(
+                    "Contact Energy API failed %d times in a row, pausing requests for %d seconds",
+                    self._failures,
+                    self._cooldown,
+                )
+                self._opened_at = time.monotonic()
+                self._probing = False
+
+
+# Shared by every ContactEnergyApi instance in the process
+RATE_LIMITER = TokenBucket(REQUEST_RATE, REQUEST_BURST)
+CIRCUIT_BREAKER = CircuitBreaker(FAILURE_THRESHOLD, COOLDOWN)
@@ -0,0 +1,175 @@
+"""Retry queue for failed Contact Energy usage fetches."""
+
+from __future__ import annotations
+
+from datetime import date, datetime, timedelta
+import logging
+import random
+import threading
+import time
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .const import CONF_SOLD, DOMAIN
+from .statistics import (
+    add_export_point,
+    add_usage_point,
+    async_reconcile_statistics,
+    empty_hourly,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+SAVE_DELAY = 10
+
+# How often the queue is checked for due retries, independently of the refresh
+RETRY_INTERVAL = timedelta(minutes=5)
+
+# Backoff doubles from BASE_DELAY up to MAX_DELAY, with +/-50% jitter
+BASE_DELAY = 300
+MAX_DELAY = 6 * 3600
+# A day still failing after this many retries is dropped from the queue
+MAX_ATTEMPTS = 12
+
+
+def _backoff(attempts: int) -> float:
+    """Return the jittered delay in seconds before the next attempt."""
+    return min(BASE_DELAY * 2**attempts, MAX_DELAY) * random.uniform(0.5, 1.5)
+
+
+class RetryQueue:
+    """Persistent queue of (contract, date) usage fetches that failed.
+
+    Days are added from any thread when ``get_usage`` fails and retried on
+    their own schedule. A successful retry updates the local store and
+    rewrites only that day's statistics (plus the running sums after it).
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str, entry_data: dict) -> None:
+        """Initialise the queue for one config entry."""
+        self._hass = hass
+        self._entry_data = entry_data
+        self._storage = Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}.retry_queue")
+        self._items: dict[str, dict] = {}
+        self._lock = threading.Lock()
+        self._processing = False
+
+    @property
+    def pending(self) -> int:
+        """Return the number of days waiting to be retried."""
+        return len(self._items)
+
+    async def async_load(self) -> None:
+        """Load queued days saved before the last restart."""
+        data = await self._storage.async_load()
+        if data:
+            self._items = {
+                f"{item['contract_id']}|{item['day']}": item for item in data["items"]
+            }
+            _LOGGER.debug("Loaded %d queued usage retries", len(self._items))
+
+    def add(self, contract_id: str, day: date) -> None:
+        """Queue a day whose fetch failed; safe to call from any thread."""
+        key = f"{contract_id}|{day.isoformat()}"
+        with self._lock:
+            if key in self._items:
+                return
+            self._items[key] = {
+                "contract_id": contract_id,
+                "day": day.isoformat(),
+                "attempts": 0,
+                "next_attempt": time.time() + _backoff(0),
+            }
+        _LOGGER.info("Queued usage for %s to be retried", day)
+        self._hass.loop.call_soon_threadsafe(self._async_schedule_save)
+
+    @callback
+    def _async_schedule_save(self) -> None:
+        """Schedule saving the queue to disk."""
+        self._storage.async_delay_save(self._data_to_save, SAVE_DELAY)
+
+    def _data_to_save(self) -> dict:
+        """Return the queue as stored on disk."""
+        with self._lock:
+            return {"items": list(self._items.values())}
+
+    async def async_process(self, now: datetime | None = None) -> None:
+        """Retry every queued day that is due."""
+        if self._processing or not self._items:
+            return
+        self._processing = True
+        try:
+            with self._lock:
+                due = [
+                    (key, dict(item))
+                    for key, item in self._items.items()
+                    if item["next_attempt"] <= time.time()
+                ]
+            for key, item in due:
+                await self._async_retry(key, item)
+        finally:
+            self._processing = False
+            self._async_schedule_save()
+
+    async def _async_retry(self, key: str, item: dict) -> None:
+        """Retry one queued day and update or drop its queue entry."""
+        api = self._entry_data["api"]
+        executor = self._entry_data["executor"]
+        if item["contract_id"] != api._contractId:
+            # The account has changed contract since the day was queued
+            with self._lock:
+                self._items.pop(key, None)
+            return
+
+        day = date.fromisoformat(item["day"])
+        response = False
+        sold = [] if self._entry_data["options"].get(CONF_SOLD, False) else None
+        if api._api_token or await executor.async_run(api.login):
+            response = await executor.async_run(
+                api.get_usage, str(day.year), str(day.month), str(day.day), "hourly", sold
+            )
+
+        if response is False:
+            attempts = item["attempts"] + 1
+            with self._lock:
+                if attempts >= MAX_ATTEMPTS:
+                    self._items.pop(key, None)
+                    _LOGGER.warning(
+                        "Giving up on usage for %s after %d retries", day, attempts
+                    )
+                elif key in self._items:
+                    self._items[key]["attempts"] = attempts
+                    self._items[key]["next_attempt"] = time.time() + _backoff(attempts)
+            return
+
+        with self._lock:
+            self._items.pop(key, None)
+
+        rows = response
+        if not rows:
+            return
+        if store := self._entry_data.get("store"):
+            await executor.async_run(store.upsert, api._contractId, rows)
+
+        hourly = empty_hourly()
+        for hour, value, dollar_value, offpeak_value, _ in rows:
+            add_usage_point(
+                hourly, dt_util.utc_from_timestamp(hour), value, dollar_value, offpeak_value
+            )
+        for hour, value in sold or ():
+            add_export_point(hourly, dt_util.utc_from_timestamp(hour), value)
+        written = await async_reconcile_statistics(
+            self._hass,
+            hourly,
+            dt_util.start_of_local_day(day),
+            suffix=self._entry_data["statistics_suffix"],
+        )
+        _LOGGER.info(
+            "Retried usage for %s: %d hours fetched, %d statistics written",
+            day,
+            len(rows),
+            written,
+        )
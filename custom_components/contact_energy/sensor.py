@@ -2,11 +2,10 @@
 
 from __future__ import annotations
 
-from datetime import datetime, timedelta
+from contextlib import aclosing
+from datetime import date, datetime, timedelta
 import logging
 
-from homeassistant.components.recorder.models import StatisticData, StatisticMetaData
-from homeassistant.components.recorder.statistics import async_add_external_statistics
 from homeassistant.components.sensor import (
     SensorDeviceClass,
     SensorEntity,
@@ -14,11 +13,26 @@ from homeassistant.components.sensor import (
 )
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import UnitOfEnergy
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.device_registry import DeviceEntryType, DeviceInfo
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-
-from .const import DOMAIN
+from homeassistant.util import dt as dt_util
+
+from .api import SoldRow
+from .const import CONF_SOLD, DOMAIN, SENSOR_SOLD_NAME
+from .executor import ContactEnergyExecutor
+from .gaps import GapIndex
+from .retry import RetryQueue
+from .statistics import (
+    add_export_point,
+    add_usage_point,
+    async_reconcile_statistics,
+    empty_hourly,
+)
+from .store import UsageRow, UsageStore
+from .tariffs import OFFPEAK_COLUMN, PEAK_COLUMN, TariffHistory, tariff_from_bill
+from .tracing import Tracer
+from .usage import async_load_daily
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -34,13 +48,20 @@ async def async_setup_entry(
     data = hass.data[DOMAIN][entry.entry_id]
     api = data["api"]
     usage_days = data["usage_days"]
+    store = data.get("store")
+    retry_queue = data.get("retry_queue")
+    gap_index = data.get("gap_index")
+    executor = data["executor"]
     
     # Priority: User-configured rates > API-fetched rates > Default values
     user_peak_rate = entry.data.get("peak_rate")
     user_offpeak_rate = entry.data.get("offpeak_rate")
     
+    # Past days are priced from the tariff history unless the user fixed the rates
+    tariffs = data.get("tariffs")
     if user_peak_rate is not None and user_offpeak_rate is not None:
         # User has explicitly configured rates - use those
+        tariffs = None
         peak_rate = user_peak_rate
         offpeak_rate = user_offpeak_rate
         _LOGGER.info("Using user-configured rates: Peak=$%.4f, Off-peak=$%.4f", peak_rate, offpeak_rate)
@@ -55,14 +76,30 @@ async def async_setup_entry(
         offpeak_rate = 0.15
         _LOGGER.warning("Using default rates: Peak=$%.4f, Off-peak=$%.4f", peak_rate, offpeak_rate)
 
+    # Export comes in the usage responses, so the usage sensor updates it
+    sold_sensor = ContactEnergySoldSensor(entry) if entry.options.get(CONF_SOLD, False) else None
+
     sensors = [
-        ContactEnergyUsageSensor(entry, api, usage_days),
-        ContactEnergyCurrentPriceSensor(entry, api, peak_rate, offpeak_rate),
-        ContactEnergyPeakCostSensor(entry, api, usage_days, peak_rate),
-        ContactEnergyOffPeakCostSensor(entry, api, usage_days, offpeak_rate),
-        ContactEnergyOffPeakPeriodSensor(entry, api),        
+        ContactEnergyUsageSensor(
+            entry,
+            api,
+            usage_days,
+            executor,
+            store,
+            retry_queue,
+            gap_index,
+            data["tracer"],
+            sold_sensor,
+            data["statistics_suffix"],
+        ),
+        ContactEnergyCurrentPriceSensor(entry, api, peak_rate, offpeak_rate, executor),
+        ContactEnergyPeakCostSensor(entry, data, peak_rate, tariffs),
+        ContactEnergyOffPeakCostSensor(entry, data, offpeak_rate, tariffs),
+        ContactEnergyOffPeakPeriodSensor(entry, api, executor),        
         ContactEnergyNextBillDateSensor(entry, api, usage_days),
         ContactEnergyNextBillAmountSensor(entry, api, usage_days),    ]
+    if sold_sensor:
+        sensors.append(sold_sensor)
 
     async_add_entities(sensors, True)
 
@@ -77,10 +114,29 @@ class ContactEnergyUsageSensor(SensorEntity):
     _attr_state_class = SensorStateClass.TOTAL
     _attr_icon = "mdi:meter-electric"
 
-    def __init__(self, entry: ConfigEntry, api, usage_days: int) -> None:
+    def __init__(
+        self,
+        entry: ConfigEntry,
+        api,
+        usage_days: int,
+        executor: ContactEnergyExecutor,
+        store: UsageStore | None = None,
+        retry_queue: RetryQueue | None = None,
+        gap_index: GapIndex | None = None,
+        tracer: Tracer | None = None,
+        sold_sensor: ContactEnergySoldSensor | None = None,
+        statistics_suffix: str = "",
+    ) -> None:
         """Initialize the sensor."""
         self._api = api
+        self._statistics_suffix = statistics_suffix
+        self._tracer = tracer or Tracer()
+        self._sold_sensor = sold_sensor
         self._usage_days = usage_days
+        self._executor = executor
+        self._store = store
+        self._retry_queue = retry_queue
+        self._gap_index = gap_index
         self._attr_unique_id = f"{entry.entry_id}_usage"
         
         # Build device info with plan details if available
@@ -98,6 +154,8 @@ class ContactEnergyUsageSensor(SensorEntity):
         )
         self._last_total = 0.0
         self._last_cost = 0.0
+        self._sold_total = 0.0
+        self._last_sold = 0.0
 
     @property
     def extra_state_attributes(self) -> dict:
@@ -107,6 +165,14 @@ class ContactEnergyUsageSensor(SensorEntity):
             "contract_id": self._api._contractId,
             "last_daily_cost": f"${self._last_cost:.2f}",
         }
+        if self._retry_queue:
+            attributes["pending_retries"] = self._retry_queue.pending
+        completeness = (
+            self._gap_index.completeness(self._api._contractId) if self._gap_index else None
+        )
+        if completeness:
+            attributes["data_completeness"] = f"{completeness[0]}%"
+            attributes["missing_hours"] = completeness[1]
         
         # Add plan details if available
         if self._api._plan_details:
@@ -125,137 +191,167 @@ class ContactEnergyUsageSensor(SensorEntity):
 
     async def async_update(self) -> None:
         """Update the sensor."""
-        await self.hass.async_add_executor_job(self._update)
+        with self._tracer.span("refresh", days=self._usage_days) as span:
+            result = await self._async_fetch()
+            if not result:
+                span["outcome"] = "failed"
+                return
 
-    def _update(self) -> None:
-        """Fetch usage data (runs in executor)."""
+            # Only hours that are new or revised by Contact are written
+            start, hourly = result
+            with self._tracer.span(
+                "statistics_submit", start=start.date().isoformat()
+            ) as submit:
+                written = await async_reconcile_statistics(
+                    self.hass, hourly, start, suffix=self._statistics_suffix
+                )
+                submit["rows"] = written
+        _LOGGER.debug("Wrote %d changed hourly statistics", written)
+
+        if self._sold_sensor:
+            self._sold_sensor.async_set_sold(self._sold_total, self._last_sold)
+
+    async def _async_fetch(self) -> tuple[datetime, dict[str, dict[datetime, float]]] | None:
+        """Fetch the usage window and split it into hourly statistics."""
         _LOGGER.debug("Beginning usage update")
 
         # Check API token
         if not self._api._api_token:
             _LOGGER.info("Not logged in, attempting login...")
-            if not self._api.login():
+            if not await self._executor.async_run(self._api.login):
                 _LOGGER.error("Failed to login - check credentials")
-                return
+                return None
 
-        today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        start = dt_util.start_of_local_day() - timedelta(days=self._usage_days)
 
-        kWhStatistics = []
+        hourly = empty_hourly()
         kWhRunningSum = 0.0
-
-        freeKWhStatistics = []
         freeKWhRunningSum = 0.0
 
         latest_daily_total = 0.0
         latest_daily_cost = 0.0
+        sold_total = 0.0
+        latest_daily_sold = 0.0
+
+        # Days are fetched a few ahead of the one being aggregated and saved;
+        # export is read from the same responses as consumption
+        usage = self._api.iter_usage(
+            start.date(),
+            (start + timedelta(days=self._usage_days - 1)).date(),
+            self._executor.async_run,
+        )
+        async with aclosing(usage):
+            async for day, response, sold in usage:
+                # A failed fetch is retried later instead of silently dropping the day
+                if response is False and self._retry_queue:
+                    self._retry_queue.add(self._api._contractId, day)
 
-        for i in range(self._usage_days):
-            previous_day = today - timedelta(days=self._usage_days - i)
-            response = self._api.get_usage(
-                str(previous_day.year),
-                str(previous_day.month),
-                str(previous_day.day),
-            )
-
-            if not response or not response[0]:
-                continue
-
-            daily_total = 0.0
-            daily_cost = 0.0
-
-            for point in response:
-                value = point.get("value")
-                if not value:
+                if not response or not response[0]:
                     continue
 
-                value = float(value)
-                daily_total += value
-
-                # Track cost
-                dollar_value = point.get("dollarValue", "0")
-                if dollar_value:
-                    daily_cost += float(dollar_value)
-
-                # Off-peak detection: offpeakValue > 0 means off-peak energy
-                offpeak_value = point.get("offpeakValue", "0")
-                try:
-                    offpeak_float = float(offpeak_value) if offpeak_value else 0.0
-                except (ValueError, TypeError):
-                    offpeak_float = 0.0
-                
-                # Parse timestamp first (before adding to sums)
-                try:
-                    timestamp = datetime.strptime(
-                        point["date"], "%Y-%m-%dT%H:%M:%S.%f%z"
-                    )
-                except (KeyError, ValueError):
-                    _LOGGER.warning("Failed to parse timestamp for data point")
-                    continue
-                
-                if offpeak_float > 0:
-                    # This is off-peak/free energy
-                    freeKWhRunningSum += value
-                    # Add hourly statistics with state only (Home Assistant will calculate sum)
-                    freeKWhStatistics.append(
-                        StatisticData(start=timestamp, state=value)
-                    )
-                else:
-                    # This is peak energy
-                    kWhRunningSum += value
-                    # Add hourly statistics with state only (Home Assistant will calculate sum)
-                    kWhStatistics.append(
-                        StatisticData(start=timestamp, state=value)
+                if not self._sold_sensor:
+                    sold = []
+                daily = self._aggregate(day, response, sold, hourly)
+                kWhRunningSum += daily[0]
+                freeKWhRunningSum += daily[1]
+                if sold:
+                    sold_total += daily[3]
+                    latest_daily_sold = daily[3]
+
+                # Keep the local store current with every refresh
+                if self._store:
+                    await self._executor.async_run(
+                        self._store.upsert, self._api._contractId, response
                     )
 
-            # Track latest day with data
-            if daily_total > 0:
-                latest_daily_total = daily_total
-                latest_daily_cost = daily_cost
+                # Track latest day with data
+                if daily[0] + daily[1] > 0:
+                    latest_daily_total = daily[0] + daily[1]
+                    latest_daily_cost = daily[2]
 
         # Update sensor state with total consumption
         total_consumption = round(kWhRunningSum + freeKWhRunningSum, 2)
         self._attr_native_value = total_consumption
         self._last_total = latest_daily_total
         self._last_cost = latest_daily_cost
+        self._sold_total = round(sold_total, 2)
+        self._last_sold = latest_daily_sold
 
         _LOGGER.info(
             "Updated Contact Energy: %d hourly statistics, Total: %.2f kWh (%.2f peak + %.2f off-peak)",
-            len(kWhStatistics),
+            sum(len(hours) for hours in hourly.values()),
             total_consumption,
             kWhRunningSum,
             freeKWhRunningSum,
         )
 
-        # Add statistics for energy dashboard
-        if kWhStatistics:
-            kWhMetadata = StatisticMetaData(
-                has_mean=False,
-                has_sum=True,
-                name="Contact Energy",
-                source=DOMAIN,
-                statistic_id=f"{DOMAIN}:energy_consumption",
-                unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
-            )
-            async_add_external_statistics(self.hass, kWhMetadata, kWhStatistics)
-            _LOGGER.debug(
-                "Added %d statistics for contact_energy:energy_consumption",
-                len(kWhStatistics)
-            )
+        return start, hourly
+
+    def _aggregate(
+        self,
+        day: date,
+        rows: list[UsageRow],
+        sold: list[SoldRow],
+        hourly: dict[str, dict[datetime, float]],
+    ) -> tuple[float, float, float, float]:
+        """Add a day to ``hourly``; return its peak kWh, off-peak kWh, cost and export."""
+        peak_kwh = offpeak_kwh = cost = 0.0
+        with self._tracer.span("aggregate", day=day.isoformat(), rows=len(rows)):
+            for hour, value, dollar_value, offpeak_value, _ in rows:
+                cost += dollar_value
+
+                # Off-peak detection: offpeakValue > 0 means off-peak energy
+                if offpeak_value > 0:
+                    offpeak_kwh += value
+                else:
+                    peak_kwh += value
+                add_usage_point(
+                    hourly, dt_util.utc_from_timestamp(hour), value, dollar_value, offpeak_value
+                )
+            for hour, value in sold:
+                add_export_point(hourly, dt_util.utc_from_timestamp(hour), value)
+        return peak_kwh, offpeak_kwh, cost, sum(value for _, value in sold)
 
-        if freeKWhStatistics:
-            freeKWhMetadata = StatisticMetaData(
-                has_mean=False,
-                has_sum=True,
-                name="Contact Energy Free",
-                source=DOMAIN,
-                statistic_id=f"{DOMAIN}:free_energy_consumption",
-                unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
-            )
-            async_add_external_statistics(self.hass, freeKWhMetadata, freeKWhStatistics)
-            _LOGGER.debug(
-                "Added %d statistics for contact_energy:free_energy_consumption",
-                len(freeKWhStatistics)
-            )
+
+class ContactEnergySoldSensor(SensorEntity):
+    """Contact Energy sold (exported) energy sensor.
+
+    It has no requests of its own: the usage sensor reads export from the
+    usage it fetches and sets this sensor's state after each refresh.
+    """
+
+    _attr_name = SENSOR_SOLD_NAME
+    _attr_native_unit_of_measurement = UnitOfEnergy.KILO_WATT_HOUR
+    _attr_device_class = SensorDeviceClass.ENERGY
+    _attr_state_class = SensorStateClass.TOTAL
+    _attr_icon = "mdi:transmission-tower-export"
+    _attr_should_poll = False
+
+    def __init__(self, entry: ConfigEntry) -> None:
+        """Initialize the sensor."""
+        self._attr_unique_id = f"{entry.entry_id}_sold"
+        self._attr_device_info = DeviceInfo(
+            identifiers={(DOMAIN, entry.entry_id)},
+            name="Contact Energy",
+            manufacturer="Contact Energy",
+            model="Smart Meter",
+            entry_type=DeviceEntryType.SERVICE,
+        )
+        self._last_sold = 0.0
+
+    @property
+    def extra_state_attributes(self) -> dict:
+        """Return additional state attributes."""
+        return {"last_daily_sold": f"{self._last_sold:.2f} kWh"}
+
+    @callback
+    def async_set_sold(self, total: float, last_daily: float) -> None:
+        """Set the kWh exported over the usage window and on its latest day."""
+        self._attr_native_value = total
+        self._last_sold = last_daily
+        # The first refresh runs before this sensor is added
+        if self.hass:
+            self.async_write_ha_state()
 
 
 class ContactEnergyCurrentPriceSensor(SensorEntity):
@@ -268,9 +364,17 @@ class ContactEnergyCurrentPriceSensor(SensorEntity):
     _attr_state_class = SensorStateClass.MEASUREMENT
     _attr_icon = "mdi:cash-clock"
 
-    def __init__(self, entry: ConfigEntry, api, peak_rate: float, offpeak_rate: float) -> None:
+    def __init__(
+        self,
+        entry: ConfigEntry,
+        api,
+        peak_rate: float,
+        offpeak_rate: float,
+        executor: ContactEnergyExecutor,
+    ) -> None:
         """Initialize the sensor."""
         self._api = api
+        self._executor = executor
         self._attr_unique_id = f"{entry.entry_id}_current_price"
         self._attr_device_info = DeviceInfo(
             identifiers={(DOMAIN, entry.entry_id)},
@@ -295,7 +399,7 @@ class ContactEnergyCurrentPriceSensor(SensorEntity):
 
     async def async_update(self) -> None:
         """Update the sensor."""
-        await self.hass.async_add_executor_job(self._update)
+        await self._executor.async_run(self._update)
 
     def _update(self) -> None:
         """Determine current price based on time period."""
@@ -303,6 +407,17 @@ class ContactEnergyCurrentPriceSensor(SensorEntity):
             if not self._api.login():
                 return
 
+        # The bill's time bands say directly whether now is off-peak
+        tariff = self._api._tariff
+        if tariff and any(band.timed for band in tariff.bands):
+            now = dt_util.now()
+            band = tariff.band_at(now.weekday(), now.hour * 60 + now.minute)
+            self._is_offpeak = bool(band and band.offpeak)
+            self._attr_native_value = round(
+                self._offpeak_rate if self._is_offpeak else self._peak_rate, 4
+            )
+            return
+
         # Get yesterday's data to determine current period
         yesterday = datetime.now() - timedelta(days=2)
         response = self._api.get_usage(
@@ -316,19 +431,13 @@ class ContactEnergyCurrentPriceSensor(SensorEntity):
             self._attr_native_value = round(self._peak_rate, 4)
             return
 
-        current_hour = datetime.now().hour
+        current_hour = dt_util.now().hour
 
         # Determine if current time is off-peak (based on yesterday's pattern)
-        for point in response:
-            try:
-                timestamp = datetime.strptime(point["date"], "%Y-%m-%dT%H:%M:%S.%f%z")
-                if timestamp.hour == current_hour:
-                    offpeak_value = point.get("offpeakValue", "0")
-                    offpeak_float = float(offpeak_value) if offpeak_value else 0.0
-                    self._is_offpeak = offpeak_float > 0
-                    break
-            except (KeyError, ValueError):
-                continue
+        for _, _, _, offpeak_value, source_ts in response:
+            if datetime.fromisoformat(source_ts).hour == current_hour:
+                self._is_offpeak = offpeak_value > 0
+                break
 
         # Set current price based on time of day
         if self._is_offpeak:
@@ -348,11 +457,20 @@ class ContactEnergyPeakCostSensor(SensorEntity):
     _attr_state_class = SensorStateClass.TOTAL
     _attr_icon = "mdi:currency-usd"
 
-    def __init__(self, entry: ConfigEntry, api, usage_days: int, peak_rate: float) -> None:
+    def __init__(
+        self,
+        entry: ConfigEntry,
+        entry_data: dict,
+        peak_rate: float,
+        tariffs: TariffHistory | None = None,
+    ) -> None:
         """Initialize the sensor."""
-        self._api = api
-        self._usage_days = usage_days
+        self._entry_data = entry_data
+        self._api = entry_data["api"]
+        self._executor = entry_data["executor"]
+        self._usage_days = entry_data["usage_days"]
         self._peak_rate = peak_rate
+        self._tariffs = tariffs
         self._attr_unique_id = f"{entry.entry_id}_peak_cost"
         self._attr_device_info = DeviceInfo(
             identifiers={(DOMAIN, entry.entry_id)},
@@ -372,50 +490,22 @@ class ContactEnergyPeakCostSensor(SensorEntity):
         }
 
     async def async_update(self) -> None:
-        """Update the sensor."""
-        await self.hass.async_add_executor_job(self._update)
-
-    def _update(self) -> None:
-        """Fetch peak cost data."""
+        """Update the sensor from the daily rollups."""
         if not self._api._api_token:
-            if not self._api.login():
+            if not await self._executor.async_run(self._api.login):
                 return
 
-        today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
-        total_peak_cost = 0.0
-        total_peak_kwh = 0.0
-
-        for i in range(self._usage_days):
-            previous_day = today - timedelta(days=self._usage_days - i)
-            response = self._api.get_usage(
-                str(previous_day.year),
-                str(previous_day.month),
-                str(previous_day.day),
-            )
+        start = dt_util.start_of_local_day() - timedelta(days=self._usage_days)
+        daily = await async_load_daily(self.hass, self._entry_data, start, self._usage_days)
+        total_peak_kwh = sum(row[PEAK_COLUMN] for row in daily)
 
-            if not response:
-                continue
-
-            for point in response:
-                value = point.get("value")
-                if not value:
-                    continue
-
-                offpeak_value = point.get("offpeakValue", "0")
-                try:
-                    offpeak_float = float(offpeak_value) if offpeak_value else 0.0
-                except (ValueError, TypeError):
-                    offpeak_float = 0.0
-
-                # Peak time = when offpeakValue is 0
-                if offpeak_float == 0:
-                    try:
-                        total_peak_kwh += float(value)
-                    except (ValueError, TypeError):
-                        pass
-
-        # Calculate cost from kWh and configured rate
-        total_peak_cost = total_peak_kwh * self._peak_rate
+        if self._tariffs:
+            # Each day at the tariff of its billing period
+            self._tariffs.record(tariff_from_bill(self._api._bill_details))
+            total_peak_cost = self._tariffs.cost(daily, PEAK_COLUMN, self._peak_rate)
+        else:
+            # Calculate cost from kWh and configured rate
+            total_peak_cost = total_peak_kwh * self._peak_rate
         self._attr_native_value = round(total_peak_cost, 2)
         self._peak_cost = total_peak_cost
         self._peak_kwh = total_peak_kwh
@@ -431,11 +521,20 @@ class ContactEnergyOffPeakCostSensor(SensorEntity):
     _attr_state_class = SensorStateClass.TOTAL
     _attr_icon = "mdi:currency-usd-off"
 
-    def __init__(self, entry: ConfigEntry, api, usage_days: int, offpeak_rate: float) -> None:
+    def __init__(
+        self,
+        entry: ConfigEntry,
+        entry_data: dict,
+        offpeak_rate: float,
+        tariffs: TariffHistory | None = None,
+    ) -> None:
         """Initialize the sensor."""
-        self._api = api
-        self._usage_days = usage_days
+        self._entry_data = entry_data
+        self._api = entry_data["api"]
+        self._executor = entry_data["executor"]
+        self._usage_days = entry_data["usage_days"]
         self._offpeak_rate = offpeak_rate
+        self._tariffs = tariffs
         self._attr_unique_id = f"{entry.entry_id}_offpeak_cost"
         self._attr_device_info = DeviceInfo(
             identifiers={(DOMAIN, entry.entry_id)},
@@ -455,50 +554,22 @@ class ContactEnergyOffPeakCostSensor(SensorEntity):
         }
 
     async def async_update(self) -> None:
-        """Update the sensor."""
-        await self.hass.async_add_executor_job(self._update)
-
-    def _update(self) -> None:
-        """Fetch off-peak cost data."""
+        """Update the sensor from the daily rollups."""
         if not self._api._api_token:
-            if not self._api.login():
+            if not await self._executor.async_run(self._api.login):
                 return
 
-        today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
-        total_offpeak_cost = 0.0
-        total_offpeak_kwh = 0.0
-
-        for i in range(self._usage_days):
-            previous_day = today - timedelta(days=self._usage_days - i)
-            response = self._api.get_usage(
-                str(previous_day.year),
-                str(previous_day.month),
-                str(previous_day.day),
-            )
-
-            if not response:
-                continue
+        start = dt_util.start_of_local_day() - timedelta(days=self._usage_days)
+        daily = await async_load_daily(self.hass, self._entry_data, start, self._usage_days)
+        total_offpeak_kwh = sum(row[OFFPEAK_COLUMN] for row in daily)
 
-            for point in response:
-                value = point.get("value")
-                if not value:
-                    continue
-
-                offpeak_value = point.get("offpeakValue", "0")
-                try:
-                    offpeak_float = float(offpeak_value) if offpeak_value else 0.0
-                except (ValueError, TypeError):
-                    offpeak_float = 0.0
-
-                # Off-peak time = when offpeakValue > 0
-                if offpeak_float > 0:
-                    try:
-                        total_offpeak_kwh += float(value)
-                    except (ValueError, TypeError):
-                        pass
-
-        # Calculate cost from kWh and configured rate
-        total_offpeak_cost = total_offpeak_kwh * self._offpeak_rate
+        if self._tariffs:
+            # Each day at the tariff of its billing period
+            self._tariffs.record(tariff_from_bill(self._api._bill_details))
+            total_offpeak_cost = self._tariffs.cost(daily, OFFPEAK_COLUMN, self._offpeak_rate)
+        else:
+            # Calculate cost from kWh and configured rate
+            total_offpeak_cost = total_offpeak_kwh * self._offpeak_rate
         self._attr_native_value = round(total_offpeak_cost, 2)
         self._offpeak_cost = total_offpeak_cost
         self._offpeak_kwh = total_offpeak_kwh
@@ -564,9 +635,10 @@ class ContactEnergyOffPeakPeriodSensor(SensorEntity):
     _attr_name = "Off-Peak Period"
     _attr_icon = "mdi:clock-time-eight-outline"
 
-    def __init__(self, entry: ConfigEntry, api) -> None:
+    def __init__(self, entry: ConfigEntry, api, executor: ContactEnergyExecutor) -> None:
         """Initialize the sensor."""
         self._api = api
+        self._executor = executor
         self._attr_unique_id = f"{entry.entry_id}_offpeak_period"
         self._attr_device_info = DeviceInfo(
             identifiers={(DOMAIN, entry.entry_id)},
@@ -590,7 +662,7 @@ class ContactEnergyOffPeakPeriodSensor(SensorEntity):
 
     async def async_update(self) -> None:
         """Update the sensor."""
-        await self.hass.async_add_executor_job(self._update)
+        await self._executor.async_run(self._update)
 
     def _update(self) -> None:
         """Determine off-peak period from recent data."""
@@ -610,23 +682,11 @@ class ContactEnergyOffPeakPeriodSensor(SensorEntity):
             self._attr_native_value = "Unknown"
             return
 
-        offpeak_hours = []
-        for point in response:
-            offpeak_value = point.get("offpeakValue", "0")
-            try:
-                offpeak_float = float(offpeak_value) if offpeak_value else 0.0
-            except (ValueError, TypeError):
-                continue
-
-            if offpeak_float > 0:
-                # Extract hour from timestamp
-                try:
-                    timestamp = datetime.strptime(
-                        point["date"], "%Y-%m-%dT%H:%M:%S.%f%z"
-                    )
-                    offpeak_hours.append(timestamp.hour)
-                except (KeyError, ValueError):
-                    continue
+        offpeak_hours = [
+            datetime.fromisoformat(source_ts).hour
+            for _, _, _, offpeak_value, source_ts in response
+            if offpeak_value > 0
+        ]
 
         if offpeak_hours:
             # Find continuous periods
@@ -0,0 +1,629 @@
+"""Services for the Contact Energy integration."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable
+from contextlib import aclosing
+import csv
+from datetime import datetime, timedelta
+import logging
+from pathlib import Path
+from typing import TypeVar
+
+import voluptuous as vol
+
+from homeassistant.components.recorder import get_instance
+from homeassistant.const import ATTR_AREA_ID, ATTR_DEVICE_ID, ATTR_ENTITY_ID
+from homeassistant.core import HomeAssistant, ServiceCall, ServiceResponse, SupportsResponse
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import (
+    config_validation as cv,
+    device_registry as dr,
+    entity_registry as er,
+)
+from homeassistant.util import dt as dt_util
+
+from .api import EXPORT_FIELDS, USAGE_INTERVALS, ContactEnergyApi, export_record
+from .const import CONF_SOLD, DOMAIN
+from .gaps import async_fill_gaps
+from .offline import RESTORE_SOURCES, async_restore_statistics, read_export_csv, read_store
+from .query import GROUP_BY_OPTIONS, async_query_usage
+from .statistics import (
+    STATISTIC_EXPORT,
+    STATISTIC_NAMES,
+    add_export_point,
+    add_period_point,
+    add_usage_point,
+    async_reconcile_statistics,
+    empty_hourly,
+    entry_statistic_id,
+    period_hours,
+)
+from .usage import async_load_rows
+
+_LOGGER = logging.getLogger(__name__)
+
+ATTR_CONFIG_ENTRY = "config_entry"
+ATTR_ACCOUNT = "account"
+ALL_ENTRIES = "all"
+
+# Accounts a single service call works on at the same time
+MAX_CONCURRENT_ENTRIES = 3
+
+_ENTRY_SEMAPHORE = asyncio.Semaphore(MAX_CONCURRENT_ENTRIES)
+
+_T = TypeVar("_T")
+
+TARGET_SCHEMA = {
+    vol.Optional(ATTR_CONFIG_ENTRY, default=ALL_ENTRIES): vol.Any(
+        ALL_ENTRIES, vol.All(cv.ensure_list, [cv.string])
+    ),
+    vol.Optional(ATTR_DEVICE_ID): vol.All(cv.ensure_list, [cv.string]),
+    vol.Optional(ATTR_AREA_ID): vol.All(cv.ensure_list, [cv.string]),
+    vol.Optional(ATTR_ENTITY_ID): vol.All(cv.ensure_list, [cv.string]),
+    vol.Optional(ATTR_ACCOUNT): cv.string,
+}
+
+
+def entries_for_account(hass: HomeAssistant, account: str | None = None) -> dict[str, dict]:
+    """Return the loaded entries' data by entry ID.
+
+    With ``account``, only the entry whose account or contract ID matches.
+    """
+    return {
+        entry_id: data
+        for entry_id, data in hass.data.get(DOMAIN, {}).items()
+        if "api" in data
+        and (not account or account in (data["api"]._accountId, data["api"]._contractId))
+    }
+
+
+def _selected_entries(hass: HomeAssistant, call: ServiceCall) -> list[dict]:
+    """Return the data of the entries a service call targets.
+
+    Config entries, devices, areas and entities can be targeted explicitly;
+    with none of them, every loaded entry is selected. ``account`` narrows
+    the selection to the entry whose account or contract ID matches.
+    """
+    loaded = entries_for_account(hass, call.data.get(ATTR_ACCOUNT))
+
+    entry_ids: set[str] = set()
+    explicit = False
+    if call.data[ATTR_CONFIG_ENTRY] != ALL_ENTRIES:
+        explicit = True
+        entry_ids.update(call.data[ATTR_CONFIG_ENTRY])
+    device_registry = dr.async_get(hass)
+    entity_registry = er.async_get(hass)
+    if device_ids := call.data.get(ATTR_DEVICE_ID):
+        explicit = True
+        for device_id in device_ids:
+            if device := device_registry.async_get(device_id):
+                entry_ids.update(device.config_entries)
+    if area_ids := call.data.get(ATTR_AREA_ID):
+        explicit = True
+        for area_id in area_ids:
+            for device in dr.async_entries_for_area(device_registry, area_id):
+                entry_ids.update(device.config_entries)
+            for entity in er.async_entries_for_area(entity_registry, area_id):
+                if entity.config_entry_id:
+                    entry_ids.add(entity.config_entry_id)
+    if entity_ids := call.data.get(ATTR_ENTITY_ID):
+        explicit = True
+        for entity_id in entity_ids:
+            if (entity := entity_registry.async_get(entity_id)) and entity.config_entry_id:
+                entry_ids.add(entity.config_entry_id)
+
+    return [
+        data for entry_id, data in loaded.items() if not explicit or entry_id in entry_ids
+    ]
+
+
+def _selected_entry(hass: HomeAssistant, call: ServiceCall, action: str) -> dict:
+    """Return the data of the one entry a service call targets.
+
+    For services that answer for a single account, such as queries, or read
+    a single account's file.
+    """
+    entries = _selected_entries(hass, call)
+    if not entries:
+        raise HomeAssistantError("No matching Contact Energy account found")
+    if len(entries) > 1:
+        raise HomeAssistantError(
+            f"Several Contact Energy accounts match; select one to {action}"
+        )
+    return entries[0]
+
+
+async def _async_ensure_login(entry_data: dict) -> bool:
+    """Log the entry's API in if it has no session."""
+    api = entry_data["api"]
+    if api._api_token:
+        return True
+    if await entry_data["executor"].async_run(api.login):
+        return True
+    _LOGGER.error("Failed to login to Contact Energy API")
+    return False
+
+
+async def _async_run_for_entries(
+    hass: HomeAssistant,
+    call: ServiceCall,
+    action: Callable[[dict], Awaitable[_T]],
+    login: bool = True,
+) -> list[tuple[dict, _T]]:
+    """Run ``action`` for every targeted entry, a few accounts at a time.
+
+    Each account is logged in first unless ``login`` is false, for actions
+    that work on local data only. Returns the entries that completed with
+    their results; an account that fails is logged and does not stop the
+    others.
+    """
+    entries = _selected_entries(hass, call)
+    if not entries:
+        _LOGGER.error("No Contact Energy API instance found")
+        return []
+
+    async def _async_run(entry_data: dict) -> _T:
+        async with _ENTRY_SEMAPHORE:
+            if login and not await _async_ensure_login(entry_data):
+                raise HomeAssistantError("Login failed")
+            return await action(entry_data)
+
+    results = await asyncio.gather(
+        *(_async_run(entry_data) for entry_data in entries), return_exceptions=True
+    )
+
+    completed = []
+    for entry_data, result in zip(entries, results):
+        if isinstance(result, Exception):
+            _LOGGER.error(
+                "Contact Energy account %s failed: %s",
+                entry_data["api"]._accountId,
+                result,
+            )
+            continue
+        completed.append((entry_data, result))
+    return completed
+
+
+async def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the Contact Energy services."""
+
+    # Register service to export historical data
+    async def handle_export_historical_data(call: ServiceCall) -> None:
+        """Handle the export historical data service call."""
+        days = call.data.get("days", 30)
+        interval = call.data.get("interval", "hourly")
+        _LOGGER.info(f"Exporting {days} days of Contact Energy historical data...")
+
+        # Each account gets its own file when more than one is exported
+        suffix = len(_selected_entries(hass, call)) > 1
+
+        async def _async_export(entry_data: dict) -> None:
+            await _async_export_entry(hass, entry_data, days, interval, suffix)
+
+        await _async_run_for_entries(hass, call, _async_export)
+
+    hass.services.async_register(
+        DOMAIN,
+        "export_historical_data",
+        handle_export_historical_data,
+        schema=vol.Schema({
+            vol.Optional("days", default=30): cv.positive_int,
+            vol.Optional("interval", default="hourly"): vol.In(USAGE_INTERVALS),
+            **TARGET_SCHEMA,
+        }),
+    )
+
+    # Register service to import historical data into database
+    async def handle_import_historical_data(call: ServiceCall) -> None:
+        """Handle the import historical data service call."""
+        days = call.data.get("days", 90)
+        clear_existing = call.data.get("clear_existing", False)
+        confirm_clear = call.data.get("confirm_clear", "").strip().lower()
+        interval = call.data.get("interval", "hourly")
+
+        # If clearing existing data, require confirmation
+        if clear_existing and confirm_clear != "yes":
+            _LOGGER.error("Import cancelled - clear_existing is true but confirmation not provided. You must type 'yes' in confirm_clear field.")
+            return
+
+        _LOGGER.info(f"Importing {days} days of Contact Energy historical data into database...")
+
+        # Each account writes its own statistics, so they import side by side
+        async def _async_import(entry_data: dict) -> int:
+            if clear_existing:
+                await _async_clear_statistics(hass, entry_data)
+            return await _async_import_entry(
+                hass, entry_data, days, interval, clear_existing
+            )
+
+        for entry_data, total_records in await _async_run_for_entries(
+            hass, call, _async_import
+        ):
+            _LOGGER.info(
+                f"Successfully imported {total_records} hourly statistics for account "
+                f"{entry_data['api']._accountId} into Energy Dashboard"
+            )
+
+    hass.services.async_register(
+        DOMAIN,
+        "import_historical_data",
+        handle_import_historical_data,
+        schema=vol.Schema({
+            vol.Optional("days", default=90): cv.positive_int,
+            vol.Optional("clear_existing", default=False): cv.boolean,
+            vol.Optional("confirm_clear", default=""): cv.string,
+            vol.Optional("interval", default="hourly"): vol.In(USAGE_INTERVALS),
+            **TARGET_SCHEMA,
+        }),
+    )
+
+    # Register service to rewrite only the hours Contact has revised
+    async def handle_reconcile_statistics(call: ServiceCall) -> None:
+        """Handle the reconcile statistics service call."""
+        days = call.data.get("days", 7)
+        _LOGGER.info(f"Reconciling {days} days of Contact Energy statistics...")
+
+        async def _async_reconcile(entry_data: dict) -> int:
+            api: ContactEnergyApi = entry_data["api"]
+            # Revised hours are only seen in fresh responses
+            if api.usage_cache:
+                api.usage_cache.clear(api._contractId)
+            start, hourly = await _async_fetch_hourly(hass, entry_data, days)
+            if not any(hourly.values()):
+                _LOGGER.warning(f"No usage data found to reconcile for account {api._accountId}")
+                return 0
+            return await async_reconcile_statistics(
+                hass, hourly, start, suffix=entry_data["statistics_suffix"]
+            )
+
+        for entry_data, rewritten in await _async_run_for_entries(
+            hass, call, _async_reconcile
+        ):
+            _LOGGER.info(
+                f"Reconciled {days} days for account {entry_data['api']._accountId}: "
+                f"{rewritten} hourly statistics rewritten"
+            )
+
+    hass.services.async_register(
+        DOMAIN,
+        "reconcile_statistics",
+        handle_reconcile_statistics,
+        schema=vol.Schema({
+            vol.Optional("days", default=7): cv.positive_int,
+            **TARGET_SCHEMA,
+        }),
+    )
+
+    # Register service to refetch only the days that are missing hours
+    async def handle_fill_gaps(call: ServiceCall) -> None:
+        """Handle the fill gaps service call."""
+        days = call.data.get("days", 90)
+        _LOGGER.info(f"Looking for gaps in the last {days} days of Contact Energy data...")
+
+        async def _async_fill(entry_data: dict) -> int:
+            return await async_fill_gaps(hass, entry_data, days)
+
+        for entry_data, fetched in await _async_run_for_entries(hass, call, _async_fill):
+            _LOGGER.info(
+                f"Filled gaps for account {entry_data['api']._accountId} "
+                f"with {fetched} hourly records"
+            )
+
+    hass.services.async_register(
+        DOMAIN,
+        "fill_gaps",
+        handle_fill_gaps,
+        schema=vol.Schema({
+            vol.Optional("days", default=90): cv.positive_int,
+            **TARGET_SCHEMA,
+        }),
+    )
+
+    # Register service to rebuild the statistics from local data, without the API
+    async def handle_restore_statistics(call: ServiceCall) -> None:
+        """Handle the restore statistics service call."""
+        await _async_restore(hass, call)
+
+    hass.services.async_register(
+        DOMAIN,
+        "restore_statistics",
+        handle_restore_statistics,
+        schema=vol.Schema({
+            vol.Optional("source", default="csv"): vol.In(RESTORE_SOURCES),
+            vol.Optional("file", default="contact_energy_export.csv"): cv.string,
+            vol.Optional("start_date"): cv.date,
+            vol.Optional("end_date"): cv.date,
+            **TARGET_SCHEMA,
+        }),
+    )
+
+    # Register service to answer usage queries from local data
+    async def handle_query_usage(call: ServiceCall) -> ServiceResponse:
+        """Handle the query usage service call."""
+        start_date = call.data["start_date"]
+        end_date = call.data["end_date"]
+        if end_date < start_date:
+            raise HomeAssistantError("end_date must not be before start_date")
+
+        entry_data = _selected_entry(hass, call, "query")
+        if not await _async_ensure_login(entry_data):
+            raise HomeAssistantError("Failed to login to Contact Energy API")
+        return await async_query_usage(
+            hass, entry_data, start_date, end_date, call.data["group_by"]
+        )
+
+    hass.services.async_register(
+        DOMAIN,
+        "query_usage",
+        handle_query_usage,
+        schema=vol.Schema({
+            vol.Required("start_date"): cv.date,
+            vol.Required("end_date"): cv.date,
+            vol.Optional("group_by", default="day"): vol.In(GROUP_BY_OPTIONS),
+            **TARGET_SCHEMA,
+        }),
+        supports_response=SupportsResponse.ONLY,
+    )
+
+
+async def _async_restore(hass: HomeAssistant, call: ServiceCall) -> None:
+    """Restore the statistics from a CSV, or from the stores of the selected accounts."""
+    first = call.data.get("start_date")
+    last = call.data.get("end_date")
+    if first and last and last < first:
+        raise HomeAssistantError("end_date must not be before start_date")
+
+    if call.data["source"] == "csv":
+        # An export CSV holds one account's hours
+        entry_data = _selected_entry(hass, call, "restore from a CSV")
+        path = hass.config.path(call.data["file"])
+        if not hass.config.is_allowed_path(path):
+            raise HomeAssistantError(f"Reading {path} is not allowed")
+        if not await hass.async_add_executor_job(Path(path).is_file):
+            raise HomeAssistantError(f"{path} does not exist")
+        _LOGGER.info(f"Restoring Contact Energy statistics from {path}...")
+        try:
+            written = await async_restore_statistics(
+                hass,
+                entry_data["executor"],
+                read_export_csv(path, first, last),
+                entry_data["statistics_suffix"],
+            )
+        except ValueError as err:
+            raise HomeAssistantError(str(err)) from err
+        _LOGGER.info(f"Restored {written} hourly statistics from {path}")
+        return
+
+    if not _selected_entries(hass, call):
+        raise HomeAssistantError("No matching Contact Energy account found")
+
+    async def _async_restore_entry(entry_data: dict) -> int:
+        api: ContactEnergyApi = entry_data["api"]
+        store = entry_data.get("store")
+        if not store:
+            raise HomeAssistantError(
+                f"Account {api._accountId} has no local usage store to restore from"
+            )
+        return await async_restore_statistics(
+            hass,
+            entry_data["executor"],
+            read_store(store, api._contractId, first, last),
+            entry_data["statistics_suffix"],
+        )
+
+    # Restoring reads local data only, so the accounts are not logged in
+    for entry_data, written in await _async_run_for_entries(
+        hass, call, _async_restore_entry, login=False
+    ):
+        _LOGGER.info(
+            f"Restored {written} hourly statistics for account "
+            f"{entry_data['api']._accountId} from the local usage store"
+        )
+
+
+async def _async_export_entry(
+    hass: HomeAssistant,
+    entry_data: dict,
+    days: int,
+    interval: str,
+    suffix: bool,
+) -> None:
+    """Export one account's usage to a CSV file in the config directory."""
+    api: ContactEnergyApi = entry_data["api"]
+    executor = entry_data["executor"]
+
+    # Fetch historical data, one request per day for hourly data (a few days
+    # ahead of the one being converted) or a single range request for
+    # daily/monthly totals
+    today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    all_data = []
+
+    if interval == "hourly":
+        usage = api.iter_usage(
+            (today - timedelta(days=days)).date(),
+            (today - timedelta(days=1)).date(),
+            executor.async_run,
+        )
+        async with aclosing(usage):
+            async for _, response, _ in usage:
+                all_data.extend(export_record(row) for row in response or [])
+    else:
+        response = await executor.async_run(
+            api.get_usage_range,
+            (today - timedelta(days=days)).strftime("%Y-%m-%d"),
+            (today - timedelta(days=1)).strftime("%Y-%m-%d"),
+            interval,
+        )
+        all_data = [export_record(row) for row in response or []]
+
+    if not all_data:
+        _LOGGER.warning("No historical data found to export")
+        return
+
+    # Save to CSV file in Home Assistant config directory
+    filename = "contact_energy_export.csv"
+    if suffix:
+        filename = f"contact_energy_export_{api._accountId}.csv"
+    csv_path = Path(hass.config.path(filename))
+
+    with entry_data["tracer"].span(
+        "csv_write", file=filename, rows=len(all_data)
+    ) as span:
+        span["bytes"] = await executor.async_run(
+            _write_csv, csv_path, all_data
+        )
+
+    _LOGGER.info(
+        f"Exported {len(all_data)} hourly records to {csv_path}"
+    )
+
+    # Calculate summary statistics
+    total_kwh = sum(d["kwh"] for d in all_data)
+    total_cost = sum(d["cost_nzd"] for d in all_data)
+    peak_kwh = sum(d["peak_kwh"] for d in all_data)
+    offpeak_kwh = sum(d["offpeak_kwh"] for d in all_data)
+
+    _LOGGER.info(
+        f"Summary: Total={total_kwh:.2f} kWh (Peak={peak_kwh:.2f}, Off-Peak={offpeak_kwh:.2f}), Cost=${total_cost:.2f}"
+    )
+
+
+async def _async_clear_statistics(hass: HomeAssistant, entry_data: dict) -> None:
+    """Clear one account's statistics before a fresh import."""
+    _LOGGER.info(
+        f"Clearing existing Contact Energy statistics for account {entry_data['api']._accountId}..."
+    )
+    for statistic_id in STATISTIC_NAMES:
+        if statistic_id == STATISTIC_EXPORT and not entry_data["options"].get(CONF_SOLD, False):
+            # Export is only fetched when tracked, so it would not come back
+            continue
+        stored_id = entry_statistic_id(statistic_id, entry_data["statistics_suffix"])
+        await get_instance(hass).async_clear_statistics([stored_id])
+        _LOGGER.info(f"Cleared statistics for {stored_id}")
+
+
+def _write_csv(csv_path: Path, data: list) -> int:
+    """Write data to CSV file and return its size (runs in executor)."""
+    with open(csv_path, "w", newline="", encoding="utf-8") as csvfile:
+        writer = csv.DictWriter(csvfile, fieldnames=EXPORT_FIELDS)
+        writer.writeheader()
+        writer.writerows(data)
+    return csv_path.stat().st_size
+
+
+async def _async_import_entry(
+    hass: HomeAssistant,
+    entry_data: dict,
+    days: int,
+    interval: str,
+    cleared: bool,
+) -> int:
+    """Import one account's usage into the statistics and return the rows written."""
+    # With a coarser interval only the recent window is fetched hourly
+    hourly_days = days
+    if interval != "hourly":
+        hourly_days = min(days, entry_data["usage_days"])
+        if interval == "monthly":
+            # Start the hourly window on a month boundary so no month is counted twice
+            today = dt_util.start_of_local_day()
+            hourly_days = (today - (today - timedelta(days=hourly_days)).replace(day=1)).days
+
+    _LOGGER.info(f"Fetching data from API for {days} days...")
+    start, hourly = await _async_fetch_hourly(
+        hass, entry_data, hourly_days, use_store=True
+    )
+    covered: set[datetime] = set()
+    if hourly_days < days:
+        start = await _async_fetch_coarse(
+            hass, entry_data, days, start, interval, hourly, covered
+        )
+
+    if not any(hourly.values()):
+        _LOGGER.warning("No historical data found to import")
+        return 0
+
+    return await async_reconcile_statistics(
+        hass,
+        hourly,
+        start,
+        cleared=cleared,
+        covered=covered,
+        suffix=entry_data["statistics_suffix"],
+    )
+
+
+async def _async_fetch_hourly(
+    hass: HomeAssistant,
+    entry_data: dict,
+    days: int,
+    use_store: bool = False,
+) -> tuple[datetime, dict[str, dict[datetime, float]]]:
+    """Fetch the last ``days`` days and split them into hourly kWh and cost values.
+
+    Fetched days are saved to the local store when one is configured. With
+    ``use_store``, days the store already holds in full are read from it
+    instead of the API, unless the entry tracks export, which the store
+    does not keep.
+    """
+    start = dt_util.start_of_local_day() - timedelta(days=days)
+    sold = [] if entry_data["options"].get(CONF_SOLD, False) else None
+    rows = await async_load_rows(
+        hass, entry_data, start, days, use_store and sold is None, sold
+    )
+
+    hourly = empty_hourly()
+    for hour, value, dollar_value, offpeak_value, _ in rows:
+        add_usage_point(
+            hourly, dt_util.utc_from_timestamp(hour), value, dollar_value, offpeak_value
+        )
+    for hour, value in sold or ():
+        add_export_point(hourly, dt_util.utc_from_timestamp(hour), value)
+
+    return start, hourly
+
+
+async def _async_fetch_coarse(
+    hass: HomeAssistant,
+    entry_data: dict,
+    days: int,
+    end: datetime,
+    interval: str,
+    hourly: dict[str, dict[datetime, float]],
+    covered: set[datetime],
+) -> datetime:
+    """Fetch the days before ``end`` at a daily or monthly interval into ``hourly``.
+
+    The whole range is a single request and each point becomes one statistics
+    row at the start of its day or month. The other hours of each period are
+    added to ``covered``, so hourly rows already recorded there are zeroed
+    and not counted on top of the point. Returns the start of the range.
+    """
+    start = dt_util.start_of_local_day() - timedelta(days=days)
+    if interval == "monthly":
+        start = start.replace(day=1)
+    if start >= end:
+        return end
+
+    api: ContactEnergyApi = entry_data["api"]
+    response = await entry_data["executor"].async_run(
+        api.get_usage_range,
+        start.strftime("%Y-%m-%d"),
+        (end - timedelta(days=1)).strftime("%Y-%m-%d"),
+        interval,
+    )
+    rows = response or []
+    for hour, value, dollar_value, offpeak_value, _ in rows:
+        period_start = dt_util.as_local(dt_util.utc_from_timestamp(hour))
+        add_period_point(hourly, period_start, value, dollar_value, offpeak_value)
+        period_end = (
+            (period_start.replace(day=1) + timedelta(days=32)).replace(day=1)
+            if interval == "monthly"
+            else period_start + timedelta(days=1)
+        )
+        covered |= period_hours(period_start, min(period_end, end))
+
+    _LOGGER.info(f"Fetched {len(rows)} {interval} points in one request")
+    return start
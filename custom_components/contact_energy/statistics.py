@@ -0,0 +1,365 @@
+"""Energy Dashboard statistics for Contact Energy."""
+
+from __future__ import annotations
+
+import asyncio
+from collections import defaultdict
+from collections.abc import AsyncIterator
+from datetime import datetime, timedelta
+import logging
+
+from homeassistant.components.recorder import get_instance
+from homeassistant.components.recorder.models import StatisticData, StatisticMetaData
+from homeassistant.components.recorder.statistics import (
+    async_add_external_statistics,
+    statistics_during_period,
+)
+from homeassistant.const import UnitOfEnergy
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN
+from .store import HourRow
+
+_LOGGER = logging.getLogger(__name__)
+
+STATISTIC_CONSUMPTION = f"{DOMAIN}:energy_consumption"
+STATISTIC_FREE_CONSUMPTION = f"{DOMAIN}:free_energy_consumption"
+STATISTIC_COST = f"{DOMAIN}:energy_cost"
+STATISTIC_FREE_COST = f"{DOMAIN}:free_energy_cost"
+STATISTIC_EXPORT = f"{DOMAIN}:energy_export"
+
+STATISTIC_NAMES = {
+    STATISTIC_CONSUMPTION: "Contact Energy",
+    STATISTIC_FREE_CONSUMPTION: "Contact Energy Free",
+    STATISTIC_COST: "Contact Energy Cost",
+    STATISTIC_FREE_COST: "Contact Energy Free Cost",
+    STATISTIC_EXPORT: "Contact Energy Export",
+}
+
+STATISTIC_UNITS = {
+    STATISTIC_CONSUMPTION: UnitOfEnergy.KILO_WATT_HOUR,
+    STATISTIC_FREE_CONSUMPTION: UnitOfEnergy.KILO_WATT_HOUR,
+    STATISTIC_COST: "NZD",
+    STATISTIC_FREE_COST: "NZD",
+    STATISTIC_EXPORT: UnitOfEnergy.KILO_WATT_HOUR,
+}
+
+# Statistics derived from usage rows, as opposed to export
+USAGE_STATISTICS = (
+    STATISTIC_CONSUMPTION,
+    STATISTIC_FREE_CONSUMPTION,
+    STATISTIC_COST,
+    STATISTIC_FREE_COST,
+)
+
+# How far back from the start of a window to look for the running sum to continue
+BASE_SUM_LOOKBACK = timedelta(days=30)
+
+# Differences below this are float noise, not a revision
+_TOLERANCE = 1e-6
+
+# Reconciles of one account read and rewrite the same running sums, so they
+# run one at a time; accounts with their own statistics run side by side
+_RECONCILE_LOCKS: defaultdict[str, asyncio.Lock] = defaultdict(asyncio.Lock)
+
+
+def entry_statistic_id(statistic_id: str, suffix: str = "") -> str:
+    """Return the ID an account writes one of the statistics above under.
+
+    The first account keeps the shared IDs; each further one has its own,
+    ending in its ``suffix``.
+    """
+    return f"{statistic_id}_{suffix}" if suffix else statistic_id
+
+
+def statistic_metadata(statistic_id: str, suffix: str = "") -> StatisticMetaData:
+    """Return the external statistic metadata for a Contact Energy statistic."""
+    name = STATISTIC_NAMES[statistic_id]
+    return StatisticMetaData(
+        has_mean=False,
+        has_sum=True,
+        name=f"{name} {suffix}" if suffix else name,
+        source=DOMAIN,
+        statistic_id=entry_statistic_id(statistic_id, suffix),
+        unit_of_measurement=STATISTIC_UNITS[statistic_id],
+    )
+
+
+def empty_hourly() -> dict[str, dict[datetime, float]]:
+    """Return an empty hour -> value mapping for every statistic."""
+    return {statistic_id: {} for statistic_id in STATISTIC_NAMES}
+
+
+def add_usage_point(
+    hourly: dict[str, dict[datetime, float]],
+    timestamp: datetime,
+    value: float,
+    cost: float,
+    offpeak_value: float,
+) -> None:
+    """Record one hourly usage point against the peak or off-peak statistics."""
+    hour = dt_util.as_utc(timestamp)
+    # Off-peak detection: offpeakValue > 0 means off-peak/free energy
+    if offpeak_value > 0:
+        hourly[STATISTIC_FREE_CONSUMPTION][hour] = value
+        hourly[STATISTIC_FREE_COST][hour] = cost
+    else:
+        hourly[STATISTIC_CONSUMPTION][hour] = value
+        hourly[STATISTIC_COST][hour] = cost
+
+
+def add_export_point(
+    hourly: dict[str, dict[datetime, float]], timestamp: datetime, value: float
+) -> None:
+    """Record one hour of energy exported to the grid."""
+    hourly[STATISTIC_EXPORT][dt_util.as_utc(timestamp)] = value
+
+
+def add_period_point(
+    hourly: dict[str, dict[datetime, float]],
+    timestamp: datetime,
+    value: float,
+    cost: float,
+    offpeak_value: float,
+) -> None:
+    """Record a daily or monthly point as one row at the start of its period.
+
+    Unlike an hourly point, a period mixes peak and off-peak energy, so the
+    kWh are split by ``offpeak_value`` and the cost pro rata.
+    """
+    hour = dt_util.as_utc(timestamp)
+    offpeak_kwh = min(max(offpeak_value, 0.0), value)
+    offpeak_share = offpeak_kwh / value if value else 0.0
+    hourly[STATISTIC_CONSUMPTION][hour] = value - offpeak_kwh
+    hourly[STATISTIC_COST][hour] = cost * (1 - offpeak_share)
+    hourly[STATISTIC_FREE_CONSUMPTION][hour] = offpeak_kwh
+    hourly[STATISTIC_FREE_COST][hour] = cost * offpeak_share
+
+
+def period_hours(start: datetime, end: datetime) -> set[datetime]:
+    """Return the UTC hour starts from ``start`` up to, not including, ``end``."""
+    first = dt_util.as_utc(start)
+    return {
+        first + timedelta(hours=hour)
+        for hour in range(int((dt_util.as_utc(end) - first).total_seconds() // 3600))
+    }
+
+
+def _reconcile(
+    fresh: dict[datetime, float],
+    covered: set[datetime],
+    stored_rows: list[dict],
+    start: datetime,
+) -> list[StatisticData]:
+    """Return the rows of one statistic that need rewriting from ``start`` on."""
+    base_sum = 0.0
+    stored: dict[datetime, tuple[float | None, float | None]] = {}
+    for row in stored_rows:
+        row_start = dt_util.utc_from_timestamp(row["start"])
+        if row_start < start:
+            # Rows are ordered, so the last one before the window holds the base sum
+            if row.get("sum") is not None:
+                base_sum = row["sum"]
+        else:
+            stored[row_start] = (row.get("state"), row.get("sum"))
+
+    rows = []
+    running_sum = base_sum
+    hours = {hour for hour in fresh if hour >= start} | stored.keys()
+    for hour in sorted(hours):
+        old_state, old_sum = stored.get(hour, (None, None))
+        if hour in fresh:
+            state = fresh[hour]
+        elif hour in covered:
+            # The API now reports this hour under the other statistic
+            state = 0.0
+        else:
+            state = old_state or 0.0
+
+        running_sum += state
+        if (
+            old_state is None
+            or old_sum is None
+            or abs(state - old_state) > _TOLERANCE
+            or abs(running_sum - old_sum) > _TOLERANCE
+        ):
+            rows.append(StatisticData(start=hour, state=state, sum=running_sum))
+
+    return rows
+
+
+async def async_reconcile_statistics(
+    hass: HomeAssistant,
+    hourly: dict[str, dict[datetime, float]],
+    start: datetime,
+    cleared: bool = False,
+    covered: set[datetime] | None = None,
+    suffix: str = "",
+) -> int:
+    """Write the hours that differ from the recorder's statistics.
+
+    ``hourly`` maps each statistic ID to UTC hour starts and the kWh or NZD
+    fetched from the API; they are written under the IDs of the account
+    with statistic ``suffix`` (see entry_statistic_id). Hours from ``start`` onwards that changed are
+    rewritten together with every later hour whose running sum shifted; the
+    rest are left alone.
+    Stored hours in ``covered`` without a fetched value are set to zero, such
+    as the hours inside a daily or monthly point, whose energy is all in the
+    row at the start of its period.
+    Pass ``cleared`` when the statistics were just cleared so the recorder is
+    not queried. Returns the number of rows written.
+    """
+    async with _RECONCILE_LOCKS[suffix]:
+        return await _async_reconcile(
+            hass, hourly, dt_util.as_utc(start), cleared, covered or set(), suffix
+        )
+
+
+async def _async_reconcile(
+    hass: HomeAssistant,
+    hourly: dict[str, dict[datetime, float]],
+    start: datetime,
+    cleared: bool,
+    periods: set[datetime],
+    suffix: str,
+) -> int:
+    """Reconcile ``hourly`` while holding the account's lock."""
+    statistic_ids = {
+        statistic_id: entry_statistic_id(statistic_id, suffix) for statistic_id in hourly
+    }
+
+    if cleared:
+        stored = {}
+    else:
+        stored = await get_instance(hass).async_add_executor_job(
+            statistics_during_period,
+            hass,
+            start - BASE_SUM_LOOKBACK,
+            None,
+            set(statistic_ids.values()),
+            "hour",
+            None,
+            {"state", "sum"},
+        )
+
+    # An hour moves between the consumption statistics, never into export,
+    # so export hours missing from a fetch are left as they are
+    covered = periods.union(
+        *(hours for statistic_id, hours in hourly.items() if statistic_id != STATISTIC_EXPORT)
+    )
+    written = 0
+    for statistic_id in sorted(statistic_ids):
+        rows = _reconcile(
+            hourly[statistic_id],
+            set() if statistic_id == STATISTIC_EXPORT else covered,
+            stored.get(statistic_ids[statistic_id], []),
+            start,
+        )
+        if not rows:
+            continue
+        async_add_external_statistics(hass, statistic_metadata(statistic_id, suffix), rows)
+        written += len(rows)
+        _LOGGER.debug("Rewrote %d hours of %s", len(rows), statistic_ids[statistic_id])
+
+    if written:
+        # Let the recorder commit the rows so the next reconcile sees them
+        await get_instance(hass).async_block_till_done()
+    return written
+
+
+async def async_import_statistics(
+    hass: HomeAssistant,
+    chunks: AsyncIterator[list[HourRow]],
+    cleared: bool = False,
+    suffix: str = "",
+) -> int:
+    """Write the usage statistics of hourly rows streamed in ordered chunks.
+
+    Each chunk is split into the peak and off-peak statistics and written
+    with its running sums as soon as it is read, so only one chunk is held
+    at a time. Every hour gets a row in all four statistics, replacing what
+    the recorder had. Sums continue from the last row before the first hour,
+    and stored rows after the last hour are then rewritten onto the new
+    sums. Pass ``cleared`` when the statistics were just cleared so the
+    recorder is not queried, and the account's statistic ``suffix`` as for
+    async_reconcile_statistics. Returns the number of rows written.
+    """
+    async with _RECONCILE_LOCKS[suffix]:
+        sums: dict[str, float] | None = None
+        last_hour: datetime | None = None
+        written = 0
+        async for rows in chunks:
+            if not rows:
+                continue
+            hourly = empty_hourly()
+            for hour, value, dollar_value, offpeak_value in rows:
+                add_usage_point(
+                    hourly, dt_util.utc_from_timestamp(hour), value, dollar_value, offpeak_value
+                )
+            hours = sorted(set().union(*hourly.values()))
+            if last_hour is not None:
+                hours = [hour for hour in hours if hour > last_hour]
+            if not hours:
+                continue
+            if sums is None:
+                sums = await _async_base_sums(hass, hours[0], cleared, suffix)
+
+            for statistic_id in USAGE_STATISTICS:
+                values = hourly[statistic_id]
+                running_sum = sums[statistic_id]
+                statistics = []
+                for hour in hours:
+                    state = values.get(hour, 0.0)
+                    running_sum += state
+                    statistics.append(StatisticData(start=hour, state=state, sum=running_sum))
+                sums[statistic_id] = running_sum
+                async_add_external_statistics(
+                    hass, statistic_metadata(statistic_id, suffix), statistics
+                )
+            written += len(hours) * len(USAGE_STATISTICS)
+            last_hour = hours[-1]
+
+        if last_hour is None:
+            return 0
+        await get_instance(hass).async_block_till_done()
+        if not cleared:
+            # Carry the new sums through the hours recorded after the import
+            written += await _async_reconcile(
+                hass,
+                {statistic_id: {} for statistic_id in USAGE_STATISTICS},
+                last_hour + timedelta(hours=1),
+                False,
+                set(),
+                suffix,
+            )
+        return written
+
+
+async def _async_base_sums(
+    hass: HomeAssistant, start: datetime, cleared: bool, suffix: str
+) -> dict[str, float]:
+    """Return each usage statistic's sum at the last row before ``start``."""
+    sums = dict.fromkeys(USAGE_STATISTICS, 0.0)
+    if cleared:
+        return sums
+    statistic_ids = {
+        statistic_id: entry_statistic_id(statistic_id, suffix)
+        for statistic_id in USAGE_STATISTICS
+    }
+    stored = await get_instance(hass).async_add_executor_job(
+        statistics_during_period,
+        hass,
+        start - BASE_SUM_LOOKBACK,
+        start,
+        set(statistic_ids.values()),
+        "hour",
+        None,
+        {"sum"},
+    )
+    for statistic_id, stored_id in statistic_ids.items():
+        for row in reversed(stored.get(stored_id, [])):
+            if row.get("sum") is not None:
+                sums[statistic_id] = row["sum"]
+                break
+    return sums
@@ -0,0 +1,277 @@
+"""Local SQLite store of Contact Energy hourly usage."""
+
+from __future__ import annotations
+
+from collections.abc import Iterable
+import logging
+import sqlite3
+import threading
+import time
+
+from .archive import UsageArchive, source_timestamp
+
+_LOGGER = logging.getLogger(__name__)
+
+STORE_FILENAME = "contact_energy.db"
+
+# (hour, kwh, cost, offpeak_kwh, source_ts); hour is the UTC epoch of the hour start
+UsageRow = tuple[int, float, float, float, str]
+
+# (hour, kwh, cost, offpeak_kwh); a UsageRow without its source timestamp
+HourRow = tuple[int, float, float, float]
+
+# (period, kwh, cost, peak_kwh, offpeak_kwh, max_kwh, hours); period is the
+# day (YYYY-MM-DD) or month (YYYY-MM) in Contact's local time
+RollupRow = tuple[str, float, float, float, float, float, int]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS hourly_usage (
+    contract_id TEXT NOT NULL,
+    hour INTEGER NOT NULL,
+    kwh REAL NOT NULL,
+    cost REAL NOT NULL,
+    offpeak_kwh REAL NOT NULL,
+    source_ts TEXT NOT NULL,
+    fetched_at INTEGER NOT NULL,
+    PRIMARY KEY (contract_id, hour)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS daily_usage (
+    contract_id TEXT NOT NULL,
+    day TEXT NOT NULL,
+    kwh REAL NOT NULL,
+    cost REAL NOT NULL,
+    peak_kwh REAL NOT NULL,
+    offpeak_kwh REAL NOT NULL,
+    max_kwh REAL NOT NULL,
+    hours INTEGER NOT NULL,
+    PRIMARY KEY (contract_id, day)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS monthly_usage (
+    contract_id TEXT NOT NULL,
+    month TEXT NOT NULL,
+    kwh REAL NOT NULL,
+    cost REAL NOT NULL,
+    peak_kwh REAL NOT NULL,
+    offpeak_kwh REAL NOT NULL,
+    max_kwh REAL NOT NULL,
+    hours INTEGER NOT NULL,
+    PRIMARY KEY (contract_id, month)
+) WITHOUT ROWID;
+"""
+
+# An hour is off-peak when Contact reports an off-peak value for it
+_DAILY_ROLLUP = """
+INSERT OR REPLACE INTO daily_usage
+    (contract_id, day, kwh, cost, peak_kwh, offpeak_kwh, max_kwh, hours)
+SELECT contract_id, substr(source_ts, 1, 10), SUM(kwh), SUM(cost),
+    SUM(CASE WHEN offpeak_kwh > 0 THEN 0 ELSE kwh END), SUM(offpeak_kwh),
+    MAX(kwh), COUNT(*)
+FROM hourly_usage
+"""
+
+_MONTHLY_ROLLUP = """
+INSERT OR REPLACE INTO monthly_usage
+    (contract_id, month, kwh, cost, peak_kwh, offpeak_kwh, max_kwh, hours)
+SELECT contract_id, substr(day, 1, 7), SUM(kwh), SUM(cost), SUM(peak_kwh),
+    SUM(offpeak_kwh), MAX(max_kwh), SUM(hours)
+FROM daily_usage
+"""
+
+# Hours either side of a batch to search for the rest of its local days
+_DAY_MARGIN = 86400
+
+
+class UsageStore:
+    """Hourly usage points per contract, indexed on (contract, hour).
+
+    Daily and monthly rollups are kept alongside and updated for the days
+    each upsert touches, so period totals never rescan the hours. With an
+    archive directory, hours are also written to a memory-mapped archive
+    that serves the hourly range reads instead of the database. All
+    methods block and must be run in the executor. A single connection is
+    shared between executor threads and serialised with a lock.
+    """
+
+    def __init__(self, path: str, archive_dir: str | None = None) -> None:
+        """Initialise the store; the database and archive are opened lazily."""
+        self._path = path
+        self._conn: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+        self._archive: UsageArchive | None = None
+        if archive_dir is not None:
+            self._archive = UsageArchive(archive_dir)
+
+    def _connection(self) -> sqlite3.Connection:
+        """Return the open connection, creating the schema on first use."""
+        if self._conn is None:
+            conn = sqlite3.connect(self._path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            new_rollups = not conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE name = 'daily_usage'"
+            ).fetchone()
+            conn.executescript(_SCHEMA)
+            if new_rollups:
+                # Build the rollups for hours stored before they existed
+                with conn:
+                    conn.execute(_DAILY_ROLLUP + "GROUP BY contract_id, substr(source_ts, 1, 10)")
+                    conn.execute(_MONTHLY_ROLLUP + "GROUP BY contract_id, substr(day, 1, 7)")
+            self._conn = conn
+            _LOGGER.debug("Opened usage store at %s", self._path)
+        return self._conn
+
+    def close(self) -> None:
+        """Close the database connection and the archive."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+            if self._archive is not None:
+                self._archive.close()
+
+    def _archived(self, contract_id: str) -> UsageArchive | None:
+        """Return the archive, first copying in a contract's stored hours."""
+        if self._archive is None or self._archive.has(contract_id):
+            return self._archive
+        rows = self._connection().execute(
+            "SELECT hour, kwh, cost, offpeak_kwh, source_ts FROM hourly_usage "
+            "WHERE contract_id = ? ORDER BY hour",
+            (contract_id,),
+        ).fetchall()
+        if rows:
+            self._archive.write(contract_id, rows)
+            _LOGGER.debug("Archived %d stored hours of %s", len(rows), contract_id)
+        return self._archive
+
+    def upsert(self, contract_id: str, rows: Iterable[UsageRow]) -> int:
+        """Insert or replace hourly rows for a contract, returning the row count."""
+        fetched_at = int(time.time())
+        params = [(contract_id, *row, fetched_at) for row in rows]
+        if not params:
+            return 0
+        with self._lock:
+            conn = self._connection()
+            archive = self._archived(contract_id)
+            # The archive is written before the transaction commits, so a
+            # failed write rolls the database back. Runs written before the
+            # failure would stay in the archive, so its file is dropped and
+            # rebuilt from the database on the next read.
+            with conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO hourly_usage "
+                    "(contract_id, hour, kwh, cost, offpeak_kwh, source_ts, fetched_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    params,
+                )
+                self._update_rollups(conn, contract_id, params)
+                if archive:
+                    try:
+                        archive.write(contract_id, (param[1:6] for param in params))
+                    except Exception:
+                        archive.discard(contract_id)
+                        raise
+        return len(params)
+
+    def _update_rollups(
+        self, conn: sqlite3.Connection, contract_id: str, params: list[tuple]
+    ) -> None:
+        """Recompute the daily and monthly rollups of the days in ``params``."""
+        days: dict[str, list[int]] = {}
+        for _, hour, _, _, _, source_ts, _ in params:
+            bounds = days.setdefault(source_ts[:10], [hour, hour])
+            bounds[0] = min(bounds[0], hour)
+            bounds[1] = max(bounds[1], hour)
+
+        for day, (first, last) in days.items():
+            conn.execute(
+                _DAILY_ROLLUP
+                + "WHERE contract_id = ? AND hour BETWEEN ? AND ? "
+                "AND substr(source_ts, 1, 10) = ? GROUP BY contract_id",
+                (contract_id, first - _DAY_MARGIN, last + _DAY_MARGIN, day),
+            )
+        for month in {day[:7] for day in days}:
+            conn.execute(
+                _MONTHLY_ROLLUP
+                + "WHERE contract_id = ? AND day BETWEEN ? AND ? GROUP BY contract_id",
+                (contract_id, f"{month}-01", f"{month}-31"),
+            )
+
+    def get_range(self, contract_id: str, start: int, end: int) -> list[UsageRow]:
+        """Return the rows with ``start <= hour < end``, ordered by hour."""
+        with self._lock:
+            if archive := self._archived(contract_id):
+                return [
+                    (hour, kwh, cost, offpeak_kwh, source_timestamp(hour, offset))
+                    for hour, kwh, cost, offpeak_kwh, offset in archive.get_range(
+                        contract_id, start, end
+                    )
+                ]
+            return self._connection().execute(
+                "SELECT hour, kwh, cost, offpeak_kwh, source_ts FROM hourly_usage "
+                "WHERE contract_id = ? AND hour >= ? AND hour < ? ORDER BY hour",
+                (contract_id, start, end),
+            ).fetchall()
+
+    def get_hours(self, contract_id: str, start: int, end: int) -> list[HourRow]:
+        """Return the rows with ``start <= hour < end`` without source timestamps.
+
+        Cheaper than get_range for callers that only need the numbers, as no
+        timestamp text is built or read.
+        """
+        with self._lock:
+            if archive := self._archived(contract_id):
+                return [row[:4] for row in archive.get_range(contract_id, start, end)]
+            return self._connection().execute(
+                "SELECT hour, kwh, cost, offpeak_kwh FROM hourly_usage "
+                "WHERE contract_id = ? AND hour >= ? AND hour < ? ORDER BY hour",
+                (contract_id, start, end),
+            ).fetchall()
+
+    def get_daily(self, contract_id: str, first: str, last: str) -> list[RollupRow]:
+        """Return the daily rollups from day ``first`` to ``last`` inclusive."""
+        with self._lock:
+            return self._connection().execute(
+                "SELECT day, kwh, cost, peak_kwh, offpeak_kwh, max_kwh, hours "
+                "FROM daily_usage WHERE contract_id = ? AND day BETWEEN ? AND ? "
+                "ORDER BY day",
+                (contract_id, first, last),
+            ).fetchall()
+
+    def get_monthly(self, contract_id: str, first: str, last: str) -> list[RollupRow]:
+        """Return the monthly rollups from month ``first`` to ``last`` inclusive."""
+        with self._lock:
+            return self._connection().execute(
+                "SELECT month, kwh, cost, peak_kwh, offpeak_kwh, max_kwh, hours "
+                "FROM monthly_usage WHERE contract_id = ? AND month BETWEEN ? AND ? "
+                "ORDER BY month",
+                (contract_id, first, last),
+            ).fetchall()
+
+    def count_hours(self, contract_id: str, start: int, end: int) -> int:
+        """Return how many hours in ``[start, end)`` are stored."""
+        with self._lock:
+            if archive := self._archived(contract_id):
+                return archive.count_hours(contract_id, start, end)
+            return self._connection().execute(
+                "SELECT COUNT(*) FROM hourly_usage "
+                "WHERE contract_id = ? AND hour >= ? AND hour < ?",
+                (contract_id, start, end),
+            ).fetchone()[0]
+
+    def first_hour(self, contract_id: str) -> int | None:
+        """Return the earliest stored hour for a contract."""
+        with self._lock:
+            return self._connection().execute(
+                "SELECT MIN(hour) FROM hourly_usage WHERE contract_id = ?",
+                (contract_id,),
+            ).fetchone()[0]
+
+    def latest_hour(self, contract_id: str) -> int | None:
+        """Return the most recent stored hour for a contract."""
+        with self._lock:
+            if archive := self._archived(contract_id):
+                return archive.latest_hour(contract_id)
+            return self._connection().execute(
+                "SELECT MAX(hour) FROM hourly_usage WHERE contract_id = ?",
+                (contract_id,),
+            ).fetchone()[0]
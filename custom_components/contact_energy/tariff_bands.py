@@ -0,0 +1,233 @@
+"""Parse Contact Energy bill charges into tariff bands.
+
+``VariableCharges`` lines describe their hours in free text, such as
+"Off Peak 9PM - 7AM", "Weekend Free Hours 9:00am-5:00pm", "Night 9pm-midnight"
+or "Anytime".
+Each line becomes a band with a rate, the minutes of the day it covers and
+the days of the week it applies to. Bands cheaper than the dearest one are
+off-peak, so plans with any number of rates are handled the same way.
+"""
+
+from __future__ import annotations
+
+from functools import lru_cache
+import logging
+import re
+from typing import Any, NamedTuple
+
+_LOGGER = logging.getLogger(__name__)
+
+# Day-of-week bitmasks, Monday first as in datetime.weekday()
+ALL_DAYS = 0b1111111
+WEEKDAYS = 0b0011111
+WEEKENDS = 0b1100000
+
+_DAY_NAMES = {ALL_DAYS: "all", WEEKDAYS: "weekdays", WEEKENDS: "weekends"}
+
+# Fixed charge line item holding the daily charge
+DAILY_CHARGE_ITEM = "ZCODLY"
+
+# A clock time, or midnight or noon (optionally written "12 midnight")
+_TIME = r"(?:(?:12\s*)?(midnight|noon|midday)|(\d{1,2})(?:[:.](\d{2}))?\s*([ap])?\.?m?\.?)"
+_NAMED_TIMES = {"midnight": 0, "noon": 12 * 60, "midday": 12 * 60}
+_TIME_RANGE = re.compile(rf"{_TIME}\s*(?:-|–|to)\s*{_TIME}", re.IGNORECASE)
+_WEEKENDS = re.compile(
+    r"\bweekends?\b|\bsat(?:urday)?s?\b.*\bsun(?:day)?s?\b", re.IGNORECASE
+)
+_WEEKDAYS = re.compile(
+    r"\bweekdays?\b|\bmon(?:day)?\s*(?:-|–|to)\s*fri(?:day)?\b", re.IGNORECASE
+)
+_FREE = re.compile(r"\bfree\b", re.IGNORECASE)
+
+
+class Band(NamedTuple):
+    """A rate and the hours it applies to.
+
+    ``start`` and ``end`` are minutes after midnight, ``end`` exclusive; a
+    band whose end is not after its start runs past midnight, and one with
+    equal start and end covers the whole day. ``days`` is a bitmask of the
+    weekdays it applies on.
+    """
+
+    description: str
+    rate: float
+    start: int
+    end: int
+    days: int
+    offpeak: bool
+
+    @property
+    def timed(self) -> bool:
+        """Return whether the band covers only part of the day."""
+        return self.start != self.end
+
+    def covers(self, weekday: int, minute: int) -> bool:
+        """Return whether the band applies at ``minute`` past midnight on ``weekday``."""
+        if not self.days & (1 << weekday):
+            return False
+        if self.start < self.end:
+            return self.start <= minute < self.end
+        if self.start > self.end:
+            return minute >= self.start or minute < self.end
+        return True
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the band for bill details and diagnostics."""
+        return {
+            "description": self.description,
+            "rate": self.rate,
+            "start": f"{self.start // 60:02d}:{self.start % 60:02d}",
+            "end": f"{self.end // 60:02d}:{self.end % 60:02d}",
+            "days": _DAY_NAMES.get(self.days, f"{self.days:07b}"),
+            "offpeak": self.offpeak,
+        }
+
+
+class BillTariff(NamedTuple):
+    """The bands and charges of one billing period."""
+
+    bands: tuple[Band, ...]
+    peak_rate: float
+    offpeak_rate: float
+    daily_charge: float
+
+    def band_at(self, weekday: int, minute: int) -> Band | None:
+        """Return the band in force at a time, preferring timed bands."""
+        covering = [band for band in self.bands if band.covers(weekday, minute)]
+        timed = [band for band in covering if band.timed]
+        return (timed or covering or [None])[0]
+
+
+def _minute(hour: str, minute: str | None, meridiem: str | None) -> int | None:
+    """Return minutes after midnight for a 12 or 24 hour clock time."""
+    value = int(hour)
+    if meridiem:
+        if not 1 <= value <= 12:
+            return None
+        value = value % 12 + (12 if meridiem.lower() == "p" else 0)
+    elif value > 24:
+        return None
+    return (value % 24) * 60 + int(minute or 0)
+
+
+def _parse_hours(description: str) -> tuple[int, int] | None:
+    """Return the start and end minute of the first time range in a description."""
+    match = _TIME_RANGE.search(description)
+    if not match:
+        return None
+    (
+        start_name,
+        start_hour,
+        start_minute,
+        start_meridiem,
+        end_name,
+        end_hour,
+        end_minute,
+        end_meridiem,
+    ) = match.groups()
+    # Bare numbers such as "2-3" are not times
+    if not (
+        start_meridiem or end_meridiem or start_minute or end_minute or start_name or end_name
+    ):
+        return None
+    start = (
+        _NAMED_TIMES[start_name.lower()]
+        if start_name
+        else _minute(start_hour, start_minute, start_meridiem or end_meridiem)
+    )
+    end = (
+        _NAMED_TIMES[end_name.lower()]
+        if end_name
+        else _minute(end_hour, end_minute, end_meridiem or start_meridiem)
+    )
+    if start is None or end is None or start == end:
+        return None
+    return start, end
+
+
+def _parse_days(description: str) -> int:
+    """Return the days of the week a description applies to."""
+    if _WEEKENDS.search(description):
+        return WEEKENDS
+    if _WEEKDAYS.search(description):
+        return WEEKDAYS
+    return ALL_DAYS
+
+
+def _price(price: Any, currency_type: str) -> float | None:
+    """Return a charge's price in dollars."""
+    try:
+        value = float(price)
+    except (ValueError, TypeError):
+        return None
+    # Contact quotes energy in cents, e.g. 32.700 cents is $0.327
+    return value / 100.0 if currency_type.lower() == "cents" else value
+
+
+@lru_cache(maxsize=8)
+def _parse(
+    variable: tuple[tuple[str, Any, str], ...], fixed: tuple[tuple[str, Any], ...]
+) -> BillTariff:
+    """Parse hashable charge lines; cached so a billing period is parsed once."""
+    lines = []
+    for description, price, currency_type in variable:
+        rate = _price(price, currency_type)
+        if rate is None:
+            _LOGGER.warning("Failed to parse price: %s", price)
+            continue
+        hours = _parse_hours(description)
+        if hours is None and any(not timed or paid for _, paid, timed, _, _ in lines):
+            # Only the first untimed line is the energy rate, and only if no
+            # paid band came before it; the rest are levies and adjustments
+            _LOGGER.debug("Ignoring untimed charge: %s", description)
+            continue
+        start, end = hours or (0, 0)
+        free = rate == 0.0 or bool(_FREE.search(description))
+        lines.append((description, 0.0 if free else rate, start != end, start, end))
+
+    dearest = max((line[1] for line in lines), default=0.0)
+    bands = tuple(
+        Band(
+            description,
+            round(rate, 4),
+            start,
+            end,
+            _parse_days(description),
+            rate < dearest,
+        )
+        for description, rate, _, start, end in lines
+    )
+    offpeak_rates = [band.rate for band in bands if band.offpeak]
+
+    daily_charge = 0.0
+    for item_type, price in fixed:
+        if item_type == DAILY_CHARGE_ITEM:
+            try:
+                daily_charge = round(float(price), 3)
+            except (ValueError, TypeError):
+                _LOGGER.warning("Failed to parse daily charge: %s", price)
+
+    return BillTariff(
+        bands,
+        round(dearest, 4),
+        min(offpeak_rates) if offpeak_rates else 0.0,
+        daily_charge,
+    )
+
+
+def parse_bill(bill_data: dict[str, Any]) -> BillTariff:
+    """Return the tariff described by an interactive-bill response."""
+    return _parse(
+        tuple(
+            (
+                charge.get("Description", ""),
+                charge.get("Price", "0"),
+                charge.get("CurrencyType", "cents"),
+            )
+            for charge in bill_data.get("VariableCharges") or []
+        ),
+        tuple(
+            (charge.get("LineItemType", ""), charge.get("Price", "0"))
+            for charge in bill_data.get("FixedCharges") or []
+        ),
+    )
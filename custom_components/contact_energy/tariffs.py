@@ -0,0 +1,135 @@
+"""History of the Contact Energy tariffs in force for each billing period."""
+
+from __future__ import annotations
+
+from bisect import bisect_left, bisect_right
+from datetime import date
+import logging
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN
+from .store import RollupRow
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+SAVE_DELAY = 30
+
+# (start, end, peak_rate, offpeak_rate, daily_charge); start and end are the
+# billing period's first and last day (YYYY-MM-DD), rates are NZD per kWh
+Tariff = tuple[str, str, float, float, float]
+
+# RollupRow columns that can be priced, and the Tariff rate applied to each
+PEAK_COLUMN = 3
+OFFPEAK_COLUMN = 4
+_RATE_INDEX = {PEAK_COLUMN: 2, OFFPEAK_COLUMN: 3}
+
+
+def tariff_from_bill(bill_details: dict) -> Tariff | None:
+    """Return the tariff of the billing period parsed by get_bill_details."""
+    if not bill_details or bill_details.get("peak_rate", 0) <= 0:
+        return None
+    try:
+        start = date.fromisoformat(bill_details.get("billing_start", "")[:10])
+        end = date.fromisoformat(bill_details.get("billing_end", "")[:10])
+    except ValueError:
+        return None
+    return (
+        start.isoformat(),
+        end.isoformat(),
+        bill_details["peak_rate"],
+        bill_details.get("offpeak_rate", 0.0),
+        bill_details.get("daily_charge", 0.0),
+    )
+
+
+class TariffHistory:
+    """Persistent tariffs per billing period, indexed by period start.
+
+    A tariff applies from its period's start until the next known period
+    starts; days before the first one are priced at a fallback rate. Day
+    costs are memoised, so recording a new or corrected tariff only
+    reprices the days of the period it covers. Used from the event loop only.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        """Initialise the history for one config entry."""
+        self._storage = Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}.tariffs")
+        self._tariffs: list[Tariff] = []
+        # Period starts, parallel to _tariffs, for bisecting
+        self._starts: list[str] = []
+        # Per priced column: day -> (kWh, fallback rate, cost)
+        self._costs: dict[int, dict[str, tuple[float, float, float]]] = {}
+
+    async def async_load(self) -> None:
+        """Load the tariffs saved before the last restart."""
+        data = await self._storage.async_load()
+        if data:
+            self._tariffs = sorted(tuple(tariff) for tariff in data["tariffs"])
+            self._starts = [tariff[0] for tariff in self._tariffs]
+
+    @property
+    def tariffs(self) -> list[Tariff]:
+        """Return the known tariffs, oldest first."""
+        return list(self._tariffs)
+
+    @callback
+    def record(self, tariff: Tariff | None) -> bool:
+        """Add or correct a period's tariff and return whether anything changed.
+
+        Periods starting within the new one are replaced by it.
+        """
+        if tariff is None:
+            return False
+        start, end = tariff[0], tariff[1]
+        first = bisect_left(self._starts, start)
+        if first < len(self._tariffs) and self._tariffs[first] == tariff:
+            return False
+
+        last = bisect_right(self._starts, end)
+        self._tariffs[first:last] = [tariff]
+        self._starts[first:last] = [start]
+        # The tariff applies until the next period starts
+        until = self._starts[first + 1] if first + 1 < len(self._starts) else None
+        for costs in self._costs.values():
+            for day in [day for day in costs if day >= start and (until is None or day < until)]:
+                del costs[day]
+
+        self._storage.async_delay_save(self._data_to_save, SAVE_DELAY)
+        _LOGGER.info(
+            "Recorded tariff from %s to %s: Peak=$%.4f, Off-peak=$%.4f, Daily=$%.3f",
+            *tariff,
+        )
+        return True
+
+    def _data_to_save(self) -> dict:
+        """Return the history as stored on disk."""
+        return {"tariffs": [list(tariff) for tariff in self._tariffs]}
+
+    def cost(self, daily: list[RollupRow], column: int, fallback_rate: float) -> float:
+        """Return the cost of the ``column`` kWh of ``daily``, each day at its tariff.
+
+        ``column`` is PEAK_COLUMN or OFFPEAK_COLUMN and ``daily`` is ordered by
+        day, so the days and the periods are matched in a single pass. Days
+        whose kWh and tariff are unchanged reuse their memoised cost.
+        """
+        rate_index = _RATE_INDEX[column]
+        cached = self._costs.get(column, {})
+        costs: dict[str, tuple[float, float, float]] = {}
+        index = bisect_right(self._starts, daily[0][0]) - 1 if daily else -1
+        total = 0.0
+        for row in daily:
+            day, kwh = row[0], row[column]
+            while index + 1 < len(self._starts) and self._starts[index + 1] <= day:
+                index += 1
+            memo = cached.get(day)
+            if memo is None or memo[0] != kwh or memo[1] != fallback_rate:
+                rate = self._tariffs[index][rate_index] if index >= 0 else fallback_rate
+                memo = (kwh, fallback_rate, kwh * rate)
+            costs[day] = memo
+            total += memo[2]
+        # Only the days last priced are kept
+        self._costs[column] = costs
+        return total
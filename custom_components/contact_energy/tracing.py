@@ -0,0 +1,124 @@
+"""Span tracing of Contact Energy refresh cycles to a rotating NDJSON file.
+
+Each span is one line recording when a step started, how long it took, what
+it worked on (day or range, bytes, rows) and its outcome. Spans nest through
+a context variable, which the integration's executor carries into its worker
+threads, so the fetches and decodes of a refresh share the refresh's trace ID.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+import itertools
+import json
+import logging
+from logging.handlers import QueueListener, RotatingFileHandler
+import queue
+import time
+from typing import Any
+
+_LOGGER = logging.getLogger(__name__)
+
+TRACE_FILENAME = "contact_energy_trace_{entry_id}.ndjson"
+TRACE_MAX_BYTES = 5 * 1024 * 1024
+TRACE_BACKUP_COUNT = 3
+
+# (trace ID, span ID) of the span running in the current context
+_CURRENT_SPAN: ContextVar[tuple[int, int] | None] = ContextVar(
+    "contact_energy_span", default=None
+)
+_SPAN_IDS = itertools.count(1)
+
+
+class Tracer:
+    """Write spans to a rotating NDJSON file, or do nothing without a path.
+
+    Lines are queued and written by a background thread, so spans can end on
+    the event loop without blocking it.
+    """
+
+    def __init__(self, path: str | None = None) -> None:
+        """Initialise the tracer; with no ``path`` spans are not recorded."""
+        self._path = path
+        self._queue: queue.SimpleQueue | None = None
+        self._listener: QueueListener | None = None
+        if path is None:
+            return
+        handler = RotatingFileHandler(
+            path,
+            maxBytes=TRACE_MAX_BYTES,
+            backupCount=TRACE_BACKUP_COUNT,
+            encoding="utf-8",
+            delay=True,
+        )
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        self._queue = queue.SimpleQueue()
+        self._listener = QueueListener(self._queue, handler)
+        self._listener.start()
+        _LOGGER.debug("Tracing to %s", path)
+
+    @property
+    def enabled(self) -> bool:
+        """Return whether spans are recorded."""
+        return self._queue is not None
+
+    @property
+    def path(self) -> str | None:
+        """Return the trace file."""
+        return self._path
+
+    @contextmanager
+    def span(self, name: str, **attrs: Any) -> Iterator[dict[str, Any]]:
+        """Time the block as a span named ``name``.
+
+        Yields ``attrs`` so the block can add what it learns, such as
+        ``bytes`` or ``rows``. The outcome is ``error`` if the block raises,
+        otherwise whatever the block set as ``outcome``, or ``ok``.
+        """
+        span_queue = self._queue
+        if span_queue is None:
+            yield attrs
+            return
+
+        parent = _CURRENT_SPAN.get()
+        span_id = next(_SPAN_IDS)
+        trace_id = parent[0] if parent else span_id
+        token = _CURRENT_SPAN.set((trace_id, span_id))
+        started = time.time()
+        started_monotonic = time.monotonic()
+        try:
+            yield attrs
+        except BaseException as err:
+            attrs["outcome"] = "error"
+            attrs["error"] = type(err).__name__
+            raise
+        finally:
+            _CURRENT_SPAN.reset(token)
+            record = {
+                "ts": datetime.fromtimestamp(started, timezone.utc).isoformat(
+                    timespec="milliseconds"
+                ),
+                "trace": trace_id,
+                "span": span_id,
+                "parent": parent[1] if parent else None,
+                "name": name,
+                "duration_ms": round(1000 * (time.monotonic() - started_monotonic), 1),
+                "outcome": "ok",
+                **attrs,
+            }
+            span_queue.put(
+                logging.makeLogRecord({"msg": json.dumps(record, default=str)})
+            )
+
+    def close(self) -> None:
+        """Flush queued spans and close the file."""
+        if self._listener is None:
+            return
+        self._listener.stop()
+        for handler in self._listener.handlers:
+            handler.close()
+        self._listener = None
+        self._queue = None
@@ -0,0 +1,209 @@
+"""Hourly usage loading for Contact Energy."""
+
+from __future__ import annotations
+
+from collections import defaultdict
+from collections.abc import Iterable
+from contextlib import aclosing
+from datetime import date, datetime, timedelta
+import logging
+
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+
+from .api import ContactEnergyApi, SoldRow
+from .executor import ContactEnergyExecutor
+from .store import RollupRow, UsageRow, UsageStore
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def hours_in_day(day: datetime) -> int:
+    """Return the number of hours in the local day starting at ``day``."""
+    return (int((day + timedelta(days=1)).timestamp()) - int(day.timestamp())) // 3600
+
+
+def rollup_rows(rows: Iterable[UsageRow]) -> list[RollupRow]:
+    """Return the daily rollups of hourly rows, as the local store keeps them."""
+    days: dict[str, list] = {}
+    for _, value, dollar_value, offpeak_value, source_ts in rows:
+        totals = days.get(source_ts[:10])
+        if totals is None:
+            totals = days[source_ts[:10]] = [0.0, 0.0, 0.0, 0.0, 0.0, 0]
+        totals[0] += value
+        totals[1] += dollar_value
+        if offpeak_value > 0:
+            totals[3] += offpeak_value
+        else:
+            totals[2] += value
+        totals[4] = max(totals[4], value)
+        totals[5] += 1
+    return [(day, *totals) for day, totals in sorted(days.items())]
+
+
+async def async_load_rows(
+    hass: HomeAssistant,
+    entry_data: dict,
+    start: datetime,
+    days: int,
+    use_store: bool = True,
+    sold: list[SoldRow] | None = None,
+) -> list[UsageRow]:
+    """Return the hourly rows for ``days`` local days from midnight ``start``.
+
+    Days the entry's store already holds in full are read from it; the rest
+    are fetched from the API and saved to the store when one is configured.
+    Pass ``use_store=False`` to always fetch, e.g. to pick up revised hours.
+    Pass a ``sold`` list to also collect the exported kWh of the fetched
+    days; the store keeps no export, so days read from it add none. Days
+    that fail to fetch are handed to the entry's retry queue.
+    """
+    api: ContactEnergyApi = entry_data["api"]
+    store: UsageStore | None = entry_data.get("store")
+    retry_queue = entry_data.get("retry_queue")
+    gap_index = entry_data.get("gap_index")
+    executor: ContactEnergyExecutor = entry_data["executor"]
+
+    stored: dict[date, list[UsageRow]] = defaultdict(list)
+    if store and use_store:
+        end = start + timedelta(days=days)
+        for row in await executor.async_run(
+            store.get_range, api._contractId, int(start.timestamp()), int(end.timestamp())
+        ):
+            stored[dt_util.as_local(dt_util.utc_from_timestamp(row[0])).date()].append(row)
+
+    day_starts = [start + timedelta(days=i) for i in range(days)]
+    complete = {
+        day.date()
+        for day in day_starts
+        if len(stored.get(day.date(), ())) >= hours_in_day(day)
+    }
+
+    # The other days are fetched in order, a few ahead of the one being saved
+    fetched: dict[date, list[UsageRow]] = {}
+    if len(complete) < days:
+        usage = api.iter_usage(
+            day_starts[0].date(), day_starts[-1].date(), executor.async_run, skip=complete
+        )
+        async with aclosing(usage):
+            async for day, response, day_sold in usage:
+                if response is False and retry_queue:
+                    retry_queue.add(api._contractId, day)
+                day_rows = fetched[day] = response or []
+                if sold is not None:
+                    sold.extend(day_sold)
+                if store and day_rows:
+                    await executor.async_run(store.upsert, api._contractId, day_rows)
+
+                # Log progress every 10 days
+                if len(fetched) % 10 == 0:
+                    _LOGGER.info(f"Fetched {len(fetched)}/{days - len(complete)} days...")
+
+    rows: list[UsageRow] = []
+    for day in day_starts:
+        if day.date() in complete:
+            day_rows = stored[day.date()]
+            # Fetched days are marked by the API's usage listener as they are read
+            if gap_index:
+                gap_index.mark(api._contractId, (row[0] for row in day_rows))
+        else:
+            day_rows = fetched.get(day.date(), [])
+        rows.extend(day_rows)
+
+    from_store = len(complete)
+    if from_store:
+        _LOGGER.debug("Read %d/%d complete days from the local usage store", from_store, days)
+
+    return rows
+
+
+async def async_load_daily(
+    hass: HomeAssistant,
+    entry_data: dict,
+    start: datetime,
+    days: int,
+) -> list[RollupRow]:
+    """Return the daily rollups for ``days`` local days from midnight ``start``.
+
+    With a local store they are read from its rollup table, loading only
+    the days it does not hold in full; without one they are computed from
+    the hourly rows.
+    """
+    api: ContactEnergyApi = entry_data["api"]
+    store: UsageStore | None = entry_data.get("store")
+    if not store or days <= 0:
+        return rollup_rows(await async_load_rows(hass, entry_data, start, days))
+
+    executor: ContactEnergyExecutor = entry_data["executor"]
+    first = start.date().isoformat()
+    last = (start + timedelta(days=days - 1)).date().isoformat()
+    daily = await executor.async_run(store.get_daily, api._contractId, first, last)
+
+    hours = {row[0]: row[6] for row in daily}
+    incomplete = [
+        day
+        for day in (start + timedelta(days=i) for i in range(days))
+        if hours.get(day.date().isoformat(), 0) < hours_in_day(day)
+    ]
+    if not incomplete:
+        return daily
+
+    # Loading a day saves it to the store, which updates its rollup; complete
+    # days between the incomplete ones are read back from the store
+    await async_load_rows(
+        hass, entry_data, incomplete[0], (incomplete[-1].date() - incomplete[0].date()).days + 1
+    )
+    return await executor.async_run(store.get_daily, api._contractId, first, last)
+
+
+async def async_load_monthly(
+    hass: HomeAssistant,
+    entry_data: dict,
+    first: date,
+    last: date,
+) -> list[RollupRow]:
+    """Return rollups covering the local days ``first`` to ``last`` inclusive.
+
+    Calendar months that lie wholly in the range and that the store holds
+    in full come from its monthly rollups, keyed by their first day; the
+    rest are returned as daily rollups.
+    """
+    api: ContactEnergyApi = entry_data["api"]
+    store: UsageStore | None = entry_data.get("store")
+    monthly = {}
+    if store:
+        executor: ContactEnergyExecutor = entry_data["executor"]
+        monthly = {
+            row[0]: row
+            for row in await executor.async_run(
+                store.get_monthly,
+                api._contractId,
+                first.strftime("%Y-%m"),
+                last.strftime("%Y-%m"),
+            )
+        }
+
+    rollups: list[RollupRow] = []
+    month_start = first.replace(day=1)
+    while month_start <= last:
+        next_month = (month_start + timedelta(days=32)).replace(day=1)
+        month_end = next_month - timedelta(days=1)
+        period_start = max(first, month_start)
+        period_end = min(last, month_end)
+
+        start = dt_util.start_of_local_day(period_start)
+        row = monthly.get(month_start.strftime("%Y-%m"))
+        expected = (
+            int(dt_util.start_of_local_day(next_month).timestamp()) - int(start.timestamp())
+        ) // 3600
+        whole_month = period_start == month_start and period_end == month_end
+        if whole_month and row and row[6] >= expected:
+            rollups.append((month_start.isoformat(), *row[1:]))
+        else:
+            rollups.extend(
+                await async_load_daily(
+                    hass, entry_data, start, (period_end - period_start).days + 1
+                )
+            )
+        month_start = next_month
+    return rollups
@@ -0,0 +1,131 @@
+"""HTTP views for the Contact Energy integration."""
+
+from __future__ import annotations
+
+import csv
+from datetime import timedelta
+from http import HTTPStatus
+import io
+import logging
+
+from aiohttp import web
+
+from homeassistant.components.http import HomeAssistantView
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.json import json_dumps
+from homeassistant.util import dt as dt_util
+
+from .api import EXPORT_FIELDS, export_record
+from .services import entries_for_account
+from .usage import async_load_rows
+
+_LOGGER = logging.getLogger(__name__)
+
+EXPORT_FORMATS = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+}
+
+# Days loaded, fetched with read-ahead and written out at a time
+EXPORT_CHUNK_DAYS = 31
+
+
+class ContactEnergyExportView(HomeAssistantView):
+    """Stream an account's hourly usage as CSV or NDJSON.
+
+    ``GET /api/contact_energy/export?start=YYYY-MM-DD&end=YYYY-MM-DD``
+    with optional ``account`` (account or contract ID, required when several
+    accounts are configured) and ``format`` (``csv`` or ``ndjson``). Days are
+    read from the local store or fetched from the API a month at a time, and
+    each month is written out before the next one is loaded.
+    """
+
+    url = "/api/contact_energy/export"
+    name = "api:contact_energy:export"
+    requires_auth = True
+
+    async def get(self, request: web.Request) -> web.StreamResponse:
+        """Stream the requested usage."""
+        if not request["hass_user"].is_admin:
+            return self.json_message("Unauthorized", HTTPStatus.UNAUTHORIZED)
+
+        hass: HomeAssistant = request.app["hass"]
+        query = request.query
+
+        export_format = query.get("format", "csv")
+        if export_format not in EXPORT_FORMATS:
+            return self.json_message(
+                f"format must be one of {', '.join(EXPORT_FORMATS)}",
+                HTTPStatus.BAD_REQUEST,
+            )
+
+        start_date = dt_util.parse_date(query.get("start", ""))
+        end_date = dt_util.parse_date(query.get("end", ""))
+        if start_date is None or end_date is None:
+            return self.json_message(
+                "start and end are required as YYYY-MM-DD", HTTPStatus.BAD_REQUEST
+            )
+        if end_date < start_date:
+            return self.json_message(
+                "end must not be before start", HTTPStatus.BAD_REQUEST
+            )
+
+        entries = list(entries_for_account(hass, query.get("account")).values())
+        if len(entries) != 1:
+            return self.json_message(
+                "No matching Contact Energy account found"
+                if not entries
+                else "Several Contact Energy accounts match; pass account",
+                HTTPStatus.NOT_FOUND if not entries else HTTPStatus.BAD_REQUEST,
+            )
+        entry_data = entries[0]
+        api = entry_data["api"]
+        if not api._api_token and not await entry_data["executor"].async_run(api.login):
+            return self.json_message(
+                "Failed to login to Contact Energy API", HTTPStatus.BAD_GATEWAY
+            )
+
+        # There is nothing to fetch for days that have not happened yet
+        days = max((min(end_date, dt_util.now().date()) - start_date).days + 1, 0)
+        start = dt_util.start_of_local_day(start_date)
+
+        response = web.StreamResponse(
+            headers={
+                "Content-Type": EXPORT_FORMATS[export_format],
+                "Content-Disposition": (
+                    f'attachment; filename="contact_energy_{api._accountId}_'
+                    f'{start_date}_{end_date}.{export_format}"'
+                ),
+            }
+        )
+        response.enable_chunked_encoding()
+        await response.prepare(request)
+
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS)
+        if export_format == "csv":
+            writer.writeheader()
+
+        written = 0
+        for offset in range(0, days, EXPORT_CHUNK_DAYS):
+            chunk_start = start + timedelta(days=offset)
+            chunk_days = min(EXPORT_CHUNK_DAYS, days - offset)
+            for row in await async_load_rows(hass, entry_data, chunk_start, chunk_days):
+                record = export_record(row)
+                if export_format == "csv":
+                    writer.writerow(record)
+                else:
+                    buffer.write(json_dumps(record))
+                    buffer.write("\n")
+                written += 1
+
+            if buffer.tell():
+                await response.write(buffer.getvalue().encode())
+                buffer.seek(0)
+                buffer.truncate()
+
+        await response.write_eof()
+        _LOGGER.debug(
+            "Streamed %d hourly records for %s to %s", written, start_date, end_date
+        )
+        return response
@@ -0,0 +1,132 @@
+"""Websocket commands for the Contact Energy integration."""
+
+from __future__ import annotations
+
+from datetime import timedelta
+import logging
+from typing import Any
+
+import voluptuous as vol
+
+from homeassistant.components import websocket_api
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import config_validation as cv
+from homeassistant.util import dt as dt_util
+
+from .downsample import DOWNSAMPLE_METHODS, downsample
+from .services import entries_for_account
+from .store import UsageStore
+
+_LOGGER = logging.getLogger(__name__)
+
+# Points per series returned when no budget is given, and the most allowed
+DEFAULT_POINTS = 500
+MAX_POINTS = 10000
+
+
+@callback
+def async_setup_websocket(hass: HomeAssistant) -> None:
+    """Register the Contact Energy websocket commands."""
+    websocket_api.async_register_command(hass, ws_usage_series)
+
+
+def _build_series(
+    store: UsageStore,
+    contract_id: str,
+    start: int,
+    end: int,
+    points: int,
+    method: str,
+) -> dict[str, Any]:
+    """Read ``[start, end)`` from the store and downsample kWh and cost."""
+    rows = store.get_hours(contract_id, start, end)
+    kwh = downsample([(row[0], row[1]) for row in rows], points, method)
+    cost = downsample([(row[0], row[2]) for row in rows], points, method)
+    return {
+        "hours": len(rows),
+        "kwh": [list(point) for point in kwh],
+        "cost": [list(point) for point in cost],
+    }
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): "contact_energy/usage_series",
+        vol.Required("start_date"): cv.date,
+        vol.Required("end_date"): cv.date,
+        vol.Optional("points", default=DEFAULT_POINTS): vol.All(
+            vol.Coerce(int), vol.Range(min=3, max=MAX_POINTS)
+        ),
+        vol.Optional("method", default="lttb"): vol.In(DOWNSAMPLE_METHODS),
+        vol.Optional("account"): cv.string,
+    }
+)
+@websocket_api.require_admin
+@websocket_api.async_response
+async def ws_usage_series(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: dict[str, Any],
+) -> None:
+    """Return hourly kWh and cost for a range, downsampled to a point budget.
+
+    Series are read from the local usage store only, as ``[epoch seconds,
+    value]`` pairs, so long ranges never go through the API or the recorder.
+    """
+    entries = list(entries_for_account(hass, msg.get("account")).values())
+    if len(entries) != 1:
+        connection.send_error(
+            msg["id"],
+            websocket_api.ERR_NOT_FOUND,
+            "No matching Contact Energy account found"
+            if not entries
+            else "Several Contact Energy accounts match; pass account",
+        )
+        return
+
+    entry_data = entries[0]
+    store: UsageStore | None = entry_data.get("store")
+    if store is None:
+        connection.send_error(
+            msg["id"],
+            websocket_api.ERR_NOT_SUPPORTED,
+            "Enable the local usage store in the integration options",
+        )
+        return
+
+    start_date, end_date = msg["start_date"], msg["end_date"]
+    if end_date < start_date:
+        connection.send_error(
+            msg["id"], websocket_api.ERR_INVALID_FORMAT, "end_date is before start_date"
+        )
+        return
+
+    api = entry_data["api"]
+    start = dt_util.start_of_local_day(start_date)
+    end = dt_util.start_of_local_day(end_date + timedelta(days=1))
+    series = await entry_data["executor"].async_run(
+        _build_series,
+        store,
+        api._contractId,
+        int(start.timestamp()),
+        int(end.timestamp()),
+        msg["points"],
+        msg["method"],
+    )
+    _LOGGER.debug(
+        "Downsampled %d hours to %d points with %s",
+        series["hours"],
+        len(series["kwh"]),
+        msg["method"],
+    )
+    connection.send_result(
+        msg["id"],
+        {
+            "account_id": api._accountId,
+            "contract_id": api._contractId,
+            "start_date": start_date.isoformat(),
+            "end_date": end_date.isoformat(),
+            "method": msg["method"],
+            **series,
+        },
+    )
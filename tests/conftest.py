@@ -0,0 +1,14 @@
+"""Shared setup for the tests of the Home Assistant free modules."""
+
+from pathlib import Path
+import sys
+import types
+
+PACKAGE_DIR = Path(__file__).resolve().parent.parent / "custom_components" / "contact_energy"
+
+# The package __init__ imports Home Assistant; the modules under test do not,
+# so load them from a bare package as scripts/export does
+if "contact_energy" not in sys.modules:
+    package = types.ModuleType("contact_energy")
+    package.__path__ = [str(PACKAGE_DIR)]
+    sys.modules["contact_energy"] = package
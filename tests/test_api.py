@@ -0,0 +1,75 @@
+"""Tests for projecting usage responses onto rows."""
+
+from datetime import datetime
+import json
+from pathlib import Path
+
+from contact_energy.api import ContactEnergyApi, export_record, json_loads, project_usage
+from contact_energy.cache import UsageCache
+
+USAGE_DAY = (Path(__file__).parent / "fixtures" / "usage_day.json").read_bytes()
+
+
+def test_project_usage():
+    """Each point becomes an (hour, kwh, cost, offpeak_kwh, source_ts) row."""
+    points = json.loads(USAGE_DAY)
+    rows = project_usage(json_loads(USAGE_DAY))
+    assert len(rows) == 24
+    for row, point in zip(rows, points):
+        assert row == (
+            int(datetime.fromisoformat(point["date"]).timestamp()),
+            float(point["value"]),
+            float(point["dollarValue"]),
+            float(point["offpeakValue"]),
+            point["date"],
+        )
+    assert [row[0] - rows[0][0] for row in rows] == [hour * 3600 for hour in range(24)]
+
+
+def test_project_usage_skips_bad_points():
+    """Points without a readable date are left out."""
+    rows = project_usage(
+        [
+            {"value": "1.0"},
+            {"date": "not a date"},
+            {"date": "2025-01-15T00:00:00.000+13:00"},
+        ]
+    )
+    assert rows == [(1736852400, 0.0, 0.0, 0.0, "2025-01-15T00:00:00.000+13:00")]
+
+
+def test_project_usage_sold():
+    """Exported kWh is collected only from points that report it."""
+    sold = []
+    project_usage(
+        [
+            {"date": "2025-01-15T12:00:00.000+13:00", "value": "0.1", "exportValue": "2.5"},
+            {"date": "2025-01-15T13:00:00.000+13:00", "value": "0.2"},
+        ],
+        sold,
+    )
+    assert sold == [(1736895600, 2.5)]
+
+
+def test_export_record():
+    """Export records are in Contact's local time."""
+    record = export_record(project_usage(json_loads(USAGE_DAY))[21])
+    assert record["timestamp"] == "2025-01-15 21:00:00"
+    assert record["date"] == "2025-01-15"
+    assert record["hour"] == 21
+    assert record["is_offpeak"] == 1
+    assert record["peak_kwh"] == 0
+
+
+def test_usage_listener():
+    """Hourly days read are passed to the usage listener with their contract."""
+    api = ContactEnergyApi("user@example.com", "password")
+    api._contractId = "123456"
+    api.use_cache(UsageCache())
+    rows = project_usage(json_loads(USAGE_DAY))
+    api.usage_cache.put(("123456", "2025-01-15"), rows, [])
+    read = []
+    api.set_usage_listener(lambda contract_id, rows: read.append((contract_id, rows)))
+
+    assert api.get_usage("2025", "1", "15") == rows
+    assert read == [("123456", rows)]
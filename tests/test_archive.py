@@ -0,0 +1,149 @@
+"""Tests for the memory-mapped hourly usage archive."""
+
+from datetime import datetime, timedelta
+
+from contact_energy.archive import RECORD, UsageArchive, source_timestamp
+import pytest
+
+CONTRACT = "123456"
+
+
+def _row(timestamp: str, kwh: float = 1.0, offpeak_kwh: float = 0.0) -> tuple:
+    """Return a usage row for a local timestamp."""
+    return (
+        int(datetime.fromisoformat(timestamp).timestamp()),
+        kwh,
+        round(kwh * 0.3, 3),
+        offpeak_kwh,
+        timestamp,
+    )
+
+
+def _day(day: str, offset: str = "+13:00") -> list[tuple]:
+    """Return the 24 rows of a local day, with kWh counting up from 0.1."""
+    start = datetime.fromisoformat(f"{day}T00:00:00{offset}")
+    return [
+        _row((start + timedelta(hours=hour)).isoformat(), round(0.1 * (hour + 1), 1))
+        for hour in range(24)
+    ]
+
+
+def _records(rows: list[tuple]) -> list[tuple]:
+    """Return the archive records expected for usage rows."""
+    return [
+        (
+            hour,
+            kwh,
+            cost,
+            offpeak_kwh,
+            int(datetime.fromisoformat(source_ts).utcoffset().total_seconds() // 60),
+        )
+        for hour, kwh, cost, offpeak_kwh, source_ts in rows
+    ]
+
+
+@pytest.fixture
+def archive(tmp_path):
+    """Return an archive in a temporary directory, closed afterwards."""
+    archive = UsageArchive(str(tmp_path / "archive"))
+    yield archive
+    archive.close()
+
+
+def test_round_trip(archive):
+    """Written hours read back with their UTC offsets, in hour order."""
+    rows = _day("2025-01-15")
+    assert archive.write(CONTRACT, reversed(rows)) == 24
+    records = archive.get_range(CONTRACT, rows[0][0], rows[-1][0] + 3600)
+    assert records == _records(rows)
+    assert [source_timestamp(hour, offset) for hour, *_, offset in records] == [
+        row[4] for row in rows
+    ]
+
+
+def test_missing_contract(archive):
+    """A contract without a file has no hours."""
+    assert not archive.has(CONTRACT)
+    assert archive.get_range(CONTRACT, 0, 2**40) == []
+    assert archive.count_hours(CONTRACT, 0, 2**40) == 0
+    assert archive.latest_hour(CONTRACT) is None
+
+
+def test_gaps(archive):
+    """Hours never written read as missing, not as zero usage."""
+    rows = _day("2025-01-15")
+    written = rows[:3] + rows[5:6]
+    archive.write(CONTRACT, written)
+    start, end = rows[0][0], rows[-1][0] + 3600
+    assert archive.get_range(CONTRACT, start, end) == _records(written)
+    assert archive.count_hours(CONTRACT, start, end) == 4
+    assert archive.latest_hour(CONTRACT) == rows[5][0]
+
+
+def test_revision_overwrites(archive):
+    """Writing an hour again replaces its record."""
+    rows = _day("2025-01-15")
+    archive.write(CONTRACT, rows)
+    revised = _row(rows[3][4], 9.0, 9.0)
+    archive.write(CONTRACT, [revised])
+    records = archive.get_range(CONTRACT, rows[0][0], rows[-1][0] + 3600)
+    assert records[3] == _records([revised])[0]
+    assert len(records) == 24
+
+
+def test_range_bounds(archive):
+    """Ranges are half open and may extend past either end of the file."""
+    rows = _day("2025-01-15")
+    archive.write(CONTRACT, rows)
+    assert archive.get_range(CONTRACT, rows[2][0], rows[5][0]) == _records(rows[2:5])
+    assert archive.get_range(CONTRACT, rows[2][0] - 1, rows[2][0] + 1) == _records(rows[2:3])
+    assert archive.get_range(CONTRACT, 0, 2**40) == _records(rows)
+
+
+def test_rebase(archive, tmp_path):
+    """Hours before the file's base move the existing records, keeping them."""
+    later = _day("2025-01-15")
+    archive.write(CONTRACT, later)
+    size = (tmp_path / "archive" / f"{CONTRACT}.bin").stat().st_size
+
+    earlier = _day("2023-06-01", "+12:00")
+    archive.write(CONTRACT, earlier)
+    assert (tmp_path / "archive" / f"{CONTRACT}.bin").stat().st_size > size
+    assert not list((tmp_path / "archive").glob("*.tmp"))
+    assert archive.get_range(CONTRACT, 0, 2**40) == _records(earlier + later)
+
+
+def test_reopen(archive, tmp_path):
+    """A new archive on the same directory reads what the last one wrote."""
+    rows = _day("2025-01-15")
+    archive.write(CONTRACT, rows)
+    archive.close()
+
+    reopened = UsageArchive(str(tmp_path / "archive"))
+    try:
+        assert reopened.has(CONTRACT)
+        assert reopened.get_range(CONTRACT, 0, 2**40) == _records(rows)
+        # The reopened file keeps growing from its mapping
+        following = _day("2025-01-16")
+        reopened.write(CONTRACT, following)
+        assert reopened.get_range(CONTRACT, 0, 2**40) == _records(rows + following)
+    finally:
+        reopened.close()
+
+
+def test_invalid_file(archive, tmp_path):
+    """A file without the archive header is refused."""
+    directory = tmp_path / "archive"
+    directory.mkdir()
+    (directory / f"{CONTRACT}.bin").write_bytes(b"not an archive" + bytes(RECORD.size))
+    with pytest.raises(ValueError):
+        archive.get_range(CONTRACT, 0, 2**40)
+
+
+def test_discard(archive, tmp_path):
+    """Discarding a contract deletes its file."""
+    archive.write(CONTRACT, _day("2025-01-15"))
+    archive.discard(CONTRACT)
+    assert not archive.has(CONTRACT)
+    assert not (tmp_path / "archive" / f"{CONTRACT}.bin").exists()
+    assert archive.get_range(CONTRACT, 0, 2**40) == []
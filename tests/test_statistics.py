@@ -0,0 +1,110 @@
+"""Tests for writing usage statistics, with the recorder replaced by a dict."""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+pytest.importorskip("homeassistant")
+
+from contact_energy import offline, statistics  # noqa: E402
+from contact_energy.executor import ContactEnergyExecutor  # noqa: E402
+
+START = datetime(2025, 1, 14, 11, tzinfo=timezone.utc)
+
+
+class FakeRecorder:
+    """Hourly statistics held as statistic ID -> hour -> (state, sum)."""
+
+    def __init__(self) -> None:
+        """Start with no statistics."""
+        self.rows: dict[str, dict[datetime, tuple[float, float]]] = {}
+
+    async def async_add_executor_job(self, func, *args):
+        """Run a recorder query inline."""
+        return func(*args)
+
+    async def async_block_till_done(self) -> None:
+        """Nothing is queued."""
+
+    def statistics_during_period(self, hass, start, end, statistic_ids, *_):
+        """Return the rows from ``start`` up to ``end`` in the recorder's shape."""
+        return {
+            statistic_id: [
+                {"start": hour.timestamp(), "state": state, "sum": total}
+                for hour, (state, total) in sorted(self.rows.get(statistic_id, {}).items())
+                if hour >= start and (end is None or hour < end)
+            ]
+            for statistic_id in statistic_ids
+            if self.rows.get(statistic_id)
+        }
+
+    def add(self, hass, metadata, rows) -> None:
+        """Insert or replace rows."""
+        stored = self.rows.setdefault(metadata["statistic_id"], {})
+        for row in rows:
+            stored[row["start"]] = (row["state"], row["sum"])
+
+
+@pytest.fixture
+def recorder(monkeypatch):
+    """Route the statistics module's recorder calls to a FakeRecorder."""
+    fake = FakeRecorder()
+    monkeypatch.setattr(statistics, "get_instance", lambda hass: fake)
+    monkeypatch.setattr(statistics, "statistics_during_period", fake.statistics_during_period)
+    monkeypatch.setattr(statistics, "async_add_external_statistics", fake.add)
+    return fake
+
+
+def _hour(offset: int) -> datetime:
+    return START + timedelta(hours=offset)
+
+
+def _chunks(rows):
+    yield rows
+
+
+def _restore(rows, suffix=""):
+    async def _async_restore():
+        executor = ContactEnergyExecutor(1)
+        try:
+            return await offline.async_restore_statistics(
+                None, executor, _chunks(rows), suffix
+            )
+        finally:
+            executor.shutdown()
+
+    return asyncio.run(_async_restore())
+
+
+def test_restore_carries_sums_past_the_range(recorder):
+    """Restored hours continue the earlier sum and re-sum the later hours."""
+    consumption = statistics.STATISTIC_CONSUMPTION
+    recorder.rows[consumption] = {_hour(-1): (1.0, 10.0), _hour(3): (1.0, 11.0)}
+    rows = [
+        (int(_hour(0).timestamp()), 2.0, 0.6, 0.0),
+        (int(_hour(1).timestamp()), 2.0, 0.6, 0.0),
+    ]
+
+    written = _restore(rows)
+
+    assert written == 2 * len(statistics.USAGE_STATISTICS) + 1
+    assert recorder.rows[consumption][_hour(0)] == (2.0, 12.0)
+    assert recorder.rows[consumption][_hour(1)] == (2.0, 14.0)
+    assert recorder.rows[consumption][_hour(3)] == (1.0, 15.0)
+    assert recorder.rows[statistics.STATISTIC_FREE_CONSUMPTION][_hour(1)] == (0.0, 0.0)
+
+
+def test_restore_writes_the_account_statistics(recorder):
+    """An account with a suffix writes and sums its own statistics only."""
+    consumption = statistics.STATISTIC_CONSUMPTION
+    recorder.rows[consumption] = {_hour(-1): (1.0, 10.0)}
+    recorder.rows[f"{consumption}_123456"] = {_hour(-1): (1.0, 3.0)}
+
+    _restore([(int(_hour(0).timestamp()), 2.0, 0.6, 0.0)], "123456")
+
+    assert recorder.rows[consumption] == {_hour(-1): (1.0, 10.0)}
+    assert recorder.rows[f"{consumption}_123456"][_hour(0)] == (2.0, 5.0)
+    assert statistics.statistic_metadata(consumption, "123456")["name"] == (
+        "Contact Energy 123456"
+    )
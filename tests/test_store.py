@@ -0,0 +1,137 @@
+"""Tests for the local SQLite usage store and its archive."""
+
+from datetime import datetime, timedelta
+
+from contact_energy.store import UsageStore
+import pytest
+
+CONTRACT = "123456"
+
+
+def _day(day: str, offpeak_hours: int = 7) -> list[tuple]:
+    """Return a local day of 1 kWh hours, the first ``offpeak_hours`` off-peak."""
+    start = datetime.fromisoformat(f"{day}T00:00:00+13:00")
+    rows = []
+    for hour in range(24):
+        timestamp = start + timedelta(hours=hour)
+        rows.append((
+            int(timestamp.timestamp()),
+            1.0,
+            0.15 if hour < offpeak_hours else 0.3,
+            1.0 if hour < offpeak_hours else 0.0,
+            timestamp.isoformat(),
+        ))
+    return rows
+
+
+@pytest.fixture(params=[False, True], ids=["sqlite", "archive"])
+def store(request, tmp_path):
+    """Return a store, with or without an archive, closed afterwards."""
+    archive_dir = str(tmp_path / "archive") if request.param else None
+    store = UsageStore(str(tmp_path / "usage.db"), archive_dir)
+    yield store
+    store.close()
+
+
+def test_range(store):
+    """Upserted rows read back in hour order, with and without timestamps."""
+    rows = _day("2025-01-15") + _day("2025-01-16")
+    assert store.upsert(CONTRACT, reversed(rows)) == 48
+    assert store.get_range(CONTRACT, rows[0][0], rows[-1][0] + 3600) == rows
+    assert store.get_range(CONTRACT, rows[24][0], rows[-1][0] + 3600) == rows[24:]
+    assert store.get_hours(CONTRACT, rows[0][0], rows[2][0]) == [
+        row[:4] for row in rows[:2]
+    ]
+    assert store.get_range("other", 0, 2**40) == []
+
+
+def test_hours(store):
+    """Counts and bounds skip the hours that were never stored."""
+    rows = _day("2025-01-15")
+    store.upsert(CONTRACT, rows[:3] + rows[10:12])
+    assert store.count_hours(CONTRACT, rows[0][0], rows[-1][0] + 3600) == 5
+    assert store.first_hour(CONTRACT) == rows[0][0]
+    assert store.latest_hour(CONTRACT) == rows[11][0]
+    assert store.latest_hour("other") is None
+
+
+def test_rollups(store):
+    """Daily and monthly rollups follow the hours, including revisions."""
+    store.upsert(CONTRACT, _day("2025-01-15") + _day("2025-01-16"))
+    assert store.get_daily(CONTRACT, "2025-01-15", "2025-01-16") == [
+        ("2025-01-15", 24.0, pytest.approx(6.15), 17.0, 7.0, 1.0, 24),
+        ("2025-01-16", 24.0, pytest.approx(6.15), 17.0, 7.0, 1.0, 24),
+    ]
+
+    # A revised hour moves its day and month totals
+    revised = list(_day("2025-01-16")[12])
+    revised[1] = 3.0
+    store.upsert(CONTRACT, [tuple(revised)])
+    daily = store.get_daily(CONTRACT, "2025-01-16", "2025-01-16")
+    assert daily[0][1:3] == (26.0, pytest.approx(6.15))
+    assert daily[0][5] == 3.0
+    assert store.get_monthly(CONTRACT, "2025-01", "2025-01") == [
+        ("2025-01", 50.0, pytest.approx(12.3), 36.0, 14.0, 3.0, 48),
+    ]
+
+
+def test_rollups_use_local_days(store):
+    """Hours are rolled up by their local day, not their UTC day."""
+    rows = _day("2025-02-01")
+    store.upsert(CONTRACT, rows)
+    assert [row[0] for row in store.get_daily(CONTRACT, "2025-01-01", "2025-02-28")] == [
+        "2025-02-01"
+    ]
+    assert store.get_monthly(CONTRACT, "2025-01", "2025-01") == []
+
+
+def test_reopen(tmp_path):
+    """Hours stored before the archive existed are copied into it on first read."""
+    rows = _day("2025-01-15")
+    store = UsageStore(str(tmp_path / "usage.db"))
+    store.upsert(CONTRACT, rows)
+    store.close()
+
+    store = UsageStore(str(tmp_path / "usage.db"), str(tmp_path / "archive"))
+    try:
+        assert store.get_range(CONTRACT, 0, 2**40) == rows
+        assert (tmp_path / "archive" / f"{CONTRACT}.bin").exists()
+        following = _day("2025-01-16")
+        store.upsert(CONTRACT, following)
+    finally:
+        store.close()
+
+    store = UsageStore(str(tmp_path / "usage.db"), str(tmp_path / "archive"))
+    try:
+        assert store.get_range(CONTRACT, 0, 2**40) == rows + following
+    finally:
+        store.close()
+
+
+def test_failed_archive_write_rolls_back(tmp_path, monkeypatch):
+    """A failed archive write leaves neither the database nor the archive changed."""
+    rows = _day("2025-01-15")
+    store = UsageStore(str(tmp_path / "usage.db"), str(tmp_path / "archive"))
+    try:
+        store.upsert(CONTRACT, rows)
+        archive = store._archive
+        write = archive.write
+        written = []
+
+        def _failing_write(contract_id, new_rows):
+            # Write the new day, then fail as a full disk would
+            new_rows = list(new_rows)
+            written.append(write(contract_id, new_rows[2:]))
+            raise OSError("No space left on device")
+
+        monkeypatch.setattr(archive, "write", _failing_write)
+        revised = [(*row[:1], 5.0, *row[2:]) for row in _day("2025-01-16")]
+        with pytest.raises(OSError):
+            store.upsert(CONTRACT, rows[:2] + revised)
+        monkeypatch.setattr(archive, "write", write)
+
+        assert written == [24]
+        assert store.get_range(CONTRACT, 0, 2**40) == rows
+        assert store.get_daily(CONTRACT, "2025-01-16", "2025-01-16") == []
+    finally:
+        store.close()
@@ -0,0 +1,125 @@
+"""Tests for parsing bill charges into tariff bands."""
+
+import json
+from pathlib import Path
+
+from contact_energy.tariff_bands import (
+    ALL_DAYS,
+    WEEKDAYS,
+    WEEKENDS,
+    _parse_hours,
+    parse_bill,
+)
+import pytest
+
+BILLS = json.loads((Path(__file__).parent / "fixtures" / "bills.json").read_text())
+
+MONDAY = 0
+SATURDAY = 5
+
+
+def _minute(clock: str) -> int:
+    """Return minutes after midnight of an HH:MM time."""
+    hour, minute = clock.split(":")
+    return int(hour) * 60 + int(minute)
+
+
+@pytest.mark.parametrize(
+    ("description", "hours"),
+    [
+        ("Off Peak 9PM - 7AM", (21 * 60, 7 * 60)),
+        ("Weekend Free Hours 9:00am-5:00pm", (9 * 60, 17 * 60)),
+        ("Night 21:30 - 07:00", (21 * 60 + 30, 7 * 60)),
+        ("Day 07:00-23:00", (7 * 60, 23 * 60)),
+        ("Night 12am-7am", (0, 7 * 60)),
+        ("Peak 12pm-9pm", (12 * 60, 21 * 60)),
+        ("Night 12 midnight - 7am", (0, 7 * 60)),
+        ("Off Peak 9pm-midnight", (21 * 60, 0)),
+        ("Night 11pm - 12 midnight", (23 * 60, 0)),
+        ("Night midnight to 7am", (0, 7 * 60)),
+        ("Peak 7am - noon", (7 * 60, 12 * 60)),
+        ("Solar Saver 12 noon - 4pm", (12 * 60, 16 * 60)),
+        ("Anytime", None),
+        ("Controlled 2-3 units", None),
+    ],
+)
+def test_parse_hours(description, hours):
+    """Descriptions give the minutes their time range covers."""
+    assert _parse_hours(description) == hours
+
+
+@pytest.mark.parametrize(
+    ("bill", "peak_rate", "offpeak_rate", "daily_charge", "bands"),
+    [
+        ("two_rate", 0.327, 0.161, 1.2, 2),
+        ("anytime", 0.295, 0.0, 0.69, 1),
+        ("free_hours", 0.3, 0.0, 0.0, 2),
+        ("weekend", 0.33, 0.15, 0.0, 3),
+        ("twenty_four_hour", 0.3, 0.14, 0.0, 2),
+        ("midnight_start", 0.31, 0.155, 0.0, 2),
+        ("midnight_end", 0.32, 0.12, 0.0, 3),
+        ("noon", 0.34, 0.16, 0.0, 4),
+    ],
+)
+def test_parse_bill_rates(bill, peak_rate, offpeak_rate, daily_charge, bands):
+    """Levies are ignored and the cheapest band is the off-peak rate."""
+    tariff = parse_bill(BILLS[bill])
+    assert tariff.peak_rate == peak_rate
+    assert tariff.offpeak_rate == offpeak_rate
+    assert tariff.daily_charge == daily_charge
+    assert len(tariff.bands) == bands
+
+
+@pytest.mark.parametrize(
+    ("bill", "weekday", "clock", "description", "offpeak"),
+    [
+        ("two_rate", MONDAY, "12:00", "Peak 7AM - 9PM", False),
+        ("two_rate", MONDAY, "22:00", "Off Peak 9PM - 7AM", True),
+        ("two_rate", SATURDAY, "06:59", "Off Peak 9PM - 7AM", True),
+        ("anytime", SATURDAY, "03:00", "Anytime", False),
+        ("free_hours", MONDAY, "12:00", "Anytime", False),
+        ("free_hours", MONDAY, "23:59", "Good Nights Free Power 9pm-12am", True),
+        ("weekend", MONDAY, "10:00", "Weekday Peak 7:00am - 9:30pm", False),
+        ("weekend", SATURDAY, "10:00", "Weekend 7am-9:30pm", True),
+        ("weekend", SATURDAY, "22:00", "Night 21:30 - 07:00", True),
+        ("twenty_four_hour", MONDAY, "23:00", "Night 23:00-07:00", True),
+        ("midnight_start", MONDAY, "00:00", "Night 12 midnight - 7am", True),
+        ("midnight_start", MONDAY, "23:30", "Day 7am - 12 midnight", False),
+        ("midnight_end", MONDAY, "23:59", "Off Peak 9pm-midnight", True),
+        ("midnight_end", MONDAY, "00:00", "Night midnight to 7am", True),
+        ("midnight_end", MONDAY, "20:59", "Peak 7am-9pm", False),
+        ("noon", MONDAY, "11:59", "Peak 7am - noon", False),
+        ("noon", MONDAY, "12:00", "Solar Saver 12 noon - 4pm", True),
+        ("noon", MONDAY, "16:00", "Peak 4pm - 11pm", False),
+    ],
+)
+def test_band_at(bill, weekday, clock, description, offpeak):
+    """Each time of the week falls in the band its description names."""
+    band = parse_bill(BILLS[bill]).band_at(weekday, _minute(clock))
+    assert band is not None
+    assert band.description == description
+    assert band.offpeak is offpeak
+
+
+def test_band_days():
+    """Weekend and weekday bands apply only on those days."""
+    days = {band.description: band.days for band in parse_bill(BILLS["weekend"]).bands}
+    assert days == {
+        "Weekday Peak 7:00am - 9:30pm": WEEKDAYS,
+        "Weekend 7am-9:30pm": WEEKENDS,
+        "Night 21:30 - 07:00": ALL_DAYS,
+    }
+
+
+def test_every_minute_has_a_band():
+    """Timed bands of each fixture cover the whole week between them."""
+    for name, bill in BILLS.items():
+        tariff = parse_bill(bill)
+        for weekday in range(7):
+            for minute in range(0, 24 * 60, 15):
+                assert tariff.band_at(weekday, minute) is not None, (name, weekday, minute)
+
+
+def test_parse_bill_is_cached():
+    """The same charges return the same parsed tariff."""
+    assert parse_bill(BILLS["two_rate"]) is parse_bill(json.loads(json.dumps(BILLS["two_rate"])))